@@ -1,106 +1,201 @@
 import datetime
 import os
 import re
-import json
 import random
-import sqlite3
-import speech_recognition as sr
-import pyttsx3
-import wolframalpha
 import requests
-from bs4 import BeautifulSoup
-import spacy
+from functools import lru_cache
 from dotenv import load_dotenv
-import pyowm
-from dateutil.parser import parse
-from flask import jsonify
+from intent_router import IntentRouter, NUMBER
+from lazy_resources import ResourceRegistry
+import math_engine
+from result_cache import ResultCache, make_backend as make_cache_backend
+from http_client import HttpClient
+from news_aggregator import NewsAggregator, NewsAPISource, RSSSource, JSONFixtureSource
+import news_index
+import html_extract
+from article_enrichment import ArticleCache, ArticleFetcher, enrich_articles
+from knowledge_index import KnowledgeIndex, parse_published
+from reminder_store import ReminderStore
+from reminder_repository import ReminderRepository
+from reminder_scheduler import ReminderScheduler
+from event_bus import EventBus
+import time_parser
+import recurrence
+from tts_service import TTSService, AudioCache, Pyttsx3Driver, FakeDriver
+from voice_pipeline import VoicePipeline, VoiceError, SAMPLE_RATE, SAMPLE_WIDTH
+from weather_service import WeatherService, FakeOWM
+import city_gazetteer
 
 # Load environment variables
 load_dotenv()
 
-# Initialize text-to-speech engine
-try:
-    engine = pyttsx3.init()
-    voices = engine.getProperty('voices')
-    engine.setProperty('voice', voices[0].id)  # 0 for male, 1 for female
-    engine.setProperty('rate', 150)  # Speed of speech
-    engine.setProperty('volume', 1.0)  # Volume level (0.0 to 1.0)
-except Exception as e:
-    print(f"Could not initialize text-to-speech engine: {e}")
-
-# Load the spaCy model
-try:
-    nlp = spacy.load('en_core_web_sm')
-except:
-    print("Downloading language model for spaCy...")
-    import subprocess
-    import sys
-    subprocess.check_call([sys.executable, "-m", "spacy", "download", "en_core_web_sm"])
-    nlp = spacy.load('en_core_web_sm')
+# Heavy backends and long-lived services are only built the first time they
+# are used, so importing this module stays cheap for workers that only need
+# time or math answers, and it never starts threads or creates files.
+resources = ResourceRegistry()
+
+def _init_tts_engine():
+    """Initialize text-to-speech engine"""
+    import pyttsx3
+    tts_engine = pyttsx3.init()
+    voices = tts_engine.getProperty('voices')
+    tts_engine.setProperty('voice', voices[0].id)  # 0 for male, 1 for female
+    tts_engine.setProperty('rate', 150)  # Speed of speech
+    tts_engine.setProperty('volume', 1.0)  # Volume level (0.0 to 1.0)
+    return tts_engine
+
+def _load_spacy_model():
+    """Load the spaCy model, downloading it on first run"""
+    import spacy
+    try:
+        return spacy.load('en_core_web_sm')
+    except OSError:
+        print("Downloading language model for spaCy...")
+        import subprocess
+        import sys
+        subprocess.check_call([sys.executable, "-m", "spacy", "download", "en_core_web_sm"])
+        return spacy.load('en_core_web_sm')
 
 # Initialize APIs
 app_id = os.getenv('WOLFRAMALPHA_APP_ID', '')
-if app_id:
-    try:
-        client = wolframalpha.Client(app_id)
-    except Exception as e:
-        print(f"Warning: Could not initialize WolframAlpha client: {e}")
-        client = None
-else:
-    client = None
+
+def _init_wolfram_client():
+    """Build the WolframAlpha client when an app id is configured"""
+    if not app_id:
+        return None
+    import wolframalpha
+    return wolframalpha.Client(app_id)
 
 # Get the OpenWeatherMap API key
 weather_api_key = os.getenv('OPENWEATHER_API_KEY', '')
-if weather_api_key:
-    try:
-        weather_client = pyowm.OWM(weather_api_key)
-    except Exception as e:
-        print(f"Warning: Could not initialize OpenWeatherMap client: {e}")
-        weather_client = None
-else:
-    weather_client = None
+
+def _init_weather_client():
+    """Build the OpenWeatherMap client when an API key is configured (WEATHER_CLIENT=fake: offline stub)"""
+    if os.getenv('WEATHER_CLIENT', 'pyowm') == 'fake':
+        return FakeOWM()
+    if not weather_api_key:
+        return None
+    import pyowm
+    return pyowm.OWM(weather_api_key)
+
+engine = resources.register('tts_engine', _init_tts_engine)
+nlp = resources.register('nlp', _load_spacy_model)
+client = resources.register('wolframalpha', _init_wolfram_client)
+weather_client = resources.register('weather_client', _init_weather_client)
+# Known city names for weather queries (data/cities.txt), matched in one pass
+cities = resources.register('city_gazetteer', lambda: city_gazetteer.Gazetteer.load(
+    os.getenv('CITY_GAZETTEER_PATH', city_gazetteer.DEFAULT_PATH)))
+# Demo/offline news corpus (data/news_fixture.json), indexed once for BM25 search
+demo_news = resources.register('news_index', lambda: news_index.NewsIndex.load(
+    os.getenv('NEWS_FIXTURE_PATH', news_index.DEFAULT_PATH)))
+# Everything fetched (search results, news, article bodies), full-text indexed in SQLite
+knowledge = resources.register('knowledge', lambda: KnowledgeIndex(os.getenv('KNOWLEDGE_DB', 'knowledge.db')))
+
+def _make_tts_driver():
+    """Speech driver for the TTS worker; TTS_DRIVER=fake speaks nothing (tests, headless servers)"""
+    if os.getenv('TTS_DRIVER', 'pyttsx3') == 'fake':
+        return FakeDriver()
+    if resources.get('tts_engine') is None:
+        raise RuntimeError("Text-to-speech engine unavailable. Install it with: pip install pyttsx3 "
+                           "(Linux also needs espeak-ng)")
+    return Pyttsx3Driver(resources.get('tts_engine'))
+
+# Rendered speech clips, named by a hash of (text, rate, volume, voice)
+TTS_CACHE_DIR = os.getenv('TTS_CACHE_DIR', 'tts_cache')
+TTS_CACHE_MAX_MB = float(os.getenv('TTS_CACHE_MAX_MB', '64'))
+
+# One long-lived engine on a worker thread; speak() only queues
+tts = resources.register('tts', lambda: TTSService(
+    _make_tts_driver, max_queue=int(os.getenv('TTS_QUEUE_SIZE', '32')),
+    audio_cache=AudioCache(TTS_CACHE_DIR, max_bytes=int(TTS_CACHE_MAX_MB * 1024 * 1024))))
+
+# Offline speech recognition for voice commands, in a pool of worker processes.
+# Clips longer than VOICE_SYNC_MAX_SECONDS are answered through the job queue.
+VOICE_SYNC_MAX_SECONDS = float(os.getenv('VOICE_SYNC_MAX_SECONDS', '15'))
+voice = resources.register('voice', lambda: VoicePipeline(
+    lambda transcript: process_command(transcript), backend=os.getenv('VOICE_BACKEND', 'vosk'),
+    model_path=os.getenv('VOSK_MODEL_PATH', 'model'),
+    max_workers=int(os.getenv('VOICE_WORKERS', '2')),
+    end_silence=float(os.getenv('VOICE_END_SILENCE', '0.6')),
+    stream_max_seconds=float(os.getenv('VOICE_STREAM_MAX_SECONDS', '30'))))
+
+def _init_weather_service():
+    """Weather: city -> location id memoized for good, observations cached for
+    OpenWeatherMap's ten-minute update interval (sqlite shares both between workers)"""
+    kind = os.getenv('WEATHER_CACHE_BACKEND', 'memory')
+    path = os.getenv('WEATHER_CACHE_PATH', 'weather_cache.db')
+    return WeatherService(
+        weather_client, ttl=int(os.getenv('WEATHER_CACHE_TTL', '600')),
+        geocode_backend=make_cache_backend(kind, path=path, namespace='geocode', max_entries=100000),
+        observation_backend=make_cache_backend(kind, path=path, namespace='weather'))
+
+weather_service = resources.register('weather_service', _init_weather_service)
 
 # Greetings and responses
 GREETING_INPUTS = ("hello", "hi", "greetings", "sup", "what's up", "hey")
 GREETING_RESPONSES = ["Hello!", "Hi there!", "Hey!", "Hi! How can I help you today?"]
 
-# Reminders storage (in-memory, will be lost on server restart)
-reminders = []
-
-def speak(text, rate=200, volume=1.0, voice_id=None):
-    """Convert text to speech using pyttsx3 with configurable voice and settings"""
-    try:
-        import pyttsx3
-        
-        # Initialize the TTS engine
-        engine = pyttsx3.init()
-        
-        # Set properties
-        engine.setProperty('rate', rate)  # Speed of speech
-        engine.setProperty('volume', volume)  # Volume level (0.0 to 1.0)
-        
-        # Get available voices
-        voices = engine.getProperty('voices')
-        
-        # Set voice if specified, otherwise use default
-        if voice_id is not None and voice_id < len(voices):
-            engine.setProperty('voice', voices[voice_id].id)
-        
-        # Speak the text
-        engine.say(text)
-        engine.runAndWait()
-        
-        return text
-        
-    except ImportError:
-        print("pyttsx3 not installed. Please install it with: pip install pyttsx3")
-        return text
-    except Exception as e:
-        print(f"Error in text-to-speech: {e}")
-        return text
+# Persistent reminders (SQLite, WAL); the schema is migrated once, when the
+# store is first used. All reads and writes go through the repository, which
+# keeps pending reminders cached in memory (and owns the writer thread).
+reminder_store = resources.register('reminder_store', lambda: ReminderStore(os.getenv('REMINDERS_DB', 'reminders.db')))
+reminder_repository = resources.register('reminder_repository',
+                                         lambda: ReminderRepository(resources.get('reminder_store')))
+
+# Delivers reminders when they fall due once start_reminder_scheduler() has run;
+# undelivered ones wait in reminder_scheduler.queue
+reminder_scheduler = resources.register('reminder_scheduler',
+                                        lambda: ReminderScheduler(resources.get('reminder_repository')))
+
+# Server-push notifications (streamed to browsers by app.py's /events)
+notifications = EventBus()
+
+def publish_reminder(reminder):
+    """Scheduler callback that pushes a due reminder to every connected client
+
+    The scheduler has already marked the reminder completed, so when no client
+    is connected it waits in reminder_scheduler.queue instead: "show reminders"
+    (get_due_reminders) or the next /events subscriber picks it up from there.
+    """
+    if not len(notifications):
+        reminder_scheduler.queue.put(reminder)
+        return
+    notifications.publish('reminder', {
+        'id': reminder.id,
+        'text': reminder.text,
+        'due_at': reminder.due_at.isoformat(),
+    })
+
+def replay_undelivered_reminders():
+    """Push the reminders that fell due while no client was connected (call after subscribing)"""
+    for reminder in reminder_scheduler.drain():
+        publish_reminder(reminder)
+
+def start_reminder_scheduler(callback=None):
+    """Start timely reminder delivery (to callback, or to reminder_scheduler.queue)"""
+    if callback is not None:
+        reminder_scheduler.callback = callback
+    reminder_scheduler.start()
+
+def speak(text, rate=200, volume=1.0, voice_id=None, wait=False, to_file=False):
+    """Queue text for the text-to-speech worker; returns the job id (None if the queue is full)
+
+    Returns as soon as the text is queued unless wait is True. With to_file
+    the speech is rendered into the audio cache instead of played; the job's
+    clip names the file (see tts.clip_path), and phrases rendered before are
+    served from the cache without synthesizing them again.
+    """
+    job = tts.submit(text, rate=rate, volume=volume, voice_id=voice_id, to_file=to_file)
+    if job is None:
+        print(f"Text-to-speech queue is full, dropping: {text[:40]}")
+        return None
+    if wait:
+        job.wait()
+    return job.id
 
 def listen():
     """Listen to microphone input and convert to text"""
+    import speech_recognition as sr
     r = sr.Recognizer()
     with sr.Microphone() as source:
         print("Listening...")
@@ -108,10 +203,17 @@ def listen():
     
     try:
         print("Recognizing...")
-        query = r.recognize_google(audio, language='en-in')
+        try:
+            query = voice.transcribe_pcm(audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=SAMPLE_WIDTH))
+        except VoiceError as e:
+            # No offline recognizer available: fall back to Google's web API
+            print(f"Offline recognition unavailable ({e}), using Google")
+            query = r.recognize_google(audio, language='en-in')
+        if not query:
+            raise ValueError("empty transcript")
         print(f"User said: {query}")
         return query.lower()
-    except Exception as e:
+    except Exception:
         print("Could not understand audio")
         return None
 
@@ -133,7 +235,7 @@ def solve_math(query):
     """Solve mathematical expressions"""
     try:
         # First try WolframAlpha if API key is available
-        if client and app_id and app_id != 'YOUR_WOLFRAM_APP_ID':
+        if app_id and app_id != 'YOUR_WOLFRAM_APP_ID' and client:
             try:
                 res = client.query(query)
                 answer = next(res.results).text
@@ -141,124 +243,41 @@ def solve_math(query):
             except:
                 pass  # Fall through to basic calculator
         
-        # Basic arithmetic operations
-        original_query = query
-        query = query.lower()
-        
-        # Clean the query for better parsing
-        query = query.replace('what is', '').replace('whats', '').replace('calculate', '').strip()
-        
-        # Handle multiplication
-        if 'times' in query or 'multiplied by' in query or 'x' in query or '*' in query or '×' in query:
-            # Extract numbers using regex to handle various formats
-            import re
-            numbers = [float(n) for n in re.findall(r'\d+\.?\d*', query)]
-            if len(numbers) >= 2:
-                result = 1
-                for num in numbers:
-                    result *= num
-                return f"The result is {int(result) if result.is_integer() else result}."
-            
-            # Fallback to original method if regex fails
-            query = query.replace('times', '*').replace('multiplied by', '*').replace('x', '*').replace('×', '*').replace(' ', '')
-            parts = query.split('*')
-            if len(parts) >= 2:
-                try:
-                    a = float(parts[0])
-                    b = float(parts[1])
-                    result = a * b
-                    return f"The result is {int(result) if result.is_integer() else result}."
-                except (ValueError, IndexError):
-                    pass
-        
-        # Handle addition
-        if 'plus' in query or '+' in query or 'add' in query:
-            # Extract numbers using regex
-            import re
-            numbers = [float(n) for n in re.findall(r'\d+\.?\d*', query)]
-            if len(numbers) >= 2:
-                result = sum(numbers)
-                return f"The result is {int(result) if result.is_integer() else result}."
-            
-            # Fallback to original method if regex fails
-            query = query.replace('plus', '+').replace('add', '+').replace(' ', '')
-            parts = query.split('+')
-            if len(parts) >= 2:
-                try:
-                    numbers = [float(n) for n in parts if n.replace('.', '').replace('-', '').isdigit()]
-                    if len(numbers) >= 2:
-                        result = sum(numbers)
-                        return f"The result is {int(result) if result.is_integer() else result}."
-                except (ValueError, IndexError):
-                    pass
-        
-        # Handle subtraction
-        if 'minus' in query or '-' in query or 'subtract' in query:
-            # Extract numbers using regex
-            import re
-            numbers = [float(n) for n in re.findall(r'-?\d+\.?\d*', query)]
-            if len(numbers) >= 2:
-                result = numbers[0] - sum(numbers[1:])
-                return f"The result is {int(result) if result.is_integer() else result}."
-            
-            # Fallback to original method if regex fails
-            query = query.replace('minus', '-').replace('subtract', '-').replace(' ', '')
-            if query.startswith('-'):
-                parts = ['0'] + query[1:].split('-')
-            else:
-                parts = query.split('-')
-            if len(parts) >= 2:
-                try:
-                    a = float(parts[0])
-                    b = float(parts[1])
-                    result = a - b
-                    return f"The result is {int(result) if result.is_integer() else result}."
-                except (ValueError, IndexError):
-                    pass
-        
-        # Handle division
-        if 'divided by' in query or '/' in query or '÷' in query or 'divide' in query:
-            # Extract numbers using regex
-            import re
-            numbers = [float(n) for n in re.findall(r'\d+\.?\d*', query)]
-            if len(numbers) >= 2:
-                try:
-                    if numbers[1] == 0:
-                        return "Error: Division by zero is not allowed."
-                    result = numbers[0] / numbers[1]
-                    return f"The result is {result}."
-                except (ValueError, IndexError, ZeroDivisionError):
-                    pass
-            
-            # Fallback to original method if regex fails
-            query = query.replace('divided by', '/').replace('÷', '/').replace('divide', '/').replace(' ', '')
-            parts = query.split('/')
-            if len(parts) >= 2:
-                try:
-                    a = float(parts[0])
-                    b = float(parts[1])
-                    if b == 0:
-                        return "Error: Division by zero is not allowed."
-                    result = a / b
-                    return f"The result is {result}."
-                except (ValueError, IndexError, ZeroDivisionError):
-                    pass
-        
-        # Try to evaluate the expression directly as a last resort
-        try:
-            result = eval(query.replace(' ', '').replace('x', '*').replace('÷', '/'))
-            return f"The result is {result}."
-        except:
-            pass
-            
-        return "I couldn't understand the math problem. Please try rephrasing it."
+        # Safe local evaluation (spoken operators, precedence, parentheses)
+        return math_engine.respond(query)
         
     except Exception as e:
         return f"I encountered an error: {str(e)}. Please try a different query."
 
+def solve_math_batch(queries):
+    """Solve many math expressions at once, vectorized with NumPy (local engine only)"""
+    import math_batch
+    return math_batch.respond_many(queries)
+
 # Track the last search query for context
 last_search_query = None
 
+# Every outbound call goes through one pooled client (keep-alive, retries,
+# per-host concurrency caps, circuit breakers and latency histograms)
+http = resources.register('http', HttpClient)
+
+BING_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+ARTICLE_HEADERS = {
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+# Cache for web search results, keyed on the cleaned query.
+# SEARCH_CACHE_BACKEND=sqlite shares one cache file between worker processes.
+search_cache = resources.register('search_cache', lambda: ResultCache(
+    make_cache_backend(os.getenv('SEARCH_CACHE_BACKEND', 'memory'),
+                       path=os.getenv('SEARCH_CACHE_PATH', 'search_cache.db'), namespace='search'),
+    ttl=int(os.getenv('SEARCH_CACHE_TTL', '900')),
+    stale_ttl=int(os.getenv('SEARCH_CACHE_STALE_TTL', '3600')),
+))
+
 def _format_news_results(results, query):
     """Format news results into a readable string"""
     if not results:
@@ -308,14 +327,25 @@ def _format_news_results(results, query):
     
     return "".join(formatted)
 
-def get_trending_news(num_results=7):
-    """Get comprehensive trending news across ML, AI, and technology"""
+def get_trending_news(num_results=7, enrich=False):
+    """Get comprehensive trending news across ML, AI, and technology
+
+    With enrich=True the article pages are fetched too and their main text
+    replaces the (usually truncated) API content.
+    """
     try:
         # Get comprehensive trending news
         articles = get_news_api_articles('trending technology AI ML', num_results)
         
         if not articles:
             return "I couldn't fetch trending news at the moment. Please try again later."
+
+        # Demo/fixture articles are canned: their URLs are placeholders, not pages to fetch
+        live = [article for article in articles if not article.get('offline')]
+        if enrich and live:
+            bodies = {article.get('url'): article['body'] for article in enrich_news_articles(live)}
+            articles = [dict(article, content=bodies.get(article.get('url')) or article.get('content'))
+                        for article in articles]
         
         # Format comprehensive results
         formatted_results = []
@@ -362,6 +392,71 @@ def get_trending_news(num_results=7):
         print(f"Error fetching trending news: {e}")
         return "I'm having trouble fetching trending news right now. Please try again later."
 
+def _fetch_bing_results(query, num_results):
+    """Fetch a Bing results page and extract title/link/snippet dicts"""
+    # Try to use a simple search approach
+    search_url = f"https://www.bing.com/search?q={query.replace(' ', '+')}"
+    
+    # Make the request
+    response = http.get(search_url, headers=BING_HEADERS, timeout=10)
+    response.raise_for_status()
+    
+    # Extract title/link/snippet from the result items only
+    results = []
+    for title, link, snippet in html_extract.bing_results(response.text, num_results):
+        snippet = snippet or 'No description available'
+        if title and link:
+            results.append({
+                'title': title,
+                'link': link,
+                'snippet': snippet[:200] + '...' if len(snippet) > 200 else snippet
+            })
+    
+    return results
+
+# Search results and articles fetched within KNOWLEDGE_MAX_AGE seconds answer web
+# searches directly when at least KNOWLEDGE_MIN_HITS of them match (0 turns this off)
+KNOWLEDGE_MAX_AGE = int(os.getenv('KNOWLEDGE_MAX_AGE', '86400'))
+KNOWLEDGE_MIN_HITS = int(os.getenv('KNOWLEDGE_MIN_HITS', '3'))
+
+def _remember(documents, kind):
+    """Add fetched documents to the knowledge index; indexing problems never fail the request"""
+    try:
+        knowledge.add_many(documents, kind)
+    except Exception as e:
+        print(f"Error indexing {kind} results: {e}")
+
+def _remember_web_results(results):
+    _remember([{'url': result['link'], 'title': result['title'], 'snippet': result['snippet']}
+               for result in results], 'web')
+    return results
+
+def _known_results(query, num_results):
+    """Fresh search results for query from the knowledge index, or None if it knows too little"""
+    if KNOWLEDGE_MAX_AGE <= 0:
+        return None
+    try:
+        hits = knowledge.search(query, num_results, max_age=KNOWLEDGE_MAX_AGE)
+    except Exception as e:
+        print(f"Knowledge index error: {e}")
+        return None
+    if not hits or len(hits) < min(num_results, KNOWLEDGE_MIN_HITS):
+        return None
+    results = []
+    for hit in hits:
+        snippet = hit['snippet'] or hit['body'] or 'No description available'
+        results.append({'title': hit['title'], 'link': hit['url'],
+                        'snippet': snippet[:200] + '...' if len(snippet) > 200 else snippet})
+    return results
+
+# Answer when a search fails or finds nothing
+SEARCH_SUGGESTIONS = (
+    "Search Results for '{query}':\n\nI found information about '{query}'. Here are some suggestions:\n\n"
+    "1. Try searching for '{query}' on Google, Bing, or DuckDuckGo\n2. Look for official documentation or tutorials\n"
+    "3. Check Wikipedia for general information\n4. Visit relevant educational websites\n\n"
+    "For the most up-to-date information, I recommend searching directly on your preferred search engine."
+)
+
 def search_web(query, num_results=5):
     """Search the web and return results with snippets using DuckDuckGo"""
     try:
@@ -433,61 +528,23 @@ def search_web(query, num_results=5):
                 print(f"Error fetching news: {e}")
                 return "I'm having trouble fetching the news right now. Please try again later."
         
-        # Simple web search using requests-html for better compatibility
+        # Topics seen recently are answered from the knowledge index, without a network round trip
+        results = _known_results(query, num_results)
         try:
-            # Try to use a simple search approach
-            search_url = f"https://www.bing.com/search?q={query.replace(' ', '+')}"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-            }
-            
-            # Make the request
-            response = requests.get(search_url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            # Parse the HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Find search results
-            results = []
-            search_results = soup.find_all('li', class_='b_algo')[:num_results]
-            
-            for result in search_results:
-                try:
-                    # Extract title and link
-                    title_elem = result.find('h2')
-                    if title_elem:
-                        title_link = title_elem.find('a')
-                        if title_link:
-                            title = title_link.get_text(strip=True)
-                            link = title_link.get('href')
-                            
-                            # Extract snippet
-                            snippet_elem = result.find('p')
-                            snippet = snippet_elem.get_text(strip=True) if snippet_elem else 'No description available'
-                            
-                            if title and link:
-                                results.append({
-                                    'title': title,
-                                    'link': link,
-                                    'snippet': snippet[:200] + '...' if len(snippet) > 200 else snippet
-                                })
-                except Exception as e:
-                    print(f"Error processing result: {e}")
-                    continue
-                    
+            # Popular queries are answered from the cache instead of hitting Bing again
+            if results is None:
+                cache_key = f"bing:{num_results}:{' '.join(query.lower().split())}"
+                results = search_cache.get(
+                    cache_key, lambda: _remember_web_results(_fetch_bing_results(query, num_results)),
+                    should_cache=bool)
         except Exception as e:
             print(f"Search error: {e}")
             # Fallback to a simple informative response
-            return f"Search Results for '{query}':\n\nI found information about '{query}'. Here are some suggestions:\n\n1. Try searching for '{query}' on Google, Bing, or DuckDuckGo\n2. Look for official documentation or tutorials\n3. Check Wikipedia for general information\n4. Visit relevant educational websites\n\nFor the most up-to-date information, I recommend searching directly on your preferred search engine."
+            return SEARCH_SUGGESTIONS.format(query=query)
         
         if not results:
             # Provide helpful search suggestions
-            return f"Search Results for '{query}':\n\nI found information about '{query}'. Here are some suggestions:\n\n1. Try searching for '{query}' on Google, Bing, or DuckDuckGo\n2. Look for official documentation or tutorials\n3. Check Wikipedia for general information\n4. Visit relevant educational websites\n\nFor the most up-to-date information, I recommend searching directly on your preferred search engine."
+            return SEARCH_SUGGESTIONS.format(query=query)
         
         # Format the results
         formatted_results = []
@@ -507,148 +564,42 @@ def search_web(query, num_results=5):
         print(f"Unexpected error: {e}")
         return "An unexpected error occurred. Please try again later."
 
+def _build_news_aggregator():
+    """News sources: both NewsAPI endpoints (with a real key), plus any configured
+    RSS feeds (NEWS_RSS_FEEDS, comma-separated) and JSON fixture (NEWS_FIXTURE_PATH)"""
+    api_key = os.getenv('NEWS_API_KEY', 'demo')
+    sources = []
+    if api_key != 'demo':
+        sources.append(NewsAPISource(http, api_key, 'top-headlines'))
+        sources.append(NewsAPISource(http, api_key, 'everything'))
+    for feed_url in os.getenv('NEWS_RSS_FEEDS', '').split(','):
+        if feed_url.strip():
+            sources.append(RSSSource(http, feed_url.strip()))
+    if os.getenv('NEWS_FIXTURE_PATH'):
+        sources.append(JSONFixtureSource(os.getenv('NEWS_FIXTURE_PATH')))
+    return NewsAggregator(sources, deadline=float(os.getenv('NEWS_DEADLINE', '8')))
+
+# Its thread pool is only started when news is first asked for
+news_aggregator = resources.register('news_aggregator', _build_news_aggregator)
+
 def get_news_api_articles(query, num_results=5):
     """Get comprehensive news articles using NewsAPI.org"""
     try:
         # Use NewsAPI.org free tier
         api_key = os.getenv('NEWS_API_KEY', 'demo')  # Use demo key if no API key provided
         
-        if api_key == 'demo':
-            # Enhanced demo data with more comprehensive ML/AI news
-            comprehensive_articles = [
-                {
-                    'title': 'Revolutionary AI Model Achieves Human-Level Reasoning',
-                    'description': 'OpenAI\'s latest model demonstrates unprecedented capabilities in logical reasoning, problem-solving, and creative thinking, marking a significant milestone in artificial intelligence development.',
-                    'url': 'https://example.com/ai-reasoning-breakthrough',
-                    'source': {'name': 'AI Research Daily'},
-                    'publishedAt': '2024-01-07T15:30:00Z',
-                    'content': 'Researchers at OpenAI have unveiled a groundbreaking AI model that demonstrates human-level reasoning across multiple domains...'
-                },
-                {
-                    'title': 'Machine Learning Transforms Drug Discovery Process',
-                    'description': 'New ML algorithms are accelerating drug discovery by predicting molecular interactions with 95% accuracy, potentially reducing development time from years to months.',
-                    'url': 'https://example.com/ml-drug-discovery',
-                    'source': {'name': 'Biotech Innovation'},
-                    'publishedAt': '2024-01-07T14:15:00Z',
-                    'content': 'A team of researchers has developed machine learning models that can predict how different molecules will interact...'
-                },
-                {
-                    'title': 'Google Launches Advanced AI Assistant for Developers',
-                    'description': 'Google\'s new AI coding assistant promises to revolutionize software development with real-time code suggestions, bug detection, and automated testing capabilities.',
-                    'url': 'https://example.com/google-ai-assistant',
-                    'source': {'name': 'TechCrunch'},
-                    'publishedAt': '2024-01-07T13:45:00Z',
-                    'content': 'Google has announced a powerful new AI assistant designed specifically for software developers...'
-                },
-                {
-                    'title': 'Deep Learning Breakthrough in Computer Vision',
-                    'description': 'Researchers achieve 99.2% accuracy in object recognition using novel neural network architectures, opening new possibilities for autonomous vehicles and medical imaging.',
-                    'url': 'https://example.com/deep-learning-vision',
-                    'source': {'name': 'Computer Vision Weekly'},
-                    'publishedAt': '2024-01-07T12:20:00Z',
-                    'content': 'A breakthrough in deep learning has led to unprecedented accuracy in computer vision tasks...'
-                },
-                {
-                    'title': 'AI-Powered Climate Modeling Predicts Weather Patterns',
-                    'description': 'New artificial intelligence systems are providing more accurate weather predictions and climate modeling, helping scientists better understand global climate change.',
-                    'url': 'https://example.com/ai-climate-modeling',
-                    'source': {'name': 'Climate Science Today'},
-                    'publishedAt': '2024-01-07T11:10:00Z',
-                    'content': 'Artificial intelligence is revolutionizing climate science with new predictive models...'
-                },
-                {
-                    'title': 'Neural Networks Revolutionize Financial Trading',
-                    'description': 'Wall Street adopts advanced neural networks for high-frequency trading, achieving 40% better returns while reducing market volatility through predictive analytics.',
-                    'url': 'https://example.com/ai-financial-trading',
-                    'source': {'name': 'Financial AI Review'},
-                    'publishedAt': '2024-01-07T10:30:00Z',
-                    'content': 'Financial institutions are increasingly turning to neural networks for trading strategies...'
-                },
-                {
-                    'title': 'Machine Learning Detects Early Signs of Cancer',
-                    'description': 'New ML algorithms can detect cancer in medical scans with 98% accuracy, often identifying tumors months before traditional methods.',
-                    'url': 'https://example.com/ml-cancer-detection',
-                    'source': {'name': 'Medical AI Advances'},
-                    'publishedAt': '2024-01-07T09:45:00Z',
-                    'content': 'Machine learning is transforming cancer diagnosis with early detection capabilities...'
-                }
-            ]
-            
-            # Enhanced filtering based on query
-            query_lower = query.lower()
-            if any(term in query_lower for term in ['ml', 'machine learning', 'ai', 'artificial intelligence', 'news', 'latest', 'top stories', 'trending']):
-                # Return comprehensive results for ML/AI queries
-                return comprehensive_articles[:num_results]
-            else:
-                # Filter based on specific query terms
-                filtered_articles = []
-                for article in comprehensive_articles:
-                    if any(word in article['title'].lower() or word in article['description'].lower() 
-                           for word in query_lower.split()):
-                        filtered_articles.append(article)
-                return filtered_articles[:num_results] if filtered_articles else comprehensive_articles[:3]
-            
-        # Real API call (when API key is provided)
-        # Try multiple endpoints for comprehensive coverage
-        articles = []
-        
-        # Get trending headlines first
-        if any(term in query.lower() for term in ['trending', 'top stories', 'latest', 'news']):
-            headlines_url = f"https://newsapi.org/v2/top-headlines?category=technology&apiKey={api_key}&language=en&pageSize=10"
-            try:
-                response = requests.get(headlines_url, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get('status') == 'ok' and data.get('articles'):
-                        for article in data['articles']:
-                            if article.get('title') and article.get('url'):
-                                articles.append({
-                                    'title': article['title'],
-                                    'description': article.get('description', ''),
-                                    'url': article['url'],
-                                    'source': article.get('source', {}).get('name', 'Unknown'),
-                                    'publishedAt': article.get('publishedAt', ''),
-                                    'content': article.get('content', '')
-                                })
-            except Exception as e:
-                print(f"Error fetching headlines: {e}")
-        
-        # Get specific search results
-        search_url = f"https://newsapi.org/v2/everything?q={query}&apiKey={api_key}&language=en&sortBy=publishedAt&pageSize={num_results}"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        
-        try:
-            response = requests.get(search_url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data.get('status') == 'ok' and data.get('articles'):
-                for article in data['articles']:
-                    if article.get('title') and article.get('url'):
-                        articles.append({
-                            'title': article['title'],
-                            'description': article.get('description', ''),
-                            'url': article['url'],
-                            'source': article.get('source', {}).get('name', 'Unknown'),
-                            'publishedAt': article.get('publishedAt', ''),
-                            'content': article.get('content', '')
-                        })
-        except Exception as e:
-            print(f"Error fetching search results: {e}")
-        
-        # Remove duplicates and return
-        seen_titles = set()
-        unique_articles = []
-        for article in articles:
-            if article['title'] not in seen_titles:
-                seen_titles.add(article['title'])
-                unique_articles.append(article)
-        
-        return unique_articles[:num_results]
+        if api_key == 'demo' and not news_aggregator.sources:
+            # Offline: rank the demo corpus; if nothing matches, show the newest stories
+            return demo_news.search(query, num_results) or demo_news.recent(3)
+
+        # Real API call (when API key is provided): all sources are queried
+        # concurrently and merged, deduplicated by normalized title and URL
+        articles = news_aggregator.aggregate(query, num_results)
+        _remember([{'url': article['url'], 'title': article['title'],
+                    'snippet': article.get('description') or article.get('content'),
+                    'source': article.get('source'), 'published': parse_published(article.get('publishedAt'))}
+                   for article in articles], 'news')
+        return articles
         
     except Exception as e:
         print(f"Error fetching news from API: {e}")
@@ -658,161 +609,73 @@ def get_google_news(query, num_results=3):
     """Get news articles - wrapper function that uses News API"""
     return get_news_api_articles(query, num_results)
 
+# Extracted article bodies, cached on disk by content hash and revalidated with
+# ETag/Last-Modified once they are older than ARTICLE_CACHE_MAX_AGE seconds.
+# The cache database is only opened when the first article is fetched.
+article_cache = resources.register('article_cache', lambda: ArticleCache(
+    os.getenv('ARTICLE_CACHE_PATH', 'article_cache.db')))
+article_fetcher = ArticleFetcher(
+    http, html_extract.extract_article_text,
+    cache=article_cache,
+    max_age=int(os.getenv('ARTICLE_CACHE_MAX_AGE', '3600')),
+    headers=ARTICLE_HEADERS,
+)
+
+def _fetch_article_body(url, timeout=10):
+    """Article text through the article cache, also recorded in the knowledge index"""
+    body = article_fetcher.fetch(url, timeout=timeout)
+    if body:
+        try:
+            knowledge.add_body(url, body)
+        except Exception as e:
+            print(f"Error indexing article body: {e}")
+    return body
+
 def fetch_article_content(url):
     """Fetch and extract main content from a news article URL"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept-Language': 'en-US,en;q=0.9',
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code != 200:
-            return None
-            
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Try to find the main article content
-        content_selectors = [
-            'article',
-            'div.article-body',
-            'div.article-content',
-            'div.story-body',
-            'div.entry-content',
-            'div.post-content',
-            'div[itemprop="articleBody"]',
-            'div.article__content',
-            'div.article-text',
-            'div.content__body',
-            'div.post__content'
-        ]
-        
-        for selector in content_selectors:
-            article = soup.select_one(selector)
-            if article:
-                # Remove unwanted elements
-                for elem in article.find_all(['script', 'style', 'nav', 'footer', 'aside']):
-                    elem.decompose()
-                
-                # Get all text content
-                text = ' '.join(p.get_text(' ', strip=True) for p in article.find_all(['p', 'h2', 'h3', 'h4']))
-                if len(text) > 100:  # Ensure we have meaningful content
-                    return ' '.join(text.split()[:200]) + '...'  # Return first 200 words
-                
-                return None
-        
+        return _fetch_article_body(url)
     except Exception as e:
         print(f"Error fetching article content: {e}")
         return None
 
-    return None
+def enrich_news_articles(articles, max_workers=None, timeout=None):
+    """Fetch article bodies concurrently; yields each article (with a 'body' key) as soon as it is ready"""
+    timeout = timeout or float(os.getenv('ARTICLE_ENRICH_TIMEOUT', '5'))
+    return enrich_articles(
+        articles, _fetch_article_body,
+        max_workers=max_workers or int(os.getenv('ARTICLE_ENRICH_WORKERS', '6')),
+        timeout=timeout,
+        fetch_budget=http.max_duration(timeout),  # a fetch retries through the shared client
+    )
 
 def parse_reminder_time(time_str):
     """Parse natural language time expressions into datetime objects"""
     if not time_str:
         return None
-        
-    now = datetime.datetime.now()
-    time_str = time_str.lower()
-    
-    # Handle "in X minutes/hours"
-    time_match = re.search(r'in\s+(\d+)\s+(minute|hour|day|week)s?', time_str)
-    if time_match:
-        value = int(time_match.group(1))
-        unit = time_match.group(2)
-        
-        if unit.startswith('min'):
-            return now + datetime.timedelta(minutes=value)
-        elif unit.startswith('hour'):
-            return now + datetime.timedelta(hours=value)
-        elif unit.startswith('day'):
-            return now + datetime.timedelta(days=value)
-        elif unit.startswith('week'):
-            return now + datetime.timedelta(weeks=value)
-    
-    # Handle "at 3 PM" or "at 15:30"
-    time_match = re.search(r'at\s+(\d{1,2})(?::(\d{2}))?\s*(am|pm)?', time_str)
-    if time_match:
-        hour = int(time_match.group(1))
-        minute = int(time_match.group(2) or 0)
-        period = time_match.group(3)
-        
-        # Convert 12-hour to 24-hour format
-        if period:
-            if period == 'pm' and hour < 12:
-                hour += 12
-            elif period == 'am' and hour == 12:
-                hour = 0
-        
-        # Create datetime for today at the specified time
-        reminder_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        
-        # If the time has already passed today, schedule for tomorrow
-        if reminder_time < now:
-            reminder_time += datetime.timedelta(days=1)
-            
-        return reminder_time
-    
-    # Handle "tomorrow at [time]"
-    if 'tomorrow' in time_str:
-        tomorrow = now + datetime.timedelta(days=1)
-        time_match = re.search(r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)?', time_str)
-        if time_match:
-            hour = int(time_match.group(1))
-            minute = int(time_match.group(2) or 0)
-            period = time_match.group(3)
-            
-            if period:
-                if period == 'pm' and hour < 12:
-                    hour += 12
-                elif period == 'am' and hour == 12:
-                    hour = 0
-            
-            return tomorrow.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        return tomorrow.replace(hour=9, minute=0, second=0, microsecond=0)  # Default to 9 AM tomorrow
-    
-    return None
-
-def init_database():
-    """Initialize SQLite database for reminders"""
-    conn = sqlite3.connect('reminders.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS reminders (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            reminder_text TEXT NOT NULL,
-            reminder_time DATETIME NOT NULL,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            is_completed BOOLEAN DEFAULT 0
-        )
-    ''')
-    conn.commit()
-    return conn
+    return time_parser.parse(time_str)
 
 def set_reminder(reminder_text, time_str=None):
     """Set a reminder with natural language time parsing"""
     try:
-        # Initialize database connection
-        conn = init_database()
-        cursor = conn.cursor()
-        
-        # Parse the reminder time
+        # Parse the reminder time (and the repeat rule of "every ..." phrases)
         reminder_time = parse_reminder_time(time_str) if time_str else None
+        rule = time_parser.rule_string(time_parser.compile_phrase(time_str)) if reminder_time else None
+        rule = recurrence.anchor(rule, reminder_time) if rule else None  # monthly series keep their day
         
         # If no specific time, set default (1 hour from now)
         if not reminder_time:
             reminder_time = datetime.datetime.now() + datetime.timedelta(hours=1)
             response = f"I'll remind you in 1 hour: {reminder_text}"
+        elif rule:
+            response = f"I'll remind you {recurrence.describe(rule)}, starting {reminder_time.strftime('%A, %B %d')}: {reminder_text}"
         else:
             response = f"I'll remind you at {reminder_time.strftime('%I:%M %p')} on {reminder_time.strftime('%A, %B %d')}: {reminder_text}"
         
         # Save to database
-        cursor.execute(
-            'INSERT INTO reminders (reminder_text, reminder_time) VALUES (?, ?)',
-            (reminder_text, reminder_time.isoformat())
-        )
-        conn.commit()
-        conn.close()
+        reminder = reminder_repository.add(reminder_text, reminder_time, rule)
+        if reminder_scheduler.running:
+            reminder_scheduler.schedule(reminder.id, reminder.text, reminder.due_at)
         
         return response
         
@@ -823,28 +686,10 @@ def set_reminder(reminder_text, time_str=None):
 def get_due_reminders():
     """Get reminders that are due"""
     try:
-        conn = sqlite3.connect('reminders.db')
-        cursor = conn.cursor()
-        
-        now = datetime.datetime.now().isoformat()
-        cursor.execute(
-            'SELECT id, reminder_text FROM reminders WHERE reminder_time <= ? AND is_completed = 0 ORDER BY reminder_time',
-            (now,)
-        )
-        
-        reminders = cursor.fetchall()
-        
-        # Mark reminders as completed
-        for reminder_id, _ in reminders:
-            cursor.execute(
-                'UPDATE reminders SET is_completed = 1 WHERE id = ?',
-                (reminder_id,)
-            )
-        
-        conn.commit()
-        conn.close()
-        
-        return [text for _, text in reminders]
+        # Reminders the scheduler already delivered, then any others that are due
+        # (both are marked completed as they are returned)
+        delivered = [reminder.text for reminder in reminder_scheduler.drain()]
+        return delivered + reminder_repository.claim_due(datetime.datetime.now())
         
     except Exception as e:
         print(f"Error getting reminders: {e}")
@@ -856,141 +701,209 @@ def get_weather(city=""):
             # Default to a city if none specified, or ask for location
             return "Please specify a city for the weather, like 'weather in New York'."
 
-        obs = weather_client.weather_at_place(city)
-        weather = obs.weather
-        temperature = weather.temperature('celsius')
-        description = weather.detailed_status
+        conditions = weather_service.weather(city)
+        if conditions is None:
+            return f"I couldn't find a city called '{city}'. Please check the name and try again."
 
-        return f"Weather in {city}: {description}. Temperature: {temperature['temp']}°C (feels like {temperature['feels_like']}°C)."
+        return f"Weather in {city}: {conditions['detailed_status']}. Temperature: {conditions['temp']}°C (feels like {conditions['feels_like']}°C)."
 
     except Exception as e:
+        print(f"Error getting weather: {e}")
         return "I couldn't get the weather information. Please check the city name or try again later."
 
-def extract_city_from_query(query):
-    # Simple extraction of city names from weather queries
-    # This is a basic implementation - could be improved with better NLP
-    doc = nlp(query)
-
-    # Look for proper nouns (likely city names) after "weather in" or similar
-    words = [token.text for token in doc if token.pos_ == "PROPN"]
-
-    # If we find words after "in", take those as city name
-    query_lower = query.lower()
-    if "weather in" in query_lower:
-        in_index = query_lower.find("weather in") + len("weather in")
-        city_part = query[in_index:].strip()
-        return city_part
-    elif "in" in query_lower and "weather" in query_lower:
-        # Try to find city name after "in"
-        parts = query_lower.split("in")
-        if len(parts) > 1:
-            city_part = parts[1].strip()
-            # Take first word as city (simplified)
-            return city_part.split()[0]
-
-    # Default fallback
+# Words after "in"/"at"/"for" up to a time word or punctuation: the last-resort guess at a city
+CITY_AFTER_PREPOSITION_RE = re.compile(
+    r"\b(?:in|at|for)\s+([a-z][\w .'-]*?)\s*(?:\b(?:today|tomorrow|tonight|now|right now|this week|please)\b|[?!.,]|$)",
+    re.IGNORECASE)
+
+def _ner_only(model):
+    """Pipeline components to disable so only the entity recognizer (and a shared tok2vec it may use) runs"""
+    return [name for name in model.pipe_names if name not in ('ner', 'tok2vec')]
+
+def _ner_city(query):
+    """First place spaCy's entity recognizer finds, running only the NER"""
+    model = resources.get('nlp')
+    if model is None:
+        return ""
+    for ent in model(query, disable=_ner_only(model)).ents:
+        if ent.label_ in ('GPE', 'LOC'):
+            return ent.text
     return ""
 
+@lru_cache(maxsize=4096)
+def extract_city_from_query(query):
+    """City a weather query is about: known city names first, then spaCy NER, then the words after 'in'"""
+    gazetteer = resources.get('city_gazetteer')
+    city = gazetteer.find(query) if gazetteer is not None else None
+    if city:
+        return city
+    city = _ner_city(query)
+    if city:
+        return city
+    match = CITY_AFTER_PREPOSITION_RE.search(query)
+    return match.group(1).strip() if match else ""
 
 def get_reminders():
     """Get all active reminders"""
-    if not reminders:
+    pending = reminder_repository.list()
+    if not pending:
         return "You have no reminders set."
     
     current_time = datetime.datetime.now()
     active_reminders = []
     
-    for i, reminder in enumerate(reminders, 1):
-        if reminder['time'] and reminder['time'] <= current_time:
-            active_reminders.append(f"{i}. {reminder['text']} (Due: {reminder['time'].strftime('%I:%M %p')})")
+    for i, reminder in enumerate(pending, 1):
+        if reminder.due_at.date() == current_time.date():
+            due = reminder.due_at.strftime('%I:%M %p')
         else:
-            active_reminders.append(f"{i}. {reminder['text']}")
+            due = reminder.due_at.strftime('%a %b %d, %I:%M %p')
+        if reminder.rule:
+            due += f", repeats {recurrence.describe(reminder.rule)}"
+        active_reminders.append(f"{i}. {reminder.text} (Due: {due})")
     
     return "Here are your reminders:\n" + "\n".join(active_reminders)
 
+# Intent routing: every handler registers its trigger phrases with the router,
+# which compiles them into a single matcher. Higher priority wins when a
+# command triggers several intents, so specific intents (reminders, news,
+# weather) rank above ones triggered by a generic word ("time", "hi").
+router = IntentRouter()
+
+# Operator symbols are not triggers: "covid-19 news" or "c++ tutorials" are not
+# math. Symbolic arithmetic is routed by its numbers (math_number below).
+MATH_INDICATORS = ['plus', 'minus', 'times', 'divided by', 'multiplied by',
+                   'add', 'subtract', 'multiply', 'divide', 'calculate', 'solve', 'math']
+SEARCH_STOP_WORDS = ['search', 'for', 'find', 'about', 'look', 'up', 'google']
+
+router.register('time', lambda command: get_time(),
+                triggers=['time', 'what time', 'current time'], priority=70)
+router.register('date', lambda command: get_date(),
+                triggers=['date', 'what day', "today's date", 'what is today', "what's today"], priority=65)
+router.register('greeting', lambda command: greet(), triggers=GREETING_INPUTS, priority=55)
+
+@router.intent('math', triggers=MATH_INDICATORS, priority=60)
+def _handle_math(command):
+    response = solve_math(command)
+    if response == math_engine.PARSE_ERROR_MESSAGE:
+        return None  # e.g. "calculate half of 10": let search answer
+    return response
+
+# A bare number is a weaker math signal than an operator word
+@router.intent('math_number', triggers=[NUMBER], priority=35)
+def _handle_number(command):
+    try:
+        tree = math_engine.parse(command)
+    except math_engine.MathError:
+        return None  # Not arithmetic after all; let another intent answer
+    if tree[0] in ('num', 'neg'):
+        return None  # A lone (signed) number, e.g. "covid-19"
+    return solve_math(command)
+
+@router.intent('weather', triggers=['weather', 'temperature', 'forecast', 'how is the weather'], priority=80)
+def _handle_weather(command):
+    city = extract_city_from_query(command)
+    return get_weather(city)
+
+@router.intent('comprehensive_news', triggers=['all details from api', 'fetch all details', 'comprehensive news',
+                                               'all ml ai news', 'all trending news'], priority=85)
+def _handle_comprehensive_news(command):
+    return get_trending_news(7, enrich=True)
+
+@router.intent('trending_news', triggers=['trending', 'top stories', 'latest news', 'all news'], priority=75)
+def _handle_trending_news(command):
+    return get_trending_news(5)
+
+@router.intent('search', triggers=['search', 'find', 'google', 'look up', 'who is', 'what is', 'where is', '?'],
+               priority=30)
+def _handle_search(command):
+    # Clean the query by removing common search verbs
+    clean_query = ' '.join([word for word in command.split()
+                            if word.lower() not in SEARCH_STOP_WORDS])
+
+    # If the query is too short after cleaning, ask for more details
+    if len(clean_query.strip()) < 3:
+        return "I need more details to search. What specifically are you looking for?"
+
+    # Perform the search directly
+    return search_web(clean_query)
+
+@router.intent('set_reminder', triggers=['remind', 'reminder', 'remember', 'alert', 'notify'], priority=90)
+def _handle_set_reminder(command):
+    # Try to extract reminder text and time
+    reminder_text = command
+
+    # Look for a time expression
+    span = time_parser.find(command)
+
+    if span:
+        time_str = command[span[0]:span[1]]
+        reminder_text = reminder_text[:span[0]] + reminder_text[span[1]:]
+    else:
+        time_str = None
+
+    # Clean up reminder text
+    reminder_text = re.sub(r'\b(remind|me|to|set|a|an|the|about|that|please|would you|can you|could you)\b', '', reminder_text, flags=re.IGNORECASE)
+    reminder_text = ' '.join(reminder_text.split())
+
+    if not reminder_text:
+        return "What would you like me to remind you about?"
+
+    return set_reminder(reminder_text, time_str)
+
+@router.intent('list_reminders', triggers=['my reminders', 'show reminders', 'list reminders', 'any reminders'],
+               priority=95)
+def _handle_list_reminders(command):
+    due = get_due_reminders()
+    if due:
+        return "🔔 Reminders:\n" + "\n\n".join([f"• {reminder}" for reminder in due])
+    if reminder_repository.count():
+        return get_reminders()
+    return "You don't have any pending reminders."
+
 def process_command(command):
     """Process user command and return appropriate response"""
     if not command or not command.strip():
         return "I didn't catch that. Could you please repeat?"
-    
-    command_lower = command.lower()
-    
-    # Check for greetings
-    if any(greeting in command_lower for greeting in GREETING_INPUTS):
-        return greet()
-    
-    # Check for time/date queries
-    if any(word in command_lower for word in ['time', 'what time', 'current time']):
-        return get_time()
-    if any(word in command_lower for word in ['date', 'today', 'what day']):
-        return get_date()
-    
-    # Check for math queries
-    math_indicators = ['+', '-', '*', '/', '=', 'plus', 'minus', 'times', 'divided by', 'add', 'subtract', 'multiply', 'divide', 'calculate', 'solve', 'math']
-    if any(word in command_lower for word in math_indicators) or any(word.isdigit() for word in command_lower.split()):
-        return solve_math(command)
-    
-    # Check for weather queries
-    if any(word in command_lower for word in ['weather', 'temperature', 'forecast', 'how is the weather']):
-        city = extract_city_from_query(command)
-        return get_weather(city)
-    
-    # Check for comprehensive news requests
-    if any(phrase in command_lower for phrase in ['all details from api', 'fetch all details', 'comprehensive news', 'all ml ai news', 'all trending news']):
-        return get_trending_news(7)
-    
-    # Check for trending news requests
-    if any(word in command_lower for word in ['trending', 'top stories', 'latest news', 'all news']):
-        return get_trending_news(5)
-    
-    # Check for search queries
-    if any(word in command_lower for word in ['search', 'find', 'google', 'look up', 'who is', 'what is', 'where is']) or '?' in command_lower:
-        # Clean the query by removing common search verbs
-        clean_query = ' '.join([word for word in command.split() 
-                              if word.lower() not in ['search', 'for', 'find', 'about', 'look', 'up', 'google']])
-        
-        # If the query is too short after cleaning, ask for more details
-        if len(clean_query.strip()) < 3:
-            return "I need more details to search. What specifically are you looking for?"
-            
-        # Perform the search directly
-        return search_web(clean_query)
-    
-    # Check for reminder queries
-    reminder_indicators = ['remind', 'reminder', 'remember', 'alert', 'notify']
-    if any(word in command_lower for word in reminder_indicators):
-        # Try to extract reminder text and time
-        reminder_text = command
-        time_match = None
-        
-        # Look for time patterns
-        time_match = re.search(r'(at\s+\d{1,2}(?::\d{2})?\s*(?:am|pm)?|in\s+\d+\s+(?:minute|hour|day|week)s?|tomorrow)', command_lower)
-        
-        if time_match:
-            time_str = time_match.group(1)
-            reminder_text = reminder_text.replace(time_str, '')
-        else:
-            time_str = None
-        
-        # Clean up reminder text
-        reminder_text = re.sub(r'\b(remind|me|to|set|a|an|the|about|that|please|would you|can you|could you)\b', '', reminder_text, flags=re.IGNORECASE)
-        reminder_text = reminder_text.strip()
-        
-        if not reminder_text:
-            return "What would you like me to remind you about?"
-            
-        return set_reminder(reminder_text, time_str if time_match else None)
-    
-    # Check for list reminders
-    if any(word in command_lower for word in ['my reminders', 'show reminders', 'list reminders', 'any reminders']):
-        reminders = get_due_reminders()
-        if reminders:
-            return "🔔 Reminders:\n" + "\n\n".join([f"• {reminder}" for reminder in reminders])
-        return "You don't have any pending reminders."
-    
+
+    response = router.dispatch(command)
+    if response is not None:
+        return response
+
     # If the command is short or seems like a search query
     if len(command.split()) < 5 or any(len(word) > 15 for word in command.split()):
         return search_web(command)
-    
+
     # Default response for unknown commands
     return "I'm not sure how to help with that. You can ask me about the time, weather, to set reminders, do math, or search the web."
+
+def classify_command(command):
+    """Intent process_command would try first for a command, without running any handler"""
+    if not command or not command.strip():
+        return 'empty'
+    candidates = router.route(command)
+    if candidates:
+        return candidates[0].name
+    if len(command.split()) < 5 or any(len(word) > 15 for word in command.split()):
+        return 'search'
+    return 'unknown'
+
+def analyze_commands(commands, batch_size=256, n_process=1, model=None):
+    """Yield (command, intent, entities) for each command, lazily, for offline analysis of command logs
+
+    Commands stream through spaCy's nlp.pipe batch_size at a time (n_process > 1
+    spreads the batches over worker processes) with every component except the
+    entity recognizer disabled. entities is a list of (text, label) pairs.
+    """
+    model = model if model is not None else resources.get('nlp')
+    if model is None:
+        raise RuntimeError("spaCy model unavailable. Install it with: python -m spacy download en_core_web_sm")
+    docs = model.pipe(((command or '', command) for command in commands), as_tuples=True,
+                      batch_size=batch_size, n_process=n_process, disable=_ner_only(model))
+    for doc, command in docs:
+        yield command, classify_command(command), [(ent.text, ent.label_) for ent in doc.ents]
+
+# Optionally build backends in the background at startup,
+# e.g. PREWARM_RESOURCES=nlp,weather_client (or "all")
+_prewarm = os.getenv('PREWARM_RESOURCES', '').strip()
+if _prewarm:
+    resources.prewarm(None if _prewarm == 'all' else [name.strip() for name in _prewarm.split(',')])
@@ -1,20 +1,28 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, Response, render_template, request, jsonify, send_file, send_from_directory, url_for
 from flask_cors import CORS
 import agent
+from voice_pipeline import VoiceError, decode_audio, duration
+from weather_service import WeatherError
+import json
 import os
-from werkzeug.utils import secure_filename
+import re
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-# Configure upload folder for voice messages
-UPLOAD_FOLDER = 'uploads'
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
-
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Voice uploads are decoded in memory, never written to disk
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
+# Push reminders to connected browsers as they fall due. Under the debug
+# reloader only the child process that actually serves requests starts it.
+# Worker processes started with spawn/forkserver import this module as __mp_main__; they serve nothing.
+_serving_process = ((__name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true')
+                    and __name__ != '__mp_main__')
+if os.getenv('REMINDER_SCHEDULER', '1') != '0' and _serving_process:
+    agent.start_reminder_scheduler(agent.publish_reminder)
+
+SSE_HEARTBEAT = float(os.getenv('SSE_HEARTBEAT', '15'))
+
 # Serve static files
 @app.route('/static/<path:path>')
 def send_static(path):
@@ -40,22 +48,32 @@ def ask():
             })
             
         elif 'audio' in request.files:
-            # Voice input
+            # Voice input, decoded and transcribed in memory
             audio_file = request.files['audio']
             if audio_file.filename == '':
                 return jsonify({'error': 'No selected file'}), 400
-                
-            if audio_file:
-                filename = secure_filename(audio_file.filename)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                audio_file.save(filepath)
-                
-                # Here you would typically process the audio file
-                # For now, we'll just return a placeholder response
-                return jsonify({
-                    'response': 'Voice command received. Processing...',
-                    'type': 'voice'
-                })
+
+            try:
+                pcm = decode_audio(audio_file.read())
+            except VoiceError as e:
+                return jsonify({'error': str(e)}), 400
+
+            # Long clips (or mode=job) are answered through the job queue
+            if request.form.get('mode') == 'job' or duration(pcm) > agent.VOICE_SYNC_MAX_SECONDS:
+                job = agent.voice.submit(pcm)
+                if job is None:
+                    return jsonify({'error': 'Too many voice commands queued, try again later'}), 503
+                return jsonify(dict(job.to_dict(), type='voice')), 202
+
+            try:
+                transcript = agent.voice.transcribe_pcm(pcm)
+            except VoiceError as e:  # no recognizer available on this server
+                return jsonify({'error': str(e)}), 503
+            return jsonify({
+                'response': agent.voice.respond(transcript),
+                'transcript': transcript,
+                'type': 'voice'
+            })
         
         return jsonify({'error': 'Invalid request'}), 400
         
@@ -64,20 +82,147 @@ def ask():
             'error': f'An error occurred: {str(e)}'
         }), 500
 
+@app.route('/ask/jobs/<job_id>')
+def ask_job(job_id):
+    """Status of a queued voice command; transcript and response once it is done"""
+    job = agent.voice.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(dict(job.to_dict(), type='voice'))
+
+# Cities one /weather request may ask for (each never-seen name costs an upstream call)
+WEATHER_BATCH_MAX = 50
+
+@app.route('/weather')
+def weather():
+    """Current weather for several cities: /weather?city=London&city=Paris or /weather?cities=London,Paris"""
+    cities = request.args.getlist('city') + request.args.get('cities', '').split(',')
+    cities = [city.strip() for city in cities if city.strip()]
+    if not cities:
+        return jsonify({'error': 'No cities given'}), 400
+    if len(cities) > WEATHER_BATCH_MAX:
+        return jsonify({'error': f'At most {WEATHER_BATCH_MAX} cities per request'}), 400
+    try:
+        results = agent.weather_service.weather_for(cities)
+    except WeatherError as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        print(f"Error getting weather: {e}")
+        return jsonify({'error': 'Weather service unavailable, try again later'}), 502
+    return jsonify({'weather': results})
+
+# Streamed audio is read 0.1 s at a time (16 kHz mono 16-bit PCM)
+STREAM_READ_BYTES = 3200
+
+@app.route('/ask/stream', methods=['POST'])
+def ask_stream():
+    """Streamed voice command: 16 kHz mono 16-bit PCM (or WAV) uploaded with chunked encoding
+
+    Answers with newline-delimited JSON events while the audio is still
+    arriving: speech_start, partial transcripts, speech_end and, as soon as
+    the speaker stops, the final transcript and response.
+
+    Reading the answer while still uploading needs a full-duplex HTTP
+    client (a native app, a device, or the benchmark's urllib client).
+    Browsers' fetch() only exposes the response once the request body has
+    been sent, so the web UI uploads finished recordings to /ask instead.
+    """
+    try:
+        voice_stream = agent.voice.stream()
+    except VoiceError as e:
+        return jsonify({'error': str(e)}), 503
+    source = request.stream
+
+    def events():
+        try:
+            while not voice_stream.done:
+                chunk = source.read(STREAM_READ_BYTES)
+                batch = voice_stream.feed(chunk) if chunk else voice_stream.finish()
+                for event in batch:
+                    yield json.dumps(event) + '\n'
+        except Exception as e:
+            print(f"Error in voice stream: {e}")
+            yield json.dumps({'event': 'error', 'error': str(e)}) + '\n'
+        finally:
+            voice_stream.close()
+
+    return Response(events(), mimetype='application/x-ndjson', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+@app.route('/events')
+def events():
+    """Server-Sent Events stream of due reminders and other notifications"""
+    # EventSource sends Last-Event-ID when it reconnects; missed events are replayed
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    subscription = agent.notifications.subscribe(last_event_id)
+    agent.replay_undelivered_reminders()
+
+    def stream():
+        try:
+            yield 'retry: 3000\n\n'
+            for message in subscription.messages(heartbeat=SSE_HEARTBEAT):
+                yield message
+        finally:
+            subscription.close()
+
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # Don't let nginx buffer the stream
+    })
+
+def _job_response(job):
+    info = job.to_dict()
+    if job.clip:
+        info['audio_url'] = url_for('speech_clip', key=job.clip)
+    return info
+
 @app.route('/speak', methods=['POST'])
 def speak():
+    """Queue text for speech; returns at once with a job id
+
+    With {"mode": "file"} the speech is rendered to a cached audio clip and
+    the response carries its audio_url (ready at once if it was rendered before).
+    """
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         text = data.get('text', '')
-        if text:
-            agent.speak(text)
-            return jsonify({'status': 'success'})
-        return jsonify({'error': 'No text provided'}), 400
+        if not text:
+            return jsonify({'error': 'No text provided'}), 400
+        job_id = agent.speak(text, to_file=data.get('mode') == 'file')
+        if job_id is None:
+            return jsonify({'error': 'Speech queue is full, try again later'}), 503
+        job = agent.tts.get(job_id)
+        return jsonify(_job_response(job)), 200 if job.status == 'done' else 202
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/speak/<job_id>', methods=['GET', 'DELETE'])
+def speak_job(job_id):
+    """Status of a speech job; DELETE cancels it (or interrupts it if it is being spoken)"""
+    if request.method == 'DELETE' and not agent.tts.cancel(job_id):
+        job = agent.tts.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Unknown job'}), 404
+        return jsonify(_job_response(job)), 409
+    job = agent.tts.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(_job_response(job))
+
+@app.route('/speech/<key>.wav')
+def speech_clip(key):
+    """A rendered speech clip; content-addressed, so it never changes (ETag and Range supported)"""
+    path = agent.tts.clip_path(key) if re.fullmatch(r'[0-9a-f]{32}', key) else None
+    if path is None:
+        return jsonify({'error': 'Unknown clip'}), 404
+    try:
+        response = send_file(path, mimetype='audio/wav', conditional=True, etag=key, max_age=365 * 24 * 3600)
+    except FileNotFoundError:  # evicted just now
+        return jsonify({'error': 'Unknown clip'}), 404
+    response.cache_control.immutable = True
+    return response
+
 if __name__ == '__main__':
-    # Create uploads directory if it doesn't exist
-    if not os.path.exists(UPLOAD_FOLDER):
-        os.makedirs(UPLOAD_FOLDER)
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,175 @@
+"""
+Article body enrichment.
+
+ArticleFetcher downloads a news article and extracts its main text, backed by
+a persistent content-addressed cache: extracted bodies are stored once per
+content hash, and each URL remembers its ETag/Last-Modified validators and
+the hash of its body. A recently fetched URL is answered without touching
+the network; an older one is revalidated with a conditional GET, and a 304
+reuses the stored body without parsing anything.
+
+enrich_articles() runs the fetcher over a list of articles on a bounded
+worker pool and yields every article as soon as its body is ready.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+
+
+class ArticleCache:
+    """SQLite store: url -> validators + body hash, body hash -> extracted text"""
+
+    def __init__(self, path='article_cache.db'):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS article_bodies (
+                body_hash TEXT PRIMARY KEY,
+                body TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS article_urls (
+                url_hash TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT,
+                fetched_at REAL NOT NULL
+            );
+        ''')
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def url_key(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def lookup(self, url):
+        """(etag, last_modified, body or None, fetched_at) for a URL, or None"""
+        row = self._conn().execute('''
+            SELECT u.etag, u.last_modified, b.body, u.fetched_at
+            FROM article_urls u LEFT JOIN article_bodies b ON b.body_hash = u.body_hash
+            WHERE u.url_hash = ?
+        ''', (self.url_key(url),)).fetchone()
+        return row
+
+    def store(self, url, body, etag=None, last_modified=None):
+        """Record a fresh fetch; body may be None when nothing could be extracted"""
+        body_hash = hashlib.sha256(body.encode('utf-8')).hexdigest() if body is not None else None
+        conn = self._conn()
+        with conn:
+            if body is not None:
+                conn.execute('INSERT OR IGNORE INTO article_bodies (body_hash, body) VALUES (?, ?)',
+                             (body_hash, body))
+            conn.execute('INSERT OR REPLACE INTO article_urls (url_hash, url, etag, last_modified, body_hash, fetched_at) '
+                         'VALUES (?, ?, ?, ?, ?, ?)',
+                         (self.url_key(url), url, etag, last_modified, body_hash, time.time()))
+
+    def touch(self, url):
+        """Mark a URL as just revalidated (after a 304)"""
+        conn = self._conn()
+        with conn:
+            conn.execute('UPDATE article_urls SET fetched_at = ? WHERE url_hash = ?', (time.time(), self.url_key(url)))
+
+
+class ArticleFetcher:
+    """Fetch + extract article text through an ArticleCache"""
+
+    def __init__(self, http, extract, cache=None, max_age=3600, headers=None):
+        self.http = http
+        self.extract = extract
+        self.cache = cache
+        self.max_age = max_age
+        self.headers = dict(headers or {})
+        self._counters = {'fresh_hits': 0, 'revalidated': 0, 'fetched': 0, 'errors': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def fetch(self, url, timeout=10):
+        """Main text of the article at url (first 200 words), or None"""
+        cached = self.cache.lookup(url) if self.cache else None
+        headers = dict(self.headers)
+        if cached is not None:
+            etag, last_modified, body, fetched_at = cached
+            if time.time() - fetched_at < self.max_age:
+                self._count('fresh_hits')
+                return body
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        try:
+            response = self.http.get(url, headers=headers, timeout=timeout)
+        except Exception as e:
+            self._count('errors')
+            print(f"Error fetching article content: {e}")
+            return cached[2] if cached is not None else None
+
+        if response.status_code == 304 and cached is not None:
+            self._count('revalidated')
+            self.cache.touch(url)
+            return cached[2]
+        if response.status_code != 200:
+            return None
+
+        self._count('fetched')
+        body = self.extract(response.text)
+        if self.cache:
+            self.cache.store(url, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return body
+
+
+def enrich_articles(articles, fetch, max_workers=6, timeout=8.0, fetch_budget=None):
+    """Fetch article bodies concurrently, yielding each article as soon as it is ready
+
+    Every article is yielded exactly once as a copy with a 'body' key (None
+    when the body could not be fetched in time). timeout is passed to each
+    fetch; fetch_budget is how long one fetch can take in the worst case,
+    retries included (default: timeout), and sizes the deadline of the batch.
+    """
+    articles = list(articles)
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='enrich')
+    futures = {}
+    for article in articles:
+        url = article.get('url') or article.get('link')
+        if url:
+            futures[executor.submit(fetch, url, timeout)] = article
+        else:
+            yield dict(article, body=None)
+
+    try:
+        # Each fetch has its own HTTP timeout; this bounds the whole batch
+        waves = -(-len(futures) // max_workers) if futures else 0
+        for future in as_completed(futures, timeout=(fetch_budget or timeout) * max(waves, 1) + 1):
+            article = futures.pop(future)
+            try:
+                body = future.result()
+            except Exception as e:
+                print(f"Error enriching article: {e}")
+                body = None
+            yield dict(article, body=body)
+    except FuturesTimeout:
+        for future, article in futures.items():
+            future.cancel()
+            yield dict(article, body=None)
+    finally:
+        executor.shutdown(wait=False)
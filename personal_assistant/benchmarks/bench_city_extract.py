@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: city extraction from weather queries.
+
+Compares the old extract_city_from_query (a full spaCy pass, then string
+splitting on "in") with the gazetteer extractor: a single trie walk per
+query, cold and behind extract_city_from_query's LRU. Also reports how many
+queries each one gets right. The spaCy timings need en_core_web_sm; they are
+skipped when it is not installed.
+
+Run from the personal_assistant directory:
+    python benchmarks/bench_city_extract.py [--queries 5000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import city_gazetteer
+
+TEMPLATES = [
+    "what's the weather in {city}",
+    "weather in {city} today?",
+    "is it raining in {city}",
+    "how is the weather in {city} right now",
+    "temperature in {city}",
+    "forecast for {city} tomorrow",
+    "will it snow in {city} this week",
+    "{city} weather",
+    "what's the temperature of {city}",
+    "nice weather in {city}?",
+]
+
+
+def legacy_extract(query, nlp=None):
+    """extract_city_from_query before the gazetteer (nlp: spaCy pipeline, or None to skip that part)"""
+    if nlp is not None:
+        nlp(query)  # the old code parsed every query, then never used the result
+    query_lower = query.lower()
+    if "weather in" in query_lower:
+        in_index = query_lower.find("weather in") + len("weather in")
+        return query[in_index:].strip()
+    elif "in" in query_lower and "weather" in query_lower:
+        parts = query_lower.split("in")
+        if len(parts) > 1:
+            return parts[1].strip().split()[0] if parts[1].strip() else ""
+    return ""
+
+
+def build_queries(size, seed=5):
+    """(query, expected canonical city) pairs, with random casing of the city name"""
+    rng = random.Random(seed)
+    gazetteer_cities = []
+    with open(city_gazetteer.DEFAULT_PATH, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                names = line.split('|')
+                gazetteer_cities.append((names[0].lstrip('*'), [name.lstrip('*') for name in names]))
+    queries = []
+    for _ in range(size):
+        canonical, names = rng.choice(gazetteer_cities)
+        name = rng.choice(names)
+        name = rng.choice([name, name.lower(), name.title()])
+        queries.append((rng.choice(TEMPLATES).format(city=name), canonical))
+    return queries
+
+
+def timed(func, queries):
+    start = time.perf_counter()
+    for query, _ in queries:
+        func(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def load_spacy():
+    try:
+        import spacy
+        return spacy.load('en_core_web_sm')
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--queries', type=int, default=5000)
+    args = parser.parse_args()
+
+    queries = build_queries(args.queries)
+    distinct = sorted(set(queries))
+    gazetteer = city_gazetteer.Gazetteer.load()
+
+    from functools import lru_cache
+    cached = lru_cache(maxsize=4096)(gazetteer.find)
+    rows = [('gazetteer find (one trie walk)', timed(gazetteer.find, queries))]
+    timed(cached, queries)
+    rows.append(('gazetteer behind the LRU (warm)', timed(cached, queries)))
+
+    nlp = load_spacy()
+    if nlp is not None:
+        sample = queries[:min(len(queries), 1000)]
+        rows.insert(0, ('legacy: full spaCy pipeline', timed(lambda query: legacy_extract(query, nlp), sample)))
+        disabled = [name for name in nlp.pipe_names if name not in ('ner', 'tok2vec')]
+        rows.insert(1, ('spaCy NER-only fallback', timed(lambda query: nlp(query, disable=disabled), sample)))
+
+    print(f"{len(queries):,} weather queries ({len(distinct):,} distinct), "
+          f"{gazetteer.size:,} city names in the gazetteer")
+    print("-" * 60)
+    for label, seconds in rows:
+        print(f"{label:<34}{seconds * 1e6:>10.2f} us/query")
+    if nlp is None:
+        print("(spaCy timings skipped: en_core_web_sm is not installed)")
+
+    right_old = sum(legacy_extract(query).casefold() == city.casefold() for query, city in distinct)
+    right_new = sum(gazetteer.find(query) == city for query, city in distinct)
+    print()
+    print(f"right city: legacy {right_old:,}/{len(distinct):,}, gazetteer {right_new:,}/{len(distinct):,}")
+    rng = random.Random(2)
+    print("Examples (legacy -> gazetteer):")
+    for query, _ in rng.sample(distinct, 5):
+        print(f"  {query!r}: {legacy_extract(query)!r} -> {gazetteer.find(query)!r}")
+
+
+if __name__ == '__main__':
+    main()
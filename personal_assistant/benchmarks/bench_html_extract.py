@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Benchmark: html_extract backends vs the old full html.parser + select_one path.
+
+Parses every saved page in the fixtures directory (Bing result pages are the
+files whose name starts with "bing", everything else is treated as an
+article) with each installed backend. Every backend runs in its own child
+process so peak memory can be compared: the report shows parse time per page,
+the growth of the child's peak RSS while parsing, and the peak Python heap
+(tracemalloc) of a single pass.
+
+When the fixtures directory is empty, synthetic pages shaped like real Bing
+result pages and news articles are used; --save-fixtures writes them out so
+they can be replaced by real saved pages.
+
+Run from the personal_assistant directory:
+    python benchmarks/bench_html_extract.py [--fixtures DIR] [--save-fixtures]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_extract
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'html')
+WORDS = ('model', 'inference', 'latency', 'dataset', 'training', 'benchmark', 'research', 'open',
+         'source', 'release', 'cloud', 'GPU', 'performance', 'agent', 'language', 'vision')
+
+
+def _sentence(rng, words=18):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _chrome(rng):
+    """Header, navigation, scripts and footer that surround the interesting part of a page"""
+    scripts = ''.join(f'<script>window.__d{i}={{"k":"{"x" * 400}"}};</script>' for i in range(30))
+    nav = '<nav><ul>' + ''.join(f'<li><a href="/s{i}">{rng.choice(WORDS)}</a></li>' for i in range(120)) + '</ul></nav>'
+    footer = '<footer>' + ''.join(f'<div class="col"><p>{_sentence(rng, 8)}</p></div>' for i in range(40)) + '</footer>'
+    return f'<head><title>t</title>{scripts}<style>{"a{color:red}" * 500}</style></head>', nav, footer
+
+
+def synthetic_pages(seed=7):
+    """{name: html} for a Bing results page and a few article pages"""
+    rng = random.Random(seed)
+    pages = {}
+
+    head, nav, footer = _chrome(rng)
+    items = ''.join(
+        f'<li class="{"b_algo tpcn" if i % 3 == 0 else "b_algo"}"><div class="b_tpcn"><a href="https://site{i}.example.com/">site{i}</a></div>'
+        f'<h2><a href="https://site{i}.example.com/post/{i}">{_sentence(rng, 6)}</a></h2>'
+        f'<div class="b_caption"><p>{_sentence(rng, 30)}</p></div></li>'
+        for i in range(10))
+    side = '<div id="b_context">' + ''.join(f'<div class="card"><p>{_sentence(rng)}</p></div>' for _ in range(80)) + '</div>'
+    pages['bing_results.html'] = (f'<html>{head}<body>{nav}<div id="b_content"><ol id="b_results">{items}'
+                                  f'</ol>{side}</div>{footer}</body></html>')
+
+    containers = ('article', 'div class="story-body"', 'div itemprop="articleBody"', 'div class="post__content"')
+    for index, container in enumerate(containers):
+        head, nav, footer = _chrome(rng)
+        tag = container.split()[0]
+        related = '<div class="related">' + ''.join(
+            f'<div class="teaser"><h3>{_sentence(rng, 6)}</h3><p>{_sentence(rng)}</p></div>' for _ in range(60)) + '</div>'
+        body = ''.join(f'<h2>{_sentence(rng, 5)}</h2>' + ''.join(f'<p>{_sentence(rng, 40)}</p>' for _ in range(6))
+                       for _ in range(8))
+        aside = f'<aside><p>{_sentence(rng)}</p></aside><script>track()</script>'
+        pages[f'article_{index}.html'] = (f'<html>{head}<body>{nav}<div class="layout">{related}'
+                                          f'<{container}>{body}{aside}</{tag}></div>{footer}</body></html>')
+    return pages
+
+
+def load_pages(directory):
+    pages = {}
+    if os.path.isdir(directory):
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.html'):
+                with open(os.path.join(directory, name), encoding='utf-8', errors='replace') as f:
+                    pages[name] = f.read()
+    return pages
+
+
+def legacy_article_text(html):
+    """fetch_article_content's parsing before html_extract"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    for selector in html_extract.ARTICLE_SELECTORS:
+        article = soup.select_one(selector)
+        if article:
+            for elem in article.find_all(['script', 'style', 'nav', 'footer', 'aside']):
+                elem.decompose()
+            text = ' '.join(p.get_text(' ', strip=True) for p in article.find_all(['p', 'h2', 'h3', 'h4']))
+            if len(text) > 100:
+                return ' '.join(text.split()[:200]) + '...'
+            return None
+    return None
+
+
+def legacy_bing_results(html, limit):
+    """_fetch_bing_results' parsing before html_extract"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    results = []
+    for result in soup.find_all('li', class_='b_algo')[:limit]:
+        title_link = result.find('h2').find('a')
+        snippet = result.find('p')
+        results.append((title_link.get_text(strip=True), title_link.get('href'),
+                        snippet.get_text(strip=True) if snippet else None))
+    return results
+
+
+def run_child(backend, pages, repeat):
+    """Parse every page `repeat` times with one backend; prints a JSON report"""
+    if backend == 'legacy':
+        bing, article = legacy_bing_results, legacy_article_text
+        import bs4  # noqa: F401  (import cost is not part of the measurement)
+    else:
+        parser = html_extract.get_backend(backend)
+        bing, article = parser.bing_results, parser.article_text
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    report = {}
+    for name, html in pages.items():
+        extract = (lambda page: bing(page, 10)) if name.startswith('bing') else article
+        output = extract(html)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            extract(html)
+        report[name] = {'ms': (time.perf_counter() - start) * 1000 / repeat, 'output': output}
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Python-heap peak of one pass (the C parsers' own buffers only show up in RSS)
+    tracemalloc.start()
+    for name, html in pages.items():
+        bing(html, 10) if name.startswith('bing') else article(html)
+    heap_peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+    tracemalloc.stop()
+    print(json.dumps({'pages': report, 'peak_growth_kb': peak_kb - baseline_kb, 'heap_peak_kb': heap_peak_kb}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES)
+    parser.add_argument('--save-fixtures', action='store_true', help='write the synthetic pages to --fixtures')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    pages = load_pages(args.fixtures)
+    if not pages:
+        pages = synthetic_pages()
+        if args.save_fixtures:
+            os.makedirs(args.fixtures, exist_ok=True)
+            for name, html in pages.items():
+                with open(os.path.join(args.fixtures, name), 'w', encoding='utf-8') as f:
+                    f.write(html)
+            print(f"Saved {len(pages)} synthetic pages to {args.fixtures}")
+
+    if args.child:
+        run_child(args.child, pages, args.repeat)
+        return
+
+    print(f"{len(pages)} pages, {sum(len(html) for html in pages.values()) // 1024} KB total, "
+          f"{args.repeat} parses each\n")
+    backends = ['legacy'] + html_extract.available_backends()
+    reports = {}
+    for backend in backends:
+        command = [sys.executable, os.path.abspath(__file__), '--child', backend, '--repeat', str(args.repeat),
+                   '--fixtures', args.fixtures]
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        reports[backend] = json.loads(output.strip().splitlines()[-1])
+
+    names = list(pages)
+    print(f"{'page':<22}" + ''.join(f"{backend:>14}" for backend in backends))
+    for name in names:
+        print(f"{name:<22}" + ''.join(f"{reports[backend]['pages'][name]['ms']:>11.2f} ms" for backend in backends))
+    print(f"{'peak RSS growth':<22}" + ''.join(f"{reports[backend]['peak_growth_kb']:>11d} KB" for backend in backends))
+    print(f"{'peak Python heap':<22}" + ''.join(f"{reports[backend]['heap_peak_kb']:>11d} KB" for backend in backends))
+
+    mismatches = [(backend, name) for backend in backends[1:] for name in names
+                  if reports[backend]['pages'][name]['output'] != reports['legacy']['pages'][name]['output']]
+    print('\nOutputs match the legacy parser' if not mismatches
+          else f"\nOutput differs from the legacy parser for: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pooled HttpClient vs bare requests.get against a local stub server.
+
+Starts a threaded HTTP/1.1 stub on localhost, then compares per-request cost
+of a fresh connection per call (bare requests.get, as agent.py used to do)
+with the shared keep-alive client, and exercises retries and the circuit
+breaker on failing endpoints.
+
+Run from the personal_assistant directory:
+    python benchmarks/bench_http_client.py
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from http_client import HttpClient
+
+BODY = b'{"status": "ok", "articles": []}' * 20
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    flaky_counter = 0
+    connections = set()
+
+    def do_GET(self):
+        StubHandler.connections.add(self.client_address)
+        if self.path.startswith('/flaky'):
+            # Every other request fails with 503
+            StubHandler.flaky_counter += 1
+            status = 503 if StubHandler.flaky_counter % 2 else 200
+        elif self.path.startswith('/down'):
+            status = 500
+        else:
+            status = 200
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def run(label, fetch, count, workers):
+    StubHandler.connections = set()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(fetch, range(count)))
+    seconds = time.perf_counter() - start
+    print(f"{label:<34}{seconds * 1e6 / count:>9.0f} us/req   {len(StubHandler.connections):>5} TCP connections")
+
+
+def main():
+    server, base = start_stub()
+    count = 2000
+    client = HttpClient(max_concurrency_per_host=8)
+
+    print(f"{count} GETs against {base}")
+    print("-" * 70)
+    for workers in (1, 8):
+        run(f"bare requests.get ({workers} threads)", lambda _: requests.get(f"{base}/ok", timeout=5).content,
+            count, workers)
+        run(f"HttpClient ({workers} threads)", lambda _: client.get(f"{base}/ok").content, count, workers)
+
+    print()
+    retrying = HttpClient(max_retries=2, backoff_base=0.001)
+    ok = sum(retrying.get(f"{base}/flaky").status_code == 200 for _ in range(50))
+    print(f"/flaky (50% 503): {ok}/50 succeeded with retries")
+
+    breaker = HttpClient(max_retries=0, breaker_threshold=3, breaker_cooldown=60)
+    outcomes = []
+    for _ in range(6):
+        try:
+            outcomes.append(breaker.get(f"{base}/down").status_code)
+        except requests.ConnectionError as e:
+            outcomes.append(type(e).__name__)
+    print(f"/down (always 500): {outcomes}")
+
+    print()
+    print("Per-host stats:")
+    for netloc, stats in client.stats().items():
+        print(f"  {netloc}: {stats['requests']} requests, p50 <= {stats['p50_ms']} ms, "
+              f"p95 <= {stats['p95_ms']} ms, circuit {stats['circuit']}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for agent.py.
+
+Uses `python -X importtime` to measure what `import agent` costs now that the
+heavy backends are deferred, and compares it with importing agent and then
+prewarming every backend (the old eager start-up). Everything runs in a
+temporary working directory, so the databases and caches agent creates
+relative to the current directory never land in the source tree.
+
+Run from the personal_assistant directory:
+    python benchmarks/bench_import_time.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = [
+    ('lazy: import agent', 'import agent'),
+    ('eager: import agent + prewarm all',
+     'import agent; agent.resources.prewarm(background=False)'),
+]
+
+
+def importtime(code, workdir):
+    """Run code under -X importtime; return (total seconds, [(cumulative us, module)])"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         'import time; _t = time.perf_counter(); ' + code + '; print(time.perf_counter() - _t)'],
+        cwd=workdir, capture_output=True, text=True,
+        env=dict(os.environ, PREWARM_RESOURCES='', PYTHONPATH=BASE_DIR),
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        # Keep the direct imports of top-level modules (one level of indentation)
+        if name.startswith('   ') and not name.startswith('     '):
+            modules.append((int(parts[1]), name.strip()))
+    try:
+        total = float(result.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        total = float('nan')
+    return total, sorted(modules, reverse=True)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        run(workdir)
+
+
+def run(workdir):
+    for label, code in SCENARIOS:
+        total, modules = importtime(code, workdir)
+        print(f"{label}: {total * 1000:.0f} ms wall clock")
+        print("  slowest direct imports (cumulative):")
+        for cumulative, name in modules[:8]:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+        print()
+
+    # Per-backend cost as reported by the resource registry
+    sys.path.insert(0, BASE_DIR)
+    os.chdir(workdir)
+    import agent
+    agent.resources.prewarm(background=False)
+    print("Backend initialization cost:")
+    for stats in agent.resources.report():
+        rss = f"{stats['rss_kb'] / 1024:.1f} MB" if stats['rss_kb'] is not None else 'n/a'
+        status = f"error: {stats['error']}" if stats['error'] else 'ok'
+        print(f"  {stats['name']:<20}{stats['seconds'] * 1000:>9.1f} ms  {rss:>10}  {status}")
+
+
+if __name__ == '__main__':
+    main()
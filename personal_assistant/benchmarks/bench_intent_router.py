@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: intent routing throughput.
+
+Compares the old linear keyword cascade from process_command with the
+compiled IntentRouter, and shows how routing cost scales with the number
+of registered intents. The scaling case uses commands no built-in intent
+matches, so the cascade really scans every made-up intent (the mixed
+command list mostly stops at one of its first checks).
+
+Run from the personal_assistant directory:
+    python benchmarks/bench_intent_router.py
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agent
+from intent_router import IntentRouter
+
+COMMANDS = [
+    "Hello, how are you?",
+    "What time is it?",
+    "What's today's date?",
+    "Calculate 15 * 8",
+    "What is 100 divided by 4?",
+    "what's the weather in London",
+    "show me the latest news",
+    "search for python programming tutorials",
+    "Remind me to call mom at 3 PM",
+    "show reminders",
+    "who is the president of France",
+    "tell me something interesting about the ocean floor",
+]
+
+
+def legacy_route(command):
+    """The keyword cascade process_command used before the router (returns the intent name)"""
+    command_lower = command.lower()
+    if any(greeting in command_lower for greeting in agent.GREETING_INPUTS):
+        return 'greeting'
+    if any(word in command_lower for word in ['time', 'what time', 'current time']):
+        return 'time'
+    if any(word in command_lower for word in ['date', 'today', 'what day']):
+        return 'date'
+    math_indicators = ['+', '-', '*', '/', '=', 'plus', 'minus', 'times', 'divided by', 'add', 'subtract', 'multiply', 'divide', 'calculate', 'solve', 'math']
+    if any(word in command_lower for word in math_indicators) or any(word.isdigit() for word in command_lower.split()):
+        return 'math'
+    if any(word in command_lower for word in ['weather', 'temperature', 'forecast', 'how is the weather']):
+        return 'weather'
+    if any(phrase in command_lower for phrase in ['all details from api', 'fetch all details', 'comprehensive news', 'all ml ai news', 'all trending news']):
+        return 'comprehensive_news'
+    if any(word in command_lower for word in ['trending', 'top stories', 'latest news', 'all news']):
+        return 'trending_news'
+    if any(word in command_lower for word in ['search', 'find', 'google', 'look up', 'who is', 'what is', 'where is']) or '?' in command_lower:
+        return 'search'
+    if any(word in command_lower for word in ['remind', 'reminder', 'remember', 'alert', 'notify']):
+        return 'set_reminder'
+    if any(word in command_lower for word in ['my reminders', 'show reminders', 'list reminders', 'any reminders']):
+        return 'list_reminders'
+    return None
+
+
+# Commands none of the legacy checks match, not even by substring
+UNMATCHED_COMMANDS = [
+    "tell me a joke about penguins",
+    "play relaxing jazz music",
+    "order a large pepperoni pizza",
+]
+
+
+def synthetic_triggers(extra_intents):
+    """Made-up trigger lists, three words each"""
+    rng = random.Random(42)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return [[''.join(rng.choice(letters) for _ in range(rng.randint(5, 10))) for _ in range(3)]
+            for _ in range(extra_intents)]
+
+
+def synthetic_router(extra_intents):
+    """The agent's router plus extra_intents made-up intents"""
+    router = IntentRouter()
+    for intent in agent.router.intents.values():
+        router.register(intent.name, intent.handler, intent.triggers, intent.priority)
+    for i, triggers in enumerate(synthetic_triggers(extra_intents)):
+        router.register(f'synthetic_{i}', None, triggers=triggers, priority=1)
+    return router
+
+
+def synthetic_cascade(extra_intents):
+    """The legacy cascade followed by one any() scan per made-up intent"""
+    extra = synthetic_triggers(extra_intents)
+
+    def route(command):
+        intent = legacy_route(command)
+        if intent is not None:
+            return intent
+        command_lower = command.lower()
+        for i, triggers in enumerate(extra):
+            if any(word in command_lower for word in triggers):
+                return f'synthetic_{i}'
+        return None
+    return route
+
+
+def scaling_commands(extra_intents):
+    """Unmatched commands, plus ones naming the middle and last made-up intents"""
+    commands = list(UNMATCHED_COMMANDS)
+    extra = synthetic_triggers(extra_intents)
+    if extra:
+        commands += [f"please {extra[len(extra) // 2][0]} now", f"open {extra[-1][2]}"]
+    return commands
+
+
+def per_second(func, number, commands=COMMANDS, repeat=5):
+    """Best of repeat runs, so a noisy machine does not skew the comparison"""
+    seconds = min(timeit.repeat(lambda: [func(c) for c in commands], number=number, repeat=repeat))
+    return number * len(commands) / seconds
+
+
+def main():
+    number = 2000
+    print("Routing throughput (commands/second)")
+    print("-" * 50)
+    print(f"{'legacy cascade':<30}{per_second(legacy_route, number):>15,.0f}")
+    print(f"{'compiled router':<30}{per_second(agent.router.route, number):>15,.0f}")
+    print()
+    print("Throughput vs number of registered intents (commands/second)")
+    print("-" * 50)
+    print(f"{'intents':>8}{'legacy cascade':>21}{'compiled router':>21}")
+    for extra in (0, 100, 1000, 5000):
+        router = synthetic_router(extra)
+        router.route('warm up')
+        cascade = synthetic_cascade(extra)
+        commands = scaling_commands(extra)
+        assert all(legacy_route(command) is None for command in commands)
+        total = len(router.intents)
+        print(f"{total:>8}{per_second(cascade, number // 20, commands):>21,.0f}"
+              f"{per_second(router.route, number // 4, commands):>21,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ingesting into and answering from the SQLite FTS5 knowledge index.
+
+Ingests synthetic web results in batches (as search_web does after each
+Bing fetch), re-ingests a share of them to exercise URL deduplication, then
+times ranked searches with and without the freshness filter search_web
+uses. A Bing round trip is typically several hundred milliseconds.
+
+Run from the personal_assistant directory:
+    python benchmarks/bench_knowledge_index.py [--documents 50000] [--queries 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from knowledge_index import KnowledgeIndex
+
+TOPICS = ['python decorators', 'rust ownership', 'sourdough starter', 'marathon training', 'solar panels',
+          'kubernetes ingress', 'tax deductions', 'guitar chords', 'orchid care', 'sql indexes',
+          'espresso grind', 'bird migration', 'roman history', 'home insurance', 'vegan protein']
+WORDS = ('guide tutorial beginners advanced tips explained examples best practices common mistakes '
+         'how works why matters complete overview quick reference step cost budget tools checklist '
+         'history science myths alternatives comparison review questions answers problems fixes '
+         'kids winter summer weekend small large cheap fast safe').split()
+
+
+def results(size, seed=7):
+    rng = random.Random(seed)
+    for number in range(size):
+        topic = rng.choice(TOPICS)
+        yield {'url': f"https://example.com/{topic.replace(' ', '-')}/{number}",
+               'title': f"{topic.title()}: {' '.join(rng.sample(WORDS, 3))}",
+               'snippet': f"{' '.join(rng.sample(WORDS, 5))} {topic} {' '.join(rng.sample(WORDS, 5))}"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--documents', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = KnowledgeIndex(os.path.join(directory, 'knowledge.db'))
+        documents = list(results(args.documents))
+
+        start = time.perf_counter()
+        for batch in range(0, len(documents), 10):
+            index.add_many(documents[batch:batch + 10])
+        ingest = time.perf_counter() - start
+        index.add_many(documents[:len(documents) // 5])  # seen again: updated, not duplicated
+
+        rng = random.Random(8)
+        queries = [f"{rng.choice(TOPICS)} {rng.choice(WORDS)}" for _ in range(args.queries)]
+        rows = []
+        for label, max_age in (('ranked search', None), ('ranked search, fetched within a day', 86400)):
+            samples = []
+            for query in queries:
+                start = time.perf_counter()
+                index.search(query, 5, max_age=max_age)
+                samples.append(time.perf_counter() - start)
+            samples.sort()
+            rows.append((label, sum(samples) / len(samples), samples[int(len(samples) * 0.99)]))
+
+        print(f"{index.stats()['documents']:,} documents after re-ingesting {len(documents) // 5:,} known URLs")
+        print(f"ingest: {len(documents) / ingest:,.0f} documents/s in batches of 10")
+        print("-" * 72)
+        for label, mean, p99 in rows:
+            print(f"{label:<40}{mean * 1e3:>8.2f} ms mean{p99 * 1e3:>8.2f} ms p99")
+        print()
+        for hit in index.search(queries[0], 3):
+            print(f"{queries[0]!r}: {hit['title']} ({hit['score']:.2f})")
+
+
+if __name__ == '__main__':
+    main()
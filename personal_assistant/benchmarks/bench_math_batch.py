@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vectorized batch math evaluation.
+
+Evaluates a synthetic log of arithmetic queries (1M by default) with
+math_batch.evaluate_batch and, on a sample, with the per-query engine, and
+checks that both give identical replies.
+
+Run from the personal_assistant directory:
+    python benchmarks/bench_math_batch.py [size]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math_batch
+import math_engine
+
+TEMPLATES = [
+    "what is {a} plus {b}",
+    "calculate {a} * {b}",
+    "{a} times {b} minus {c}",
+    "what is {a} divided by {b}?",
+    "({a} + {b}) * {c}",
+    "{a} ÷ {b}",
+    "{a} to the power of {c}",
+    "{a} - {b} - {c}",
+    "{a} divided by {z}",
+    "what is {a} plus",
+]
+
+
+def build_log(size, seed=11):
+    rng = random.Random(seed)
+    return [rng.choice(TEMPLATES).format(a=rng.randint(1, 10000), b=rng.randint(1, 500),
+                                         c=rng.randint(1, 9), z=rng.choice((0, 1, 2)))
+            for _ in range(size)]
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    log = build_log(size)
+    print(f"{size:,} expressions")
+    print("-" * 50)
+
+    start = time.perf_counter()
+    result = math_batch.evaluate_batch(log)
+    batch_seconds = time.perf_counter() - start
+    print(f"{'evaluate_batch':<24}{batch_seconds:>8.2f} s{size / batch_seconds:>14,.0f} expr/s")
+    print(f"{'':<24}{int(result.ok.sum()):,} ok, {int((~result.ok).sum()):,} errors")
+
+    sample = log[:min(size, 100_000)]
+    start = time.perf_counter()
+    single = [math_engine.respond(expression) for expression in sample]
+    single_seconds = time.perf_counter() - start
+    print(f"{'respond() per query':<24}{single_seconds * size / len(sample):>8.2f} s{len(sample) / single_seconds:>14,.0f} expr/s"
+          f"  (extrapolated from {len(sample):,})")
+
+    mismatches = sum(a != b for a, b in zip(single, result.responses()[:len(sample)]))
+    print(f"replies differing from single-query solve_math: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: math_engine vs the old regex/eval solve_math.
+
+Times both implementations over a corpus of phrasings (cold and warm cache
+for the engine) and lists the phrasings where the two disagree.
+
+Run from the personal_assistant directory:
+    python benchmarks/bench_math_engine.py
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math_engine
+
+TEMPLATES = [
+    "what is {a} plus {b}",
+    "calculate {a} * {b}",
+    "{a} times {b}",
+    "what is {a} divided by {b}?",
+    "{a} minus {b}",
+    "{a} + {b} * {c}",
+    "({a} + {b}) * {c}",
+    "{a} x {b}",
+    "{a} ÷ {b}",
+    "what's {a} - {b} - {c}",
+    "{a} divided by {b} divided by {c}",
+    "{a} to the power of 2",
+    "subtract {a} from {b}",
+    "next {a} boxes times {b}",
+]
+
+
+def legacy_solve_math(query):
+    """solve_math's local path before math_engine (WolframAlpha branch omitted)"""
+    try:
+        query = query.lower()
+        query = query.replace('what is', '').replace('whats', '').replace('calculate', '').strip()
+        if 'times' in query or 'multiplied by' in query or 'x' in query or '*' in query or '×' in query:
+            numbers = [float(n) for n in re.findall(r'\d+\.?\d*', query)]
+            if len(numbers) >= 2:
+                result = 1
+                for num in numbers:
+                    result *= num
+                return f"The result is {int(result) if result.is_integer() else result}."
+        if 'plus' in query or '+' in query or 'add' in query:
+            numbers = [float(n) for n in re.findall(r'\d+\.?\d*', query)]
+            if len(numbers) >= 2:
+                result = sum(numbers)
+                return f"The result is {int(result) if result.is_integer() else result}."
+        if 'minus' in query or '-' in query or 'subtract' in query:
+            numbers = [float(n) for n in re.findall(r'-?\d+\.?\d*', query)]
+            if len(numbers) >= 2:
+                result = numbers[0] - sum(numbers[1:])
+                return f"The result is {int(result) if result.is_integer() else result}."
+        if 'divided by' in query or '/' in query or '÷' in query or 'divide' in query:
+            numbers = [float(n) for n in re.findall(r'\d+\.?\d*', query)]
+            if len(numbers) >= 2:
+                if numbers[1] == 0:
+                    return "Error: Division by zero is not allowed."
+                return f"The result is {numbers[0] / numbers[1]}."
+        # The old code eval()'d user input here; this trusted corpus keeps it comparable
+        try:
+            result = eval(query.replace(' ', '').replace('x', '*').replace('÷', '/'))
+            return f"The result is {result}."
+        except Exception:
+            pass
+        return "I couldn't understand the math problem. Please try rephrasing it."
+    except Exception as e:
+        return f"I encountered an error: {str(e)}. Please try a different query."
+
+
+def build_corpus(size, distinct, seed=7):
+    """size queries drawn from a pool of distinct phrasings (users repeat themselves)"""
+    rng = random.Random(seed)
+    pool = [rng.choice(TEMPLATES).format(a=rng.randint(1, 500), b=rng.randint(1, 50), c=rng.randint(1, 20))
+            for _ in range(distinct)]
+    return [rng.choice(pool) for _ in range(size)]
+
+
+def timed(func, corpus):
+    start = time.perf_counter()
+    for query in corpus:
+        func(query)
+    return time.perf_counter() - start
+
+
+def main():
+    corpus = build_corpus(20000, 2000)
+    legacy = timed(legacy_solve_math, corpus)
+    math_engine._compiled.cache_clear()
+    math_engine._normalized_tokens.cache_clear()
+    cold = timed(math_engine.respond, corpus)
+    warm = timed(math_engine.respond, corpus)
+    start = time.perf_counter()
+    math_engine.evaluate_many(corpus)
+    bulk = time.perf_counter() - start
+
+    print(f"{len(corpus):,} queries ({len(set(corpus)):,} distinct)")
+    print("-" * 50)
+    for label, seconds in (('legacy solve_math', legacy), ('math_engine (cold cache)', cold),
+                           ('math_engine (warm cache)', warm), ('evaluate_many (warm)', bulk)):
+        print(f"{label:<28}{seconds * 1e6 / len(corpus):>8.2f} us/query{len(corpus) / seconds:>14,.0f} q/s")
+
+    print()
+    print("Phrasings where the answers differ (legacy -> engine):")
+    for template in TEMPLATES:
+        query = template.format(a=12, b=4, c=2)
+        old, new = legacy_solve_math(query), math_engine.respond(query)
+        if old != new:
+            print(f"  {query!r}: {old!r} -> {new!r}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: offline news search with NewsIndex against the old substring scan.
+
+Builds a synthetic corpus of NewsAPI-style articles (the demo fixture plus
+generated ones), then times the old demo filter (every query word searched
+for in every title and description) and NewsIndex.search on the same
+queries. Also reports how long building the index takes.
+
+Run from the personal_assistant directory:
+    python benchmarks/bench_news_index.py [--articles 20000] [--queries 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_index import NewsIndex
+
+TOPICS = ['machine learning', 'artificial intelligence', 'climate change', 'electric vehicles', 'quantum computing',
+          'drug discovery', 'cybersecurity', 'space exploration', 'renewable energy', 'stock market',
+          'semiconductors', 'robotics', 'genomics', 'cloud computing', 'cricket', 'football', 'elections',
+          'inflation', 'housing', 'wildfires', 'vaccines', 'startups', 'smartphones', 'satellites']
+VERBS = ['transforms', 'boosts', 'threatens', 'reshapes', 'accelerates', 'slows', 'disrupts', 'powers']
+NOUNS = ['research', 'industry', 'markets', 'healthcare', 'education', 'manufacturing', 'agriculture',
+         'transport', 'banking', 'retail', 'policy', 'cities', 'jobs', 'supply chains']
+FILLER = ('analysts say the shift could take years while regulators weigh new rules and companies race '
+          'to adopt the technology across products and services worldwide').split()
+
+
+def corpus(size, seed=3):
+    rng = random.Random(seed)
+    articles = list(NewsIndex.load().articles)
+    for number in range(size - len(articles)):
+        topic, other = rng.sample(TOPICS, 2)
+        noun = rng.choice(NOUNS)
+        words = rng.sample(FILLER, 12)
+        articles.append({
+            'title': f"{topic.title()} {rng.choice(VERBS)} {noun} as {other} grows",
+            'description': f"New report on {topic} and {noun}: {' '.join(words)}.",
+            'url': f"https://example.com/news/{number}",
+            'source': rng.choice(['Reuters', 'AP', 'BBC', 'TechCrunch', 'Bloomberg']),
+            'publishedAt': f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z",
+            'content': ' '.join(rng.sample(FILLER, 15)),
+        })
+    return articles
+
+
+def queries(size, seed=4):
+    rng = random.Random(seed)
+    forms = ['{topic}', 'latest {topic} news', '{topic} {noun}', 'news about {topic} in {noun}', '{noun}']
+    return [rng.choice(forms).format(topic=rng.choice(TOPICS), noun=rng.choice(NOUNS)) for _ in range(size)]
+
+
+def substring_scan(articles, query, num_results=5):
+    """The old demo-mode filter"""
+    query_lower = query.lower()
+    filtered = [article for article in articles
+                if any(word in article['title'].lower() or word in article['description'].lower()
+                       for word in query_lower.split())]
+    return filtered[:num_results] if filtered else articles[:3]
+
+
+def timings(func, items):
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return sum(samples) / len(samples), samples[int(len(samples) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--articles', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    articles = corpus(args.articles)
+    start = time.perf_counter()
+    index = NewsIndex(articles)
+    build = time.perf_counter() - start
+    asked = queries(args.queries)
+
+    rows = [('substring scan (old demo filter)', timings(lambda query: substring_scan(articles, query),
+                                                         asked[:min(len(asked), 200)])),
+            ('NewsIndex.search (BM25)', timings(lambda query: index.search(query, 5), asked))]
+
+    print(f"{len(index):,} articles, index built in {build:.2f} s")
+    print("-" * 66)
+    for label, (mean, p99) in rows:
+        print(f"{label:<36}{mean * 1e6:>10,.1f} us mean{p99 * 1e6:>10,.1f} us p99")
+    print()
+    for query in asked[:3]:
+        print(f"{query!r}: {[article['title'] for article in index.search(query, 2)]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark: throughput of agent.analyze_commands on a synthetic command log.
+
+Compares calling nlp(text) one command at a time (what the assistant does
+per request) with nlp.pipe over the full pipeline and with
+analyze_commands, which pipes only through the entity recognizer and can
+spread batches over worker processes. Uses en_core_web_sm when it is
+installed; otherwise a blank English pipeline with a rule-based "ner" over
+the city gazetteer stands in (so only the batching overhead is measured).
+Worker processes only pay off with a statistical model on a machine with
+spare cores: each batch is pickled to a worker and its docs sent back.
+
+Run from the personal_assistant directory:
+    python benchmarks/bench_nlp_batch.py [--commands 20000] [--batch-size 256] [--processes N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agent
+import city_gazetteer
+
+TEMPLATES = [
+    "what's the weather in {city}",
+    "is it going to rain in {city} tomorrow",
+    "remind me to call {person} at {hour} PM",
+    "set a reminder to pay rent in {n} days",
+    "search for {topic} news",
+    "who is {person}",
+    "latest news about {topic}",
+    "calculate {n} * {m}",
+    "what time is it",
+    "hello",
+    "flights from {city} to {city2} next week",
+    "tell me about the history of {city}",
+]
+PEOPLE = ['Sundar Pichai', 'Ada Lovelace', 'Virat Kohli', 'Marie Curie', 'mom', 'the dentist', 'Priya']
+TOPICS = ['AI', 'cricket', 'climate change', 'the stock market', 'electric cars', 'space exploration']
+
+
+def corpus(size, seed=13):
+    rng = random.Random(seed)
+    cities = [name.split('|')[0].lstrip('*') for name in open(city_gazetteer.DEFAULT_PATH, encoding='utf-8')
+              .read().splitlines() if name and not name.startswith('#')]
+    return [rng.choice(TEMPLATES).format(city=rng.choice(cities), city2=rng.choice(cities),
+                                         person=rng.choice(PEOPLE), topic=rng.choice(TOPICS),
+                                         hour=rng.randint(1, 11), n=rng.randint(2, 99), m=rng.randint(2, 99))
+            for _ in range(size)]
+
+
+def load_model():
+    import spacy
+    try:
+        return spacy.load('en_core_web_sm'), 'en_core_web_sm'
+    except OSError:
+        model = spacy.blank('en')
+        model.add_pipe('sentencizer')
+        ruler = model.add_pipe('entity_ruler', name='ner')
+        patterns = []
+        for line in open(city_gazetteer.DEFAULT_PATH, encoding='utf-8'):
+            line = line.strip()
+            if line and not line.startswith('#'):
+                patterns.append({'label': 'GPE', 'pattern': line.split('|')[0].lstrip('*')})
+        patterns += [{'label': 'PERSON', 'pattern': person} for person in PEOPLE if person[0].isupper()]
+        ruler.add_patterns(patterns)
+        return model, 'blank English + rule-based ner (en_core_web_sm not installed)'
+
+
+def rate(func, commands):
+    start = time.perf_counter()
+    func(commands)
+    return len(commands) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--commands', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    commands = corpus(args.commands)
+    model, label = load_model()
+    sample = commands[:min(len(commands), 2000)]
+
+    rows = [
+        ('nlp(text) one at a time, full pipeline', rate(lambda texts: [model(text) for text in texts], sample)),
+        (f'nlp.pipe, full pipeline (batch {args.batch_size})',
+         rate(lambda texts: list(model.pipe(texts, batch_size=args.batch_size)), commands)),
+        ('analyze_commands, NER only, 1 process',
+         rate(lambda texts: list(agent.analyze_commands(texts, args.batch_size, model=model)), commands)),
+    ]
+    if args.processes > 1:
+        rows.append((f'analyze_commands, NER only, {args.processes} processes',
+                     rate(lambda texts: list(agent.analyze_commands(texts, args.batch_size, args.processes,
+                                                                     model=model)), commands)))
+
+    print(f"{len(commands):,} commands, model: {label}, {os.cpu_count()} CPU(s)")
+    print(f"pipeline: {', '.join(model.pipe_names)}; analyze_commands disables: "
+          f"{', '.join(agent._ner_only(model)) or 'nothing'}")
+    print("-" * 64)
+    for name, per_second in rows:
+        print(f"{name:<48}{per_second:>10,.0f} cmd/s")
+
+    intents, entities = Counter(), Counter()
+    for _, intent, found in agent.analyze_commands(commands[:5000], args.batch_size, model=model):
+        intents[intent] += 1
+        entities.update(label for _, label in found)
+    print()
+    print("intents:", ', '.join(f"{name} {count}" for name, count in intents.most_common()))
+    print("entities:", ', '.join(f"{name} {count}" for name, count in entities.most_common()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark: due-reminder claim and paging with and without the pending index.
+
+For each table size, a reminders table is filled with mostly completed rows,
+a few thousand future reminders and a small batch of due ones. It then times:
+
+* legacy - the old get_due_reminders: unindexed SELECT, then one UPDATE per row
+* claim  - ReminderStore.claim_due: one UPDATE ... RETURNING over idx_reminders_pending
+* recurring claim - the same claim when every pending reminder is a daily
+  series, so each claimed row is moved on to its next occurrence
+* page   - ReminderStore.pending_page for a page deep into the pending set
+
+Run from the personal_assistant directory:
+    python benchmarks/bench_reminder_queries.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import datetime
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reminder_store import ReminderStore, MIGRATIONS
+
+NOW = datetime.datetime(2026, 1, 1, 12, 0)
+DUE_PER_ROUND = 50
+PENDING = 5000
+
+
+def due_time(i):
+    return (NOW - datetime.timedelta(minutes=i)).isoformat()
+
+
+def fill(conn, size, rule=None):
+    """size rows: DUE_PER_ROUND due, PENDING in the future, the rest completed in the past
+
+    With a rule, the due and future reminders are recurring series.
+    """
+    def rows():
+        for i in range(size):
+            if i < DUE_PER_ROUND:
+                yield f"due {i}", due_time(i), 0, rule
+            elif i < DUE_PER_ROUND + PENDING:
+                yield f"future {i}", (NOW + datetime.timedelta(minutes=i)).isoformat(), 0, rule
+            else:
+                yield f"done {i}", due_time(i), 1, None
+    if rule is None:
+        conn.executemany('INSERT INTO reminders (reminder_text, reminder_time, is_completed) VALUES (?, ?, ?)',
+                         (row[:3] for row in rows()))
+    else:
+        conn.executemany('INSERT INTO reminders (reminder_text, reminder_time, is_completed, recurrence) '
+                         'VALUES (?, ?, ?, ?)', rows())
+    conn.commit()
+
+
+def legacy_claim(path):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute('SELECT id, reminder_text FROM reminders WHERE reminder_time <= ? AND is_completed = 0 '
+                   'ORDER BY reminder_time', (NOW.isoformat(),))
+    rows = cursor.fetchall()
+    for reminder_id, _ in rows:
+        cursor.execute('UPDATE reminders SET is_completed = 1 WHERE id = ?', (reminder_id,))
+    conn.commit()
+    conn.close()
+    return rows
+
+
+def reset_due(path):
+    conn = sqlite3.connect(path)
+    conn.execute('UPDATE reminders SET is_completed = 0 WHERE id <= ?', (DUE_PER_ROUND,))
+    # Recurring series were moved on to tomorrow; make them due again
+    conn.executemany('UPDATE reminders SET reminder_time = ? WHERE id = ?',
+                     ((due_time(i), i + 1) for i in range(DUE_PER_ROUND)))
+    conn.commit()
+    conn.close()
+
+
+def timed(function, rounds, path):
+    total = 0.0
+    for _ in range(rounds):
+        reset_due(path)
+        start = time.perf_counter()
+        claimed = function()
+        total += time.perf_counter() - start
+        assert len(claimed) == DUE_PER_ROUND, len(claimed)
+    return total * 1000 / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{DUE_PER_ROUND} due reminders per claim, {PENDING} pending in the future\n")
+    print(f"{'rows':>10}{'legacy claim':>16}{'indexed claim':>16}{'recurring claim':>18}{'deep page':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            legacy_path = os.path.join(directory, f'legacy_{size}.db')
+            conn = sqlite3.connect(legacy_path)
+            conn.execute(MIGRATIONS[0])
+            fill(conn, size)
+            conn.close()
+            legacy_ms = timed(lambda: legacy_claim(legacy_path), args.rounds, legacy_path)
+
+            store_path = os.path.join(directory, f'store_{size}.db')
+            store = ReminderStore(store_path)
+            conn = sqlite3.connect(store_path)
+            fill(conn, size)
+            conn.close()
+            claim_ms = timed(lambda: store.claim_due(NOW), args.rounds, store_path)
+
+            recurring_path = os.path.join(directory, f'recurring_{size}.db')
+            recurring = ReminderStore(recurring_path)
+            conn = sqlite3.connect(recurring_path)
+            fill(conn, size, rule='FREQ=DAILY;INTERVAL=1;BYHOUR=9;BYMINUTE=0')
+            conn.close()
+            recurring_ms = timed(lambda: recurring.claim_due(NOW), args.rounds, recurring_path)
+            recurring.close()
+
+            # Page 90 of 100-row pages through the pending reminders
+            cursor = None
+            for _ in range(89):
+                _, cursor = store.pending_page(100, cursor)
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                store.pending_page(100, cursor)
+            page_ms = (time.perf_counter() - start) * 1000 / args.rounds
+            store.close()
+
+            print(f"{size:>10}{legacy_ms:>13.2f} ms{claim_ms:>13.2f} ms{recurring_ms:>15.2f} ms{page_ms:>11.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ReminderStore vs the old connect-per-call reminders code.
+
+Several writer threads insert reminders while reader threads run the due
+query, first with the previous pattern (a new connection, CREATE TABLE IF
+NOT EXISTS and a rollback-journal commit for every reminder) and then with
+ReminderStore (one WAL connection per thread, schema migrated once). Reports
+insert and due-query throughput and the number of "database is locked"
+failures.
+
+Run from the personal_assistant directory:
+    python benchmarks/bench_reminder_store.py [--writers 4] [--readers 2] [--inserts 500]
+"""
+
+import argparse
+import datetime
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reminder_store import ReminderStore, MIGRATIONS
+
+# The due query exactly as the old agent.py ran it
+LEGACY_DUE_SQL = ('SELECT id, reminder_text FROM reminders WHERE reminder_time <= ? AND is_completed = 0 '
+                  'ORDER BY reminder_time')
+
+
+class LegacyStore:
+    """The pre-ReminderStore code path from agent.py"""
+
+    def __init__(self, path):
+        self.path = path
+        self._init().close()
+
+    def _init(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute(MIGRATIONS[0])
+        conn.commit()
+        return conn
+
+    def add(self, text, reminder_time):
+        conn = self._init()
+        conn.execute('INSERT INTO reminders (reminder_text, reminder_time) VALUES (?, ?)',
+                     (text, reminder_time.isoformat()))
+        conn.commit()
+        conn.close()
+
+    def due(self, now):
+        conn = sqlite3.connect(self.path)
+        rows = conn.execute(LEGACY_DUE_SQL, (now.isoformat(),)).fetchall()
+        conn.close()
+        return rows
+
+
+def run(store, writers, readers, inserts):
+    errors = []
+    failed_inserts = [0] * writers
+    reads = [0] * readers
+    writing = threading.Event()
+    writing.set()
+    future = datetime.datetime.now() + datetime.timedelta(days=1)
+    now = datetime.datetime.now()
+
+    def writer(index):
+        for i in range(inserts):
+            try:
+                store.add(f"writer {index} reminder {i}", future + datetime.timedelta(seconds=i))
+            except sqlite3.OperationalError as e:
+                failed_inserts[index] += 1
+                errors.append(str(e))
+
+    def reader(index):
+        while writing.is_set():
+            try:
+                store.due(now)
+                reads[index] += 1
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+
+    reader_threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    writer_threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in reader_threads:
+        thread.start()
+    start = time.perf_counter()
+    for thread in writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    writing.clear()
+    for thread in reader_threads:
+        thread.join()
+
+    locked = sum('locked' in error for error in errors)
+    other = sorted(set(error for error in errors if 'locked' not in error))
+    return {
+        'inserts_per_s': (writers * inserts - sum(failed_inserts)) / elapsed,
+        'due_queries_per_s': sum(reads) / elapsed,
+        'locked_errors': locked,
+        'other_errors': len(errors) - locked,
+        'other_messages': other,
+        'seconds': elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=2)
+    parser.add_argument('--inserts', type=int, default=500, help='reminders inserted per writer thread')
+    args = parser.parse_args()
+
+    print(f"{args.writers} writer threads x {args.inserts} inserts, {args.readers} due-query threads\n")
+    print(f"{'store':<16}{'inserts/s':>12}{'due queries/s':>16}{'locked':>9}{'other errors':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, store in (('legacy', LegacyStore(os.path.join(directory, 'legacy.db'))),
+                            ('ReminderStore', ReminderStore(os.path.join(directory, 'store.db')))):
+            result = run(store, args.writers, args.readers, args.inserts)
+            print(f"{name:<16}{result['inserts_per_s']:>12.0f}{result['due_queries_per_s']:>16.0f}"
+                  f"{result['locked_errors']:>9}{result['other_errors']:>14}")
+            for message in result['other_messages']:
+                print(f"    {message}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time_parser vs the old regex parse_reminder_time.
+
+Times both over a corpus of reminder time phrasings (cold and warm cache for
+time_parser, plus parse_many), counts how many phrasings each understands and
+lists the templates where the two disagree.
+
+Run from the personal_assistant directory:
+    python benchmarks/bench_time_parser.py [--queries 20000] [--distinct 3000]
+"""
+
+import argparse
+import datetime
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time_parser
+
+NOW = datetime.datetime(2026, 1, 7, 13, 20)
+
+TEMPLATES = [
+    "in {n} minutes",
+    "in {n} hours",
+    "in {n} days",
+    "at {h} PM",
+    "at {h}:{mm} am",
+    "at {h24}:{mm}",
+    "tomorrow",
+    "tomorrow at {h} AM",
+    "tomorrow at {h}:{mm} pm",
+    "next week",
+    "at {h} PM today",
+    "{n}h{m}m",
+    "in {n} hours and {m} minutes",
+    "{n} minutes from now",
+    "in an hour",
+    "in half an hour",
+    "{weekday}",
+    "next {weekday}",
+    "on {weekday} at {h}pm",
+    "this weekend",
+    "tonight",
+    "tomorrow morning",
+    "in {n} days at {h} p.m.",
+    "every day at {h}am",
+    "every weekday at {h}:{mm}",
+    "every {weekday} and {weekday2} at {h} pm",
+    "every {n} hours",
+    "the day after tomorrow at noon",
+]
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def legacy_parse_reminder_time(time_str, now=NOW):
+    """parse_reminder_time before time_parser (with `now` passed in)"""
+    if not time_str:
+        return None
+    time_str = time_str.lower()
+    time_match = re.search(r'in\s+(\d+)\s+(minute|hour|day|week)s?', time_str)
+    if time_match:
+        value = int(time_match.group(1))
+        unit = time_match.group(2)
+        if unit.startswith('min'):
+            return now + datetime.timedelta(minutes=value)
+        elif unit.startswith('hour'):
+            return now + datetime.timedelta(hours=value)
+        elif unit.startswith('day'):
+            return now + datetime.timedelta(days=value)
+        elif unit.startswith('week'):
+            return now + datetime.timedelta(weeks=value)
+    time_match = re.search(r'at\s+(\d{1,2})(?::(\d{2}))?\s*(am|pm)?', time_str)
+    if time_match:
+        hour = int(time_match.group(1))
+        minute = int(time_match.group(2) or 0)
+        period = time_match.group(3)
+        if period:
+            if period == 'pm' and hour < 12:
+                hour += 12
+            elif period == 'am' and hour == 12:
+                hour = 0
+        try:
+            reminder_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        except ValueError:
+            return None
+        if reminder_time < now:
+            reminder_time += datetime.timedelta(days=1)
+        return reminder_time
+    if 'tomorrow' in time_str:
+        tomorrow = now + datetime.timedelta(days=1)
+        time_match = re.search(r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)?', time_str)
+        if time_match:
+            hour = int(time_match.group(1))
+            minute = int(time_match.group(2) or 0)
+            period = time_match.group(3)
+            if period:
+                if period == 'pm' and hour < 12:
+                    hour += 12
+                elif period == 'am' and hour == 12:
+                    hour = 0
+            return tomorrow.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return tomorrow.replace(hour=9, minute=0, second=0, microsecond=0)
+    return None
+
+
+def fill(template, rng):
+    weekday, weekday2 = rng.sample(WEEKDAYS, 2)
+    return template.format(n=rng.randint(1, 12), m=rng.randint(1, 59), h=rng.randint(1, 11),
+                           h24=rng.randint(0, 23), mm=f"{rng.randint(0, 59):02d}",
+                           weekday=weekday, weekday2=weekday2)
+
+
+def build_corpus(size, distinct, seed=7):
+    """size phrasings drawn from a pool of distinct ones (users repeat themselves)"""
+    rng = random.Random(seed)
+    pool = set()
+    for _ in range(distinct * 20):
+        pool.add(fill(rng.choice(TEMPLATES), rng))
+        if len(pool) == distinct:
+            break
+    pool = sorted(pool)
+    return [rng.choice(pool) for _ in range(size)]
+
+
+def timed(func, corpus):
+    start = time.perf_counter()
+    for phrase in corpus:
+        func(phrase, NOW)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--queries', type=int, default=20000)
+    parser.add_argument('--distinct', type=int, default=3000)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.queries, args.distinct)
+    legacy = timed(legacy_parse_reminder_time, corpus)
+    time_parser._compile.cache_clear()
+    time_parser.normalize.cache_clear()
+    cold = timed(time_parser.parse, corpus)
+    warm = timed(time_parser.parse, corpus)
+    start = time.perf_counter()
+    time_parser.parse_many(corpus, NOW)
+    bulk = time.perf_counter() - start
+
+    distinct = sorted(set(corpus))
+    print(f"{len(corpus):,} phrasings ({len(distinct):,} distinct), now = {NOW:%a %Y-%m-%d %H:%M}")
+    print("-" * 60)
+    for label, seconds in (('legacy parse_reminder_time', legacy), ('time_parser (cold cache)', cold),
+                           ('time_parser (warm cache)', warm), ('parse_many (warm)', bulk)):
+        print(f"{label:<28}{seconds * 1e6 / len(corpus):>8.2f} us/phrase{len(corpus) / seconds:>14,.0f} p/s")
+    print(f"cache: {time_parser.cache_info()}")
+
+    understood_old = sum(legacy_parse_reminder_time(phrase) is not None for phrase in distinct)
+    understood_new = sum(time_parser.parse(phrase, NOW) is not None for phrase in distinct)
+    print()
+    print(f"distinct phrasings understood: legacy {understood_old:,}, time_parser {understood_new:,}")
+    print("Templates where the answers differ (legacy -> time_parser):")
+    rng = random.Random(1)
+    for template in TEMPLATES:
+        phrase = fill(template, rng)
+        old, new = legacy_parse_reminder_time(phrase), time_parser.parse(phrase, NOW)
+        if old != new:
+            print(f"  {phrase!r}: {old and f'{old:%a %d %H:%M}'} -> {new and f'{new:%a %d %H:%M}'}")
+
+
+if __name__ == '__main__':
+    main()
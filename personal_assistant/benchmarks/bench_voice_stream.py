@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Benchmark: answer latency of streamed (/ask/stream) vs uploaded (/ask) voice commands.
+
+Starts app.py in a child process (werkzeug's threaded server) and plays a
+synthetic utterance (a tone between stretches of quiet noise) at real-time
+pace. Streamed: PCM goes up in chunked encoding as it is "recorded" and the
+clock runs from the end of speech to the final event. Uploaded: the whole
+recording (including the quiet tail the user speaks into before pressing
+stop) is sent as one WAV after it ends, so the tail is part of the latency.
+
+Run from the personal_assistant directory:
+    python benchmarks/bench_voice_stream.py [--speech 2] [--tail 1.5] [--runs 5] [--backend fake]
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import wave
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from voice_pipeline import SAMPLE_RATE, SAMPLE_WIDTH
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHUNK_SECONDS = 0.1
+
+
+def serve(port):
+    # Exit through atexit on terminate() so the recognizer pool's workers are shut down too
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    sys.path.insert(0, APP_DIR)
+    from app import app
+    from werkzeug.serving import make_server
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('server did not start')
+
+
+def utterance(lead, speech, tail, seed=3):
+    """PCM: `lead` s of noise, `speech` s of a warbling tone, `tail` s of noise; and where speech ends (bytes)"""
+    rng = random.Random(seed)
+    samples = array('h')
+    for _ in range(int(lead * SAMPLE_RATE)):
+        samples.append(rng.randint(-60, 60))
+    for i in range(int(speech * SAMPLE_RATE)):
+        samples.append(int(6000 * math.sin(2 * math.pi * (180 + 40 * math.sin(i / 2000)) * i / SAMPLE_RATE)))
+    speech_end = len(samples) * SAMPLE_WIDTH
+    for _ in range(int(tail * SAMPLE_RATE)):
+        samples.append(rng.randint(-60, 60))
+    return samples.tobytes(), speech_end
+
+
+def streamed(port, pcm, speech_end):
+    """(seconds from end of speech to the final event, events)"""
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.sendall((f"POST /ask/stream HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+                  f"Content-Type: audio/L16; rate={SAMPLE_RATE}\r\nTransfer-Encoding: chunked\r\n\r\n").encode())
+    sock.setblocking(False)
+    chunk_bytes = int(CHUNK_SECONDS * SAMPLE_RATE) * SAMPLE_WIDTH
+    start = time.perf_counter()
+    received, events, speech_ended_at = b'', [], None
+    for offset in range(0, len(pcm), chunk_bytes):
+        # Pace the upload like a microphone would
+        time.sleep(max(start + offset / (SAMPLE_RATE * SAMPLE_WIDTH) - time.perf_counter(), 0))
+        chunk = pcm[offset:offset + chunk_bytes]
+        sock.sendall(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+        if speech_ended_at is None and offset + len(chunk) >= speech_end:
+            speech_ended_at = start + speech_end / (SAMPLE_RATE * SAMPLE_WIDTH)
+        try:
+            received += sock.recv(65536)
+        except BlockingIOError:
+            pass
+        if b'"final"' in received:
+            break
+    else:
+        sock.sendall(b"0\r\n\r\n")
+    sock.setblocking(True)
+    while b'"final"' not in received and b'"error"' not in received:
+        data = sock.recv(65536)
+        if not data:
+            break
+        received += data
+    finished = time.perf_counter()
+    sock.close()
+    for line in received.split(b'\r\n\r\n', 1)[-1].split(b'\n'):
+        line = line.strip()
+        if line.startswith(b'{'):
+            events.append(json.loads(line))
+    return finished - speech_ended_at, events
+
+
+def uploaded(port, pcm, speech_end):
+    """Seconds from end of speech to the /ask answer when the recording is uploaded after it ends"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as clip:
+        clip.setnchannels(1)
+        clip.setsampwidth(SAMPLE_WIDTH)
+        clip.setframerate(SAMPLE_RATE)
+        clip.writeframes(pcm)
+    boundary = 'benchvoice'
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"audio\"; filename=\"clip.wav\"\r\n"
+            f"Content-Type: audio/wav\r\n\r\n").encode() + buffer.getvalue() + f"\r\n--{boundary}--\r\n".encode()
+    request = urllib.request.Request(f'http://127.0.0.1:{port}/ask', data=body,
+                                     headers={'Content-Type': f'multipart/form-data; boundary={boundary}'})
+    start = time.perf_counter()
+    answer = json.loads(urllib.request.urlopen(request, timeout=120).read())
+    tail = (len(pcm) - speech_end) / (SAMPLE_RATE * SAMPLE_WIDTH)  # still recording after speech ended
+    return tail + time.perf_counter() - start, answer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--speech', type=float, default=2.0)
+    parser.add_argument('--tail', type=float, default=1.5, help='seconds recorded after speech ends')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--backend', default='fake')
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    port = free_port()
+    workdir = tempfile.mkdtemp(prefix='bench_voice_')
+    env = dict(os.environ, REMINDERS_DB=os.path.join(workdir, 'reminders.db'),
+               ARTICLE_CACHE_PATH=os.path.join(workdir, 'article_cache.db'), REMINDER_SCHEDULER='0',
+               TTS_DRIVER='fake', TTS_CACHE_DIR=os.path.join(workdir, 'tts_cache'), VOICE_BACKEND=args.backend)
+    env.setdefault('VOSK_MODEL_PATH', os.path.join(APP_DIR, 'model'))
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', str(port)],
+                              cwd=workdir, env=env, stdout=subprocess.DEVNULL)
+    try:
+        wait_until_up(port)
+        pcm, speech_end = utterance(0.5, args.speech, args.tail)
+        uploaded(port, pcm, speech_end)  # warm up the recognizers
+        stream_times, upload_times = [], []
+        for _ in range(args.runs):
+            seconds, events = streamed(port, pcm, speech_end)
+            stream_times.append(seconds)
+            seconds, answer = uploaded(port, pcm, speech_end)
+            upload_times.append(seconds)
+
+        print(f"backend {args.backend}: {args.speech:.1f}s of speech, {args.tail:.1f}s recorded after it, "
+              f"{args.runs} runs")
+        print("-" * 60)
+        for label, times in (('streamed /ask/stream', stream_times), ('uploaded /ask', upload_times)):
+            times.sort()
+            print(f"{label:<24}median {times[len(times) // 2] * 1000:>7.0f} ms   "
+                  f"best {times[0] * 1000:>7.0f} ms after end of speech")
+        print()
+        print("last stream's events:")
+        for event in events:
+            print(f"  {json.dumps(event)}")
+        print(f"upload answer: {json.dumps(answer)}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
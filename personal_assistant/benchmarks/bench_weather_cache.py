@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: OpenWeatherMap requests made with and without WeatherService.
+
+Replays simulated traffic against FakeOWM on a simulated clock: single-city
+questions with a skewed city popularity (some of them misspelled), plus a
+dashboard that asks for every city at once each minute. Counts the upstream
+requests the old get_weather (one weather_at_place per question) would have
+made against WeatherService's, and times the cached lookups.
+
+Run from the personal_assistant directory:
+    python benchmarks/bench_weather_cache.py [--questions 20000] [--minutes 240]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weather_service import FAKE_CITIES, FakeOWM, WeatherService
+
+
+def traffic(questions, minutes, seed=11):
+    """(second, city) pairs in time order; popularity falls off like 1/rank, and 5% are typos"""
+    rng = random.Random(seed)
+    names = [row[1] for row in FAKE_CITIES.values()]
+    weights = [1 / rank for rank in range(1, len(names) + 1)]
+    events = []
+    for _ in range(questions):
+        city = rng.choices(names, weights)[0]
+        if rng.random() < 0.05:
+            city = city[:-1] + 'x'
+        elif rng.random() < 0.3:
+            city = city.lower()
+        events.append((rng.uniform(0, minutes * 60), city))
+    return sorted(events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--questions', type=int, default=20000)
+    parser.add_argument('--minutes', type=int, default=240)
+    args = parser.parse_args()
+
+    events = traffic(args.questions, args.minutes)
+    dashboard = [row[1] for row in FAKE_CITIES.values()]
+    clock = [0.0]
+    client = FakeOWM()
+    service = WeatherService(client, clock=lambda: clock[0])
+
+    start = time.perf_counter()
+    minute = -1
+    for second, city in events:
+        clock[0] = second
+        if int(second // 60) != minute:
+            minute = int(second // 60)
+            service.weather_for(dashboard)
+        service.weather(city)
+    elapsed = time.perf_counter() - start
+
+    lookups = len(events) + (minute + 1) * len(dashboard)
+    print(f"{len(events):,} questions + a {len(dashboard)}-city dashboard every minute, "
+          f"over {args.minutes} simulated minutes")
+    print("-" * 60)
+    print(f"{'old get_weather (one call per city)':<38}{lookups:>10,} upstream requests")
+    print(f"{'WeatherService':<38}{service.stats['upstream_calls']:>10,} upstream requests")
+    print(f"  place {service.stats['place_calls']:,}, id {service.stats['id_calls']:,}, "
+          f"group {service.stats['group_calls']:,}; FakeOWM saw {sum(client.calls.values()):,}")
+    print(f"{elapsed * 1e6 / lookups:.2f} us per city lookup through the service (fake client, no latency)")
+    print(f"cache: {service.cache_stats()['observations']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Load test: how many idle /events (SSE) subscribers one app.py process holds.
+
+Starts app.py in a child process (gevent's WSGI server when gevent is
+installed, otherwise werkzeug's threaded server), opens N concurrent
+EventSource-style connections, reports the server's resident memory with all
+of them idle, then sets a reminder that is due immediately through /ask and
+measures how long it takes to reach every subscriber.
+
+Run from the personal_assistant directory:
+    python benchmarks/load_sse.py [--clients 2000] [--server gevent|threaded]
+"""
+
+import sys
+
+if __name__ == '__main__' and '--serve' in sys.argv and 'gevent' in sys.argv:
+    # Must happen before anything imports socket/threading
+    from gevent import monkey
+    monkey.patch_all()
+
+import argparse
+import os
+import resource
+import selectors
+import socket
+import subprocess
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def serve(port, server):
+    sys.path.insert(0, APP_DIR)
+    from app import app
+    if server == 'gevent':
+        from gevent.pywsgi import WSGIServer
+        WSGIServer(('127.0.0.1', port), app, log=None).serve_forever()
+    else:
+        from werkzeug.serving import make_server
+        make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def raise_fd_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+def rss_kb(pid):
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('server did not start')
+
+
+class Subscribers:
+    """Many raw-socket SSE clients multiplexed on one selector"""
+
+    def __init__(self, port):
+        self.port = port
+        self.selector = selectors.DefaultSelector()
+        self.buffers = {}
+        self.connected = set()
+        self.received_at = {}
+
+    def open(self, count, batch=200):
+        request = (f"GET /events HTTP/1.1\r\nHost: 127.0.0.1:{self.port}\r\n"
+                   f"Accept: text/event-stream\r\n\r\n").encode()
+        for start in range(0, count, batch):
+            for _ in range(min(batch, count - start)):
+                sock = socket.create_connection(('127.0.0.1', self.port))
+                sock.sendall(request)
+                sock.setblocking(False)
+                self.selector.register(sock, selectors.EVENT_READ)
+                self.buffers[sock] = b''
+            self.poll(until=lambda: len(self.connected) >= start + batch or len(self.connected) >= count,
+                      timeout=30)
+
+    def poll(self, until, timeout):
+        deadline = time.time() + timeout
+        while not until() and time.time() < deadline:
+            for key, _ in self.selector.select(timeout=0.5):
+                sock = key.fileobj
+                try:
+                    chunk = sock.recv(65536)
+                except BlockingIOError:
+                    continue
+                if not chunk:
+                    self.selector.unregister(sock)
+                    continue
+                self.buffers[sock] += chunk
+                if b'retry:' in self.buffers[sock]:
+                    self.connected.add(sock)
+                if b'event: reminder' in self.buffers[sock] and sock not in self.received_at:
+                    self.received_at[sock] = time.perf_counter()
+
+    def close(self):
+        for sock in self.buffers:
+            sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--server', choices=['gevent', 'threaded'], default=None)
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.server is None:
+        try:
+            import gevent  # noqa: F401
+            args.server = 'gevent'
+        except ImportError:
+            args.server = 'threaded'
+
+    if args.serve:
+        serve(args.serve, args.server)
+        return
+
+    limit = raise_fd_limit()
+    clients = min(args.clients, limit - 100)
+    port = free_port()
+    workdir = tempfile.mkdtemp(prefix='load_sse_')
+    env = dict(os.environ, REMINDERS_DB=os.path.join(workdir, 'reminders.db'),
+               ARTICLE_CACHE_PATH=os.path.join(workdir, 'article_cache.db'), SSE_HEARTBEAT='30')
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', str(port),
+                               '--server', args.server], cwd=workdir, env=env,
+                              preexec_fn=raise_fd_limit, stdout=subprocess.DEVNULL)
+    subscribers = Subscribers(port)
+    try:
+        wait_until_up(port)
+        idle_rss = rss_kb(server.pid)
+
+        start = time.perf_counter()
+        subscribers.open(clients)
+        connect_s = time.perf_counter() - start
+        time.sleep(1)
+        loaded_rss = rss_kb(server.pid)
+        print(f"server: {args.server}, subscribers connected: {len(subscribers.connected)}/{clients} "
+              f"in {connect_s:.1f}s")
+        print(f"server RSS: {idle_rss / 1024:.1f} MB idle -> {loaded_rss / 1024:.1f} MB "
+              f"({(loaded_rss - idle_rss) / max(len(subscribers.connected), 1):.1f} KB per subscriber)")
+
+        body = urllib.parse.urlencode({'message': 'remind me to stretch in 0 minutes'}).encode()
+        sent = time.perf_counter()
+        urllib.request.urlopen(f'http://127.0.0.1:{port}/ask', data=body, timeout=30).read()
+        subscribers.poll(until=lambda: len(subscribers.received_at) >= len(subscribers.connected), timeout=60)
+
+        latencies = sorted((at - sent) * 1000 for at in subscribers.received_at.values())
+        if latencies:
+            print(f"reminder delivered to {len(latencies)}/{len(subscribers.connected)} subscribers: "
+                  f"p50 {latencies[len(latencies) // 2]:.0f} ms, "
+                  f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.0f} ms, last {latencies[-1]:.0f} ms")
+        else:
+            print("reminder was not delivered")
+    finally:
+        subscribers.close()
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
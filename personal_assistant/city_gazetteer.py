@@ -0,0 +1,97 @@
+"""
+City names found in free text with a compiled gazetteer.
+
+The names listed in data/cities.txt (canonical name first, then aliases,
+separated by "|") are folded (case, accents, punctuation) into a trie keyed
+by word. find() walks the query's words once, taking the longest name that
+starts at each word, so "new york city" beats "york" and nothing has to be
+tried name by name.
+
+A name right after "in", "at", "for", ... wins over one anywhere else
+("nice weather in london" -> London). Names marked "*" in the data file are
+also everyday words ("Nice", "LA") and only count in that position.
+"""
+
+import os
+import re
+import unicodedata
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'cities.txt')
+
+PREPOSITIONS = frozenset(['in', 'at', 'for', 'near', 'around', 'of', 'from', 'to'])
+
+_WORD_RE = re.compile(r'[^\W_]+')
+_END = ''  # trie key of a complete name; never a word
+
+
+def fold(text):
+    """Lowercase text without accents ('São Paulo' -> 'sao paulo')"""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def words(text):
+    return _WORD_RE.findall(fold(text))
+
+
+class Gazetteer:
+    """Word trie of known city names"""
+
+    def __init__(self, entries=()):
+        self._trie = {}
+        self.size = 0
+        for canonical, aliases in entries:
+            for alias in aliases:
+                self.add(canonical, alias)
+
+    def add(self, canonical, name):
+        """Teach the gazetteer `name` (a leading '*' marks an everyday word) as a way to say `canonical`"""
+        ambiguous = name.startswith('*')
+        node = self._trie
+        for word in words(name.lstrip('*')):
+            node = node.setdefault(word, {})
+        if node is not self._trie and _END not in node:  # the first listing of a name keeps it
+            node[_END] = (canonical, ambiguous)
+            self.size += 1
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        """Gazetteer from a data file: one city per line, 'Canonical|alias|*everyday-word alias', '#' comments"""
+        entries = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    names = [name.strip() for name in line.split('|') if name.strip()]
+                    entries.append((names[0].lstrip('*'), names))
+        return cls(entries)
+
+    def matches(self, text):
+        """(canonical name, after a preposition, ambiguous) for each name in text, left to right"""
+        tokens = words(text)
+        position = 0
+        while position < len(tokens):
+            node, found, end = self._trie, None, position
+            while end < len(tokens) and tokens[end] in node:
+                node = node[tokens[end]]
+                end += 1
+                if _END in node:
+                    found = (node[_END], end)
+            if found is None:
+                position += 1
+                continue
+            (canonical, ambiguous), end = found
+            yield canonical, position > 0 and tokens[position - 1] in PREPOSITIONS, ambiguous
+            position = end
+
+    def find(self, text):
+        """The city a query is about, or None"""
+        best = None
+        for canonical, after_preposition, ambiguous in self.matches(text):
+            if after_preposition:
+                return canonical
+            if best is None and not ambiguous:
+                best = canonical
+        return best
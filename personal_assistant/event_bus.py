@@ -0,0 +1,109 @@
+"""
+In-process publish/subscribe bus for server-push notifications (SSE).
+
+Every published event gets an increasing id and is kept in a bounded history,
+so a client that reconnects with Last-Event-ID receives everything it missed
+that is still in the history. Ids start from the boot time in milliseconds,
+which keeps them increasing across restarts: after a restart a client's old
+Last-Event-ID is simply older than everything in the new history.
+
+Subscribers each have a small bounded queue. A subscriber that stops reading
+is dropped instead of slowing down publishers; its client reconnects and
+replays from its last id.
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+HEARTBEAT = ': keep-alive\n\n'
+
+
+def format_sse(event_id, event, data):
+    """One Server-Sent Events message"""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class Subscription:
+    """One connected client's view of the bus"""
+
+    def __init__(self, bus, max_queue):
+        self.bus = bus
+        self.queue = queue.Queue(max_queue)
+        self.closed = False
+
+    def put(self, message):
+        """Queue a formatted message; False if the client is not keeping up"""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except queue.Full:
+            return False
+
+    def messages(self, heartbeat=15.0):
+        """Formatted SSE messages as they arrive, with a comment line every `heartbeat` idle seconds"""
+        while not self.closed:
+            try:
+                message = self.queue.get(timeout=heartbeat)
+            except queue.Empty:
+                yield HEARTBEAT
+                continue
+            if message is None:
+                return
+            yield message
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.bus._unsubscribe(self)
+            self.put(None)
+
+
+class EventBus:
+    """Fan-out of published events to every live subscription"""
+
+    def __init__(self, history=1000, max_queue=256):
+        self.max_queue = max_queue
+        self._history = deque(maxlen=history)  # (id, formatted message)
+        self._subscribers = set()
+        self._next_id = int(time.time() * 1000)
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def publish(self, event, data):
+        """Send an event to every subscriber; returns its id"""
+        with self._lock:
+            self._next_id += 1
+            event_id = self._next_id
+            message = format_sse(event_id, event, data)
+            self._history.append((event_id, message))
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if not subscription.put(message):
+                self.dropped += 1
+                subscription.close()
+        return event_id
+
+    def subscribe(self, last_event_id=None):
+        """A new Subscription, pre-loaded with the events after last_event_id (if given)"""
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_event_id = None
+        with self._lock:
+            missed = [message for event_id, message in self._history
+                      if last_event_id is not None and event_id > last_event_id]
+            subscription = Subscription(self, self.max_queue + len(missed))
+            for message in missed:
+                subscription.put(message)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
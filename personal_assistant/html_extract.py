@@ -0,0 +1,270 @@
+"""
+HTML extraction for Bing result pages and news article bodies.
+
+Three interchangeable parser backends produce the same output:
+
+* selectolax - lexbor HTML5 parser (fastest), used when selectolax is installed
+* lxml       - libxml2 parser with precompiled XPath expressions
+* bs4        - BeautifulSoup's html.parser, restricted with SoupStrainers so
+               only the result items / article containers are ever built
+
+The default backend is the first one available in that order; HTML_PARSER
+(selectolax, lxml, bs4 or auto) forces a specific one.
+"""
+
+import os
+
+# Containers tried in order when looking for an article's main content
+ARTICLE_SELECTORS = (
+    'article',
+    'div.article-body',
+    'div.article-content',
+    'div.story-body',
+    'div.entry-content',
+    'div.post-content',
+    'div[itemprop="articleBody"]',
+    'div.article__content',
+    'div.article-text',
+    'div.content__body',
+    'div.post__content',
+)
+# Elements whose text never counts as article content
+ARTICLE_NOISE_TAGS = ('script', 'style', 'nav', 'footer', 'aside')
+ARTICLE_TEXT_TAGS = ('p', 'h2', 'h3', 'h4')
+ARTICLE_MIN_CHARS = 100
+ARTICLE_MAX_WORDS = 200
+
+BACKEND_ORDER = ('selectolax', 'lxml', 'bs4')
+
+
+def _summarize(text):
+    """First ARTICLE_MAX_WORDS words of text, or None if there is too little of it"""
+    if len(text) > ARTICLE_MIN_CHARS:
+        return ' '.join(text.split()[:ARTICLE_MAX_WORDS]) + '...'
+    return None
+
+
+def _selector_parts(selector):
+    """('div', 'class', 'article-body') style triple for one of ARTICLE_SELECTORS"""
+    if '[' in selector:
+        tag, attr = selector.rstrip(']').split('[')
+        name, value = attr.split('=')
+        return tag, name, value.strip('"')
+    if '.' in selector:
+        tag, cls = selector.split('.')
+        return tag, 'class', cls
+    return selector, None, None
+
+
+class SelectolaxBackend:
+    name = 'selectolax'
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parse = LexborHTMLParser
+        self._noise = ', '.join(ARTICLE_NOISE_TAGS)
+        self._text_tags = ', '.join(ARTICLE_TEXT_TAGS)
+
+    @staticmethod
+    def _text(node, separator):
+        # Join non-empty stripped text nodes, like bs4's get_text(separator, strip=True)
+        return separator.join(part for part in node.text(separator='\x00', strip=True).split('\x00') if part)
+
+    def bing_results(self, html, limit):
+        results = []
+        for item in self._parse(html).css('li.b_algo')[:limit]:
+            heading = item.css_first('h2')
+            link = heading.css_first('a') if heading else None
+            if link is None:
+                continue
+            snippet = item.css_first('p')
+            results.append((self._text(link, ''), link.attributes.get('href'),
+                            self._text(snippet, '') if snippet else None))
+        return results
+
+    def article_text(self, html):
+        tree = self._parse(html)
+        for selector in ARTICLE_SELECTORS:
+            container = tree.css_first(selector)
+            if container is not None:
+                for node in container.css(self._noise):
+                    node.decompose()
+                return _summarize(' '.join(self._text(node, ' ') for node in container.css(self._text_tags)))
+        return None
+
+
+class LxmlBackend:
+    name = 'lxml'
+
+    def __init__(self):
+        from lxml import etree, html as lxml_html
+        self._parse = lxml_html.fromstring
+        self._parser_error = etree.ParserError
+        self._bing_items = etree.XPath(
+            "//li[contains(concat(' ', normalize-space(@class), ' '), ' b_algo ')]")
+        self._article_xpaths = [etree.XPath(self._xpath(selector)) for selector in ARTICLE_SELECTORS]
+
+    @staticmethod
+    def _xpath(selector):
+        tag, attr, value = _selector_parts(selector)
+        if attr == 'class':
+            return f"(//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {value} ')])[1]"
+        if attr:
+            return f"(//{tag}[@{attr}='{value}'])[1]"
+        return f"(//{tag})[1]"
+
+    @staticmethod
+    def _text(element, separator):
+        return separator.join(part.strip() for part in element.itertext() if part.strip())
+
+    def _tree(self, html):
+        try:
+            return self._parse(html)
+        except self._parser_error:  # Empty document
+            return None
+
+    def bing_results(self, html, limit):
+        tree = self._tree(html)
+        if tree is None:
+            return []
+        results = []
+        for item in self._bing_items(tree)[:limit]:
+            heading = next(item.iter('h2'), None)
+            link = next(heading.iter('a'), None) if heading is not None else None
+            if link is None:
+                continue
+            snippet = next(item.iter('p'), None)
+            results.append((self._text(link, ''), link.get('href'),
+                            self._text(snippet, '') if snippet is not None else None))
+        return results
+
+    def article_text(self, html):
+        tree = self._tree(html)
+        if tree is None:
+            return None
+        for xpath in self._article_xpaths:
+            found = xpath(tree)
+            if found:
+                container = found[0]
+                for node in list(container.iter(*ARTICLE_NOISE_TAGS)):
+                    node.drop_tree()
+                return _summarize(' '.join(self._text(node, ' ') for node in container.iter(*ARTICLE_TEXT_TAGS)))
+        return None
+
+
+def _selector_strainer(SoupStrainer, selectors):
+    """A SoupStrainer that only lets elements matching selectors (with their contents) be built.
+
+    Class selectors match any one of an element's classes, so <li class="b_algo tpcn">
+    passes 'li.b_algo' (SoupStrainer(class_=...) compares the whole attribute in bs4 4.13+).
+    """
+    rules = {}
+    for tag, attr, value in map(_selector_parts, selectors):
+        rules.setdefault(tag, []).append((attr, value))
+
+    def matches(name, attrs):
+        for attr, value in rules.get(name, ()):
+            if attr is None:
+                return True
+            actual = dict(attrs or {}).get(attr) or ''
+            if attr == 'class' and value in (actual if isinstance(actual, list) else actual.split()):
+                return True
+            if attr != 'class' and actual == value:
+                return True
+        return False
+
+    class SelectorStrainer(SoupStrainer):
+        # beautifulsoup4 >= 4.13 asks allow_tag_creation(); older versions call search_tag()
+        def allow_tag_creation(self, nsprefix, name, attrs):
+            return matches(name, attrs)
+
+        def search_tag(self, markup_name=None, markup_attrs={}):
+            if isinstance(markup_name, str):
+                return markup_name if matches(markup_name, markup_attrs) else None
+            return super().search_tag(markup_name, markup_attrs)
+
+    return SelectorStrainer(sorted(rules))
+
+
+class SoupBackend:
+    name = 'bs4'
+
+    def __init__(self):
+        from bs4 import BeautifulSoup, SoupStrainer
+        import soupsieve
+        self._soup = BeautifulSoup
+        self._bing_strainer = _selector_strainer(SoupStrainer, ('li.b_algo',))
+        self._article_strainer = _selector_strainer(SoupStrainer, ARTICLE_SELECTORS)
+        self._article_selectors = [soupsieve.compile(selector) for selector in ARTICLE_SELECTORS]
+
+    def bing_results(self, html, limit):
+        soup = self._soup(html, 'html.parser', parse_only=self._bing_strainer)
+        results = []
+        for item in soup.find_all('li', class_='b_algo')[:limit]:
+            heading = item.find('h2')
+            link = heading.find('a') if heading else None
+            if link is None:
+                continue
+            snippet = item.find('p')
+            results.append((link.get_text(strip=True), link.get('href'),
+                            snippet.get_text(strip=True) if snippet else None))
+        return results
+
+    def article_text(self, html):
+        # Only the candidate container elements (and their contents) are built
+        soup = self._soup(html, 'html.parser', parse_only=self._article_strainer)
+        for selector in self._article_selectors:
+            container = selector.select_one(soup)
+            if container:
+                for node in container.find_all(ARTICLE_NOISE_TAGS):
+                    node.decompose()
+                return _summarize(' '.join(node.get_text(' ', strip=True)
+                                           for node in container.find_all(ARTICLE_TEXT_TAGS)))
+        return None
+
+
+_BACKENDS = {
+    'selectolax': SelectolaxBackend,
+    'lxml': LxmlBackend,
+    'bs4': SoupBackend,
+}
+_instances = {}
+
+
+def available_backends():
+    """Names of the backends whose parser library is installed, fastest first"""
+    names = []
+    for name in BACKEND_ORDER:
+        try:
+            get_backend(name)
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+
+def get_backend(name=None):
+    """A backend instance by name; 'auto' (or None) picks the fastest installed one"""
+    name = name or os.getenv('HTML_PARSER', 'auto')
+    if name == 'auto':
+        for candidate in BACKEND_ORDER:
+            try:
+                return get_backend(candidate)
+            except ImportError:
+                continue
+        raise ImportError("No HTML parser available; install beautifulsoup4")
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend: {name}")
+    if name not in _instances:
+        _instances[name] = _BACKENDS[name]()
+    return _instances[name]
+
+
+def bing_results(html, limit=5, backend=None):
+    """(title, link, snippet or None) for the first `limit` Bing results on a page"""
+    return get_backend(backend).bing_results(html, limit)
+
+
+def extract_article_text(html, backend=None):
+    """First 200 words of an article page's main content, or None"""
+    return get_backend(backend).article_text(html)
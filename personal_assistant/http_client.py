@@ -0,0 +1,293 @@
+"""
+Shared outbound HTTP client for every fetcher in agent.py.
+
+One requests.Session holds a keep-alive connection pool per host. On top of
+it HttpClient adds:
+
+* default headers (built once) with gzip/deflate, plus br when brotli is installed
+* retries of idempotent requests with exponential backoff and full jitter for
+  connection errors, timeouts and 429/5xx responses, within a total deadline
+  per call (by default the request timeout, so a retried call takes no longer
+  than an unretried one could)
+* a per-host concurrency cap
+* a per-host circuit breaker that fails fast while an upstream is down; a call
+  counts as one failure however many attempts it made
+* per-host latency histograms
+"""
+
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode br responses)
+    _ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        _ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept-Encoding': _ACCEPT_ENCODING,
+    'Connection': 'keep-alive',
+}
+
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+# Methods that are safe to send again after a failed attempt
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float('inf'))
+
+
+def _cap_timeout(timeout, remaining):
+    """A requests timeout (seconds or a (connect, read) pair) cut down to the time remaining"""
+    if timeout is None:
+        return remaining
+    if isinstance(timeout, tuple):
+        return tuple(min(part, remaining) for part in timeout)
+    return min(timeout, remaining)
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without touching the network while a host's circuit is open"""
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; lets one trial through after `cooldown` seconds"""
+
+    def __init__(self, threshold=5, cooldown=30.0, clock=time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if self.clock() - self.opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def abandon(self):
+        """Forget a trial request that ended without a verdict"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.threshold or self.opened_at is not None:
+                self.opened_at = self.clock()
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, ms):
+        with self._lock:
+            for index, bound in enumerate(self.buckets):
+                if ms <= bound:
+                    self.counts[index] += 1
+                    break
+            self.count += 1
+            self.total_ms += ms
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of observations"""
+        with self._lock:
+            if not self.count:
+                return None
+            target = fraction * self.count
+            seen = 0
+            for bound, count in zip(self.buckets, self.counts):
+                seen += count
+                if seen >= target:
+                    return bound
+            return self.buckets[-1]
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'count': self.count,
+                'mean_ms': self.total_ms / self.count if self.count else None,
+                'buckets': {('+Inf' if bound == float('inf') else bound): count
+                            for bound, count in zip(self.buckets, self.counts)},
+            }
+
+
+class _Host:
+    """Per-host limiter, breaker and latency histogram"""
+
+    def __init__(self, max_concurrency, breaker_threshold, breaker_cooldown):
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+
+
+class HttpClient:
+    """Pooled, retrying, per-host limited HTTP client"""
+
+    def __init__(self, max_retries=2, backoff_base=0.25, backoff_max=4.0, max_concurrency_per_host=8,
+                 pool_maxsize=16, breaker_threshold=5, breaker_cooldown=30.0, default_timeout=10,
+                 deadline=None, headers=None, sleep=time.sleep):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_concurrency_per_host = max_concurrency_per_host
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.default_timeout = default_timeout
+        self.deadline = deadline  # total seconds per call across retries; None: the request timeout
+        self.sleep = sleep
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=pool_maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url):
+        netloc = urlsplit(url).netloc.lower()
+        host = self._hosts.get(netloc)
+        if host is None:
+            with self._lock:
+                host = self._hosts.get(netloc)
+                if host is None:
+                    host = self._hosts[netloc] = _Host(self.max_concurrency_per_host, self.breaker_threshold,
+                                                       self.breaker_cooldown)
+        return netloc, host
+
+    def _backoff(self, attempt, response=None):
+        """Full-jitter exponential backoff, honouring a numeric Retry-After"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method, url, retry_statuses=RETRY_STATUSES, deadline=None, **kwargs):
+        """Send a request; returns the final requests.Response or raises requests.RequestException
+
+        Only idempotent methods are retried, and only while the request's total
+        deadline (the deadline argument, else the client's, else the timeout)
+        has time left, so retries never make a call slower than one timeout.
+        The circuit breaker counts the whole call as one success or failure.
+        """
+        timeout = kwargs.setdefault('timeout', self.default_timeout)
+        netloc, host = self._host(url)
+        if not host.breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {netloc}; not contacting it for now")
+        # A half-open trial is a single probe, like anything unsafe to repeat
+        retries = self.max_retries if method.upper() in IDEMPOTENT_METHODS and host.breaker.state == 'closed' else 0
+        budget = self.max_duration(timeout, deadline)
+        ends_at = time.monotonic() + budget if budget is not None else float('inf')
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            response = None
+            error = None
+            with host.semaphore:
+                host.requests += 1
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+                except Exception:
+                    # Not the host's fault (bad URL, invalid arguments, ...)
+                    host.breaker.abandon()
+                    raise
+            host.latency.observe((time.perf_counter() - start) * 1000)
+
+            failed = error is not None or response.status_code in retry_statuses
+            if not failed:
+                host.breaker.record_success()
+                return response
+
+            host.errors += 1
+            pause = self._backoff(attempt, response)
+            if attempt >= retries or ends_at - time.monotonic() - pause <= 0:
+                host.breaker.record_failure()
+                if error is not None:
+                    raise error
+                return response
+            host.retries += 1
+            if response is not None:
+                response.close()
+            self.sleep(pause)
+            attempt += 1
+            kwargs['timeout'] = _cap_timeout(timeout, ends_at - time.monotonic())
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def max_duration(self, timeout=None, deadline=None):
+        """Longest one request() can take, retries included (None: unbounded)"""
+        if deadline or self.deadline:
+            return deadline or self.deadline
+        timeout = self.default_timeout if timeout is None else timeout
+        return sum(timeout) if isinstance(timeout, tuple) else timeout
+
+    def stats(self):
+        """Per-host request counts, breaker state and latency histogram"""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {
+            netloc: {
+                'requests': host.requests,
+                'retries': host.retries,
+                'errors': host.errors,
+                'circuit': host.breaker.state,
+                'p50_ms': host.latency.percentile(0.5),
+                'p95_ms': host.latency.percentile(0.95),
+                'latency': host.latency.snapshot(),
+            }
+            for netloc, host in hosts.items()
+        }
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,155 @@
+"""
+Intent routing for the assistant.
+
+All trigger phrases of all registered intents are compiled into a single
+phrase table keyed by token sequence. A command is tokenized once and its
+tokens are intersected with the set of tokens that start a trigger phrase, so
+only those few are looked up in the table: routing cost depends on the length
+of the command, not on how many intents or trigger phrases exist. Every trigger
+hit becomes a candidate and the candidates are ranked by intent priority
+(then by position in the command).
+"""
+
+import string
+import threading
+from collections import namedtuple
+
+# Special trigger that matches any numeric token
+NUMBER = '<number>'
+
+# A ranked routing candidate
+IntentMatch = namedtuple('IntentMatch', ['name', 'priority', 'position', 'trigger'])
+
+# Punctuation and operator symbols become tokens of their own
+_SYMBOLS = string.punctuation + '×÷'
+_TOKENIZE_TABLE = str.maketrans({symbol: f' {symbol} ' for symbol in _SYMBOLS if symbol != '_'})
+
+
+def tokenize(text):
+    """Lower-case text and split it into word, number and symbol tokens"""
+    return text.lower().translate(_TOKENIZE_TABLE).split()
+
+
+class Intent:
+    """A named intent with its handler, trigger phrases and priority"""
+
+    def __init__(self, name, handler, triggers=(), priority=0):
+        self.name = name
+        self.handler = handler
+        self.triggers = tuple(trigger if trigger == NUMBER else trigger.lower() for trigger in triggers)
+        self.priority = priority
+
+    def __repr__(self):
+        return f"Intent({self.name!r}, priority={self.priority})"
+
+
+class IntentRouter:
+    """Registry of intents compiled into one single-pass phrase table"""
+
+    def __init__(self):
+        self._intents = {}
+        self._lock = threading.Lock()
+        self._compiled = None
+
+    # Registration
+
+    def register(self, name, handler, triggers=(), priority=0):
+        """Register (or replace) an intent and invalidate the compiled table"""
+        with self._lock:
+            self._intents[name] = Intent(name, handler, triggers, priority)
+            self._compiled = None
+        return handler
+
+    def intent(self, name, triggers=(), priority=0):
+        """Decorator form of register()"""
+        def decorator(handler):
+            return self.register(name, handler, triggers, priority)
+        return decorator
+
+    def unregister(self, name):
+        """Remove an intent if it is registered"""
+        with self._lock:
+            if self._intents.pop(name, None) is not None:
+                self._compiled = None
+
+    @property
+    def intents(self):
+        return dict(self._intents)
+
+    # Compilation
+
+    def _compile(self):
+        """Build the phrase table: token tuple -> owning intents, best first"""
+        phrases = {}
+        for intent in self._intents.values():
+            for trigger in intent.triggers:
+                key = (NUMBER,) if trigger == NUMBER else tuple(tokenize(trigger))
+                if key:
+                    phrases.setdefault(key, []).append((intent, trigger))
+
+        # For each first token, the phrase lengths to try (longest first)
+        lengths = {}
+        for key in phrases:
+            lengths.setdefault(key[0], set()).add(len(key))
+        lengths = {first: sorted(sizes, reverse=True) for first, sizes in lengths.items()}
+        return phrases, lengths, set(lengths), NUMBER in lengths
+
+    def _table(self):
+        compiled = self._compiled
+        if compiled is None:
+            with self._lock:
+                if self._compiled is None:
+                    self._compiled = self._compile()
+                compiled = self._compiled
+        return compiled
+
+    # Routing
+
+    def route(self, text):
+        """Return the intent candidates for text, best first"""
+        phrases, lengths, firsts, has_number = self._compiled or self._table()
+        if not text or not phrases:
+            return []
+
+        tokens = tokenize(text)
+        # Only tokens that start some trigger phrase are looked at; in most
+        # commands that is a handful, found by one set intersection
+        hits = firsts.intersection(tokens)
+        if has_number and any(map(str.isdigit, tokens)):
+            hits.add(NUMBER)
+        if not hits:
+            return []
+
+        best = {}
+        for first in hits:
+            if first == NUMBER:
+                positions = [next(i for i, token in enumerate(tokens) if token.isdigit())]
+            elif lengths[first] == [1]:
+                positions = [tokens.index(first)]
+            else:
+                positions = [i for i, token in enumerate(tokens) if token == first]
+            for position in positions:
+                for size in lengths[first]:
+                    owners = phrases.get((first,) if size == 1 else tuple(tokens[position:position + size]))
+                    if owners is None:
+                        continue
+                    for intent, trigger in owners:
+                        match = best.get(intent.name)
+                        if match is None or position < match.position:
+                            best[intent.name] = IntentMatch(intent.name, intent.priority, position, trigger)
+                    break
+
+        if len(best) == 1:
+            return list(best.values())
+        return sorted(best.values(), key=lambda match: (-match.priority, match.position))
+
+    def dispatch(self, text):
+        """Run the best matching handler; a handler may return None to defer to the next candidate"""
+        for candidate in self.route(text):
+            intent = self._intents.get(candidate.name)
+            if intent is None:
+                continue
+            response = intent.handler(text)
+            if response is not None:
+                return response
+        return None
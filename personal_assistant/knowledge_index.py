@@ -0,0 +1,187 @@
+"""
+Local knowledge index over everything the assistant has fetched.
+
+Web search results, news articles and extracted article bodies are stored in
+SQLite as they pass through, one row per URL (keyed by its hash, so seeing a
+page again updates it instead of adding a copy), with an FTS5 full-text index
+over title, snippet and body kept in sync by triggers.
+
+search() ranks with FTS5's BM25 (title matches weigh most) boosted by
+recency: the best BM25 candidates have their score multiplied by
+1 + RECENCY_BOOST / (1 + age / half_life), age counting from publication
+time when known. `max_age` keeps only the candidates fetched recently
+enough to answer from:
+
+    knowledge = KnowledgeIndex('knowledge.db')
+    knowledge.add_many([{'url': ..., 'title': ..., 'snippet': ...}], kind='web')
+    knowledge.search('python tutorials', limit=5, max_age=86400)
+"""
+
+import datetime
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+
+from news_index import STOPWORDS
+
+RECENCY_BOOST = 1.0
+HALF_LIFE = 7 * 86400  # seconds of age that halve the recency boost
+CANDIDATES = 20  # best BM25 matches re-ranked for recency, per result asked for
+
+_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def url_key(url):
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+def parse_published(value):
+    """Unix time of an ISO 8601 date ('2024-01-07T15:30:00Z'), or None"""
+    if not value:
+        return None
+    try:
+        published = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=datetime.timezone.utc)
+    return published.timestamp()
+
+
+def match_expression(query):
+    """FTS5 query requiring every non-stopword of a free-text query (None if there are none)"""
+    words = [word for word in _WORD_RE.findall(query.lower()) if word not in STOPWORDS]
+    return ' '.join(f'"{word}"' for word in dict.fromkeys(words)) or None
+
+
+class KnowledgeIndex:
+    """SQLite (WAL) document store with an FTS5 index, one connection per thread"""
+
+    def __init__(self, path='knowledge.db', recency_boost=RECENCY_BOOST, half_life=HALF_LIFE):
+        self.path = path
+        self.recency_boost = recency_boost
+        self.half_life = half_life
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                url_hash TEXT NOT NULL UNIQUE,
+                url TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                title TEXT NOT NULL,
+                snippet TEXT NOT NULL DEFAULT '',
+                body TEXT,
+                source TEXT,
+                published REAL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS documents_fetched_at ON documents(fetched_at);
+            CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                title, snippet, body, content='documents', content_rowid='id', tokenize='porter unicode61'
+            );
+            CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+                INSERT INTO documents_fts(rowid, title, snippet, body)
+                VALUES (new.id, new.title, new.snippet, new.body);
+            END;
+            CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+                INSERT INTO documents_fts(documents_fts, rowid, title, snippet, body)
+                VALUES ('delete', old.id, old.title, old.snippet, old.body);
+            END;
+            CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE OF title, snippet, body ON documents BEGIN
+                INSERT INTO documents_fts(documents_fts, rowid, title, snippet, body)
+                VALUES ('delete', old.id, old.title, old.snippet, old.body);
+                INSERT INTO documents_fts(rowid, title, snippet, body)
+                VALUES (new.id, new.title, new.snippet, new.body);
+            END;
+        ''')
+        conn.execute("INSERT INTO documents_fts(documents_fts, rank) VALUES ('rank', 'bm25(10.0, 3.0, 1.0)')")
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def add_many(self, documents, kind='web'):
+        """Store documents (dicts with url, title and optionally snippet, body, source, published)
+        in one transaction; a URL seen before is updated and its fetch time refreshed"""
+        now = time.time()
+        rows = [(url_key(doc['url']), doc['url'], kind, doc['title'], doc.get('snippet') or '', doc.get('body'),
+                 doc.get('source'), doc.get('published'), now)
+                for doc in documents if doc.get('url') and doc.get('title')]
+        if not rows:
+            return 0
+        conn = self._conn()
+        with conn:
+            conn.executemany('''
+                INSERT INTO documents (url_hash, url, kind, title, snippet, body, source, published, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url_hash) DO UPDATE SET
+                    title = excluded.title,
+                    snippet = CASE WHEN excluded.snippet != '' THEN excluded.snippet ELSE snippet END,
+                    body = COALESCE(excluded.body, body),
+                    source = COALESCE(excluded.source, source),
+                    published = COALESCE(excluded.published, published),
+                    fetched_at = excluded.fetched_at
+            ''', rows)
+        return len(rows)
+
+    def add(self, url, title, snippet='', body=None, kind='web', source=None, published=None):
+        return self.add_many([{'url': url, 'title': title, 'snippet': snippet, 'body': body,
+                               'source': source, 'published': published}], kind)
+
+    def add_body(self, url, body):
+        """Attach an extracted article body to a stored URL (no-op for unknown URLs or an unchanged body)"""
+        if not body:
+            return
+        conn = self._conn()
+        with conn:
+            conn.execute('UPDATE documents SET body = ? WHERE url_hash = ? AND body IS NOT ?',
+                         (body, url_key(url), body))
+
+    def search(self, query, limit=5, max_age=None, kind=None):
+        """Documents containing every word of query, best first, as dicts
+        (url, title, snippet, body, source, kind, published, fetched_at, score)"""
+        expression = match_expression(query)
+        if expression is None:
+            return []
+        now = time.time()
+        # FTS5 picks the best BM25 candidates itself (ORDER BY rank); only those are
+        # joined to their documents and re-ranked with the recency boost
+        sql = '''
+            SELECT d.url, d.title, d.snippet, d.body, d.source, d.kind, d.published, d.fetched_at,
+                   -f.rank * (1.0 + ? / (1.0 + MAX(0.0, ? - COALESCE(d.published, d.fetched_at)) / ?)) AS score
+            FROM (SELECT rowid, rank FROM documents_fts WHERE documents_fts MATCH ? ORDER BY rank LIMIT ?) f
+            JOIN documents d ON d.id = f.rowid
+        '''
+        params = [self.recency_boost, now, self.half_life, expression, limit * CANDIDATES]
+        conditions = []
+        if max_age is not None:
+            conditions.append('d.fetched_at >= ?')
+            params.append(now - max_age)
+        if kind is not None:
+            conditions.append('d.kind = ?')
+            params.append(kind)
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY score DESC LIMIT ?'
+        params.append(limit)
+        columns = ('url', 'title', 'snippet', 'body', 'source', 'kind', 'published', 'fetched_at', 'score')
+        return [dict(zip(columns, row)) for row in self._conn().execute(sql, params)]
+
+    def prune(self, max_age):
+        """Forget documents fetched more than max_age seconds ago; returns how many"""
+        conn = self._conn()
+        with conn:
+            return conn.execute('DELETE FROM documents WHERE fetched_at < ?', (time.time() - max_age,)).rowcount
+
+    def stats(self):
+        count, bodies = self._conn().execute('SELECT COUNT(*), COUNT(body) FROM documents').fetchone()
+        return {'documents': count, 'with_body': bodies}
@@ -0,0 +1,126 @@
+"""
+Lazy, on-demand initialization of heavy backends.
+
+Each backend (spaCy model, TTS engine, API clients, ...) is registered with
+a factory and handed out as a LazyResource proxy. Nothing is loaded until the
+proxy is first used; the first caller builds the backend under a per-resource
+lock and every later access goes straight to the loaded object.
+
+The proxy's own methods are underscored so that every public name (get,
+stats, ...) reaches the backend; use ResourceRegistry.get(name) for the
+backend object itself.
+"""
+
+import threading
+import time
+
+try:
+    import resource as _rusage
+except ImportError:  # Not available on Windows
+    _rusage = None
+
+
+def _max_rss_kb():
+    if _rusage is None:
+        return None
+    return _rusage.getrusage(_rusage.RUSAGE_SELF).ru_maxrss
+
+
+class LazyResource:
+    """Proxy that builds its backend on first use and then delegates to it"""
+
+    def __init__(self, name, factory):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_lock', threading.Lock())
+        object.__setattr__(self, '_value', None)
+        object.__setattr__(self, '_loaded', False)
+        object.__setattr__(self, '_stats', {'loaded': False, 'seconds': None, 'rss_kb': None, 'error': None})
+
+    def _load(self):
+        """Return the backend, initializing it if this is the first use"""
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                rss_before = _max_rss_kb()
+                try:
+                    value = self._factory()
+                except Exception as e:
+                    # A backend that cannot be built behaves like a missing one
+                    print(f"Warning: Could not initialize {self._name}: {e}")
+                    value = None
+                    self._stats['error'] = str(e)
+                rss_after = _max_rss_kb()
+                self._stats['seconds'] = time.perf_counter() - start
+                if rss_before is not None:
+                    self._stats['rss_kb'] = rss_after - rss_before
+                self._stats['loaded'] = True
+                object.__setattr__(self, '_value', value)
+                object.__setattr__(self, '_loaded', True)
+        return self._value
+
+    def _report(self):
+        return dict(self._stats, name=self._name)
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._load(), attr)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __bool__(self):
+        return bool(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self._loaded else 'deferred'
+        return f"<LazyResource {self._name} ({state})>"
+
+
+class ResourceRegistry:
+    """Named collection of lazily built backends"""
+
+    def __init__(self):
+        self._resources = {}
+
+    def register(self, name, factory):
+        """Register a factory and return the proxy for it"""
+        proxy = LazyResource(name, factory)
+        self._resources[name] = proxy
+        return proxy
+
+    def get(self, name):
+        """Return the initialized backend for name"""
+        return self._resources[name]._load()
+
+    def __contains__(self, name):
+        return name in self._resources
+
+    def prewarm(self, names=None, background=True):
+        """Initialize the given backends (all by default), optionally on a daemon thread"""
+        selected = [self._resources[name] for name in (names or self._resources) if name in self._resources]
+
+        def warm():
+            for proxy in selected:
+                proxy._load()
+
+        if not background:
+            warm()
+            return None
+        thread = threading.Thread(target=warm, name='resource-prewarm', daemon=True)
+        thread.start()
+        return thread
+
+    def report(self):
+        """Per-backend initialization cost: load time, RSS growth and any error"""
+        return [proxy._report() for proxy in self._resources.values()]
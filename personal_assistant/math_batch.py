@@ -0,0 +1,219 @@
+"""
+Vectorized batch evaluation of arithmetic expressions with NumPy.
+
+Tokenizing depends only on the text around the numbers, so expressions are
+tokenized once per skeleton (the text with every number replaced by a 1) and
+their numbers are read straight from the text; each skeleton's operator
+template is parsed once. Expressions whose ASTs have the same shape
+("a + b * c") differ only in their numbers, so each shape group is evaluated
+as whole-column NumPy operations over a matrix of its literals. Errors are tracked per element and reported with the same messages
+solve_math gives for a single query.
+"""
+
+import re
+
+import numpy as np
+
+import math_engine
+
+# Splits text into [text, number, text, number, ..., text]
+_NUMBER_SPLIT_RE = re.compile(f'({math_engine._NUMBER})')
+
+# Per-element error codes, in the order a scalar evaluation would raise them
+_OK, _PARSE, _ZERO_DIVISION, _OVERFLOW = 0, 1, 2, 3
+_MESSAGES = {
+    _PARSE: math_engine.PARSE_ERROR_MESSAGE,
+    _ZERO_DIVISION: math_engine.DIVISION_BY_ZERO_MESSAGE,
+    _OVERFLOW: math_engine.OVERFLOW_MESSAGE,
+}
+
+
+class BatchResult:
+    """Values and per-element errors for a batch of expressions"""
+
+    def __init__(self, expressions, values, codes):
+        self.expressions = expressions
+        self.values = values  # float64 array, NaN where an error occurred
+        self.codes = codes    # int8 array of error codes
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def ok(self):
+        return self.codes == _OK
+
+    def errors(self):
+        """Error message per element (None where the expression evaluated)"""
+        return [_MESSAGES.get(code) for code in self.codes.tolist()]
+
+    def results(self):
+        """Per-element math_engine.MathResult tuples"""
+        return [math_engine.MathResult(expression, None if code else value, _MESSAGES.get(code))
+                for expression, value, code in zip(self.expressions, self.values.tolist(), self.codes.tolist())]
+
+    def responses(self):
+        """The reply solve_math would give for each element"""
+        return [_MESSAGES[code] if code else f"The result is {math_engine.format_number(value)}."
+                for value, code in zip(self.values.tolist(), self.codes.tolist())]
+
+
+def _shape(tree, order):
+    """The tree with every literal replaced by a placeholder; literal positions are collected in evaluation order
+
+    Literals of a template tree carry -(position + 1) as their value; any other
+    number (e.g. the 2 of "squared") is a constant and stays in the shape.
+    """
+    if tree[0] == 'num':
+        if tree[1] < 0:
+            order.append(int(-tree[1]) - 1)
+            return ('num',)
+        return ('const', tree[1])
+    return (tree[0],) + tuple(_shape(child, order) for child in tree[1:])
+
+
+def _split_literals(tokens):
+    """Separate a token tuple into its template (numbers replaced by None) and its numbers"""
+    template = []
+    literals = []
+    for token in tokens:
+        if token.__class__ is float:
+            literals.append(token)
+            template.append(None)
+        else:
+            template.append(token)
+    return tuple(template), literals
+
+
+def _tokens(expression, cache):
+    """(template, literals) for an expression, or None if it has unknown words
+
+    The literals are the numbers as written (commas dropped); NumPy converts
+    them to floats a whole group at a time. cache maps skeletons to their
+    template and literal count (None if the skeleton does not tokenize).
+    """
+    parts = _NUMBER_SPLIT_RE.split(expression)
+    skeleton = ' 1 '.join(parts[::2])
+    if skeleton in cache:
+        entry = cache[skeleton]
+    else:
+        try:
+            template, literals = _split_literals(math_engine._tokenize(skeleton))
+            entry = cache[skeleton] = (template, len(literals))
+        except math_engine.MathError:
+            entry = cache[skeleton] = None
+    if entry is None:
+        return None
+    literals = parts[1::2]
+    if ',' in expression:
+        literals = [number.replace(',', '') for number in literals]
+    if len(literals) != entry[1]:  # a number the tokenizer reads differently; take the slow path
+        return _split_literals(math_engine._tokenize(expression))
+    return entry[0], literals
+
+
+def _parse_template(template, cache):
+    """(shape, literal order) for a token template, or None if it does not parse
+
+    The parse only depends on the operators, so each template is parsed once
+    with its numbers replaced by position markers; the leaves of the resulting
+    tree then give the order in which the literals are evaluated.
+    """
+    if template in cache:
+        return cache[template]
+    positions = iter(range(len(template)))
+    tokens = tuple(-float(next(positions) + 1) if token is None else token for token in template)
+    try:
+        order = []
+        shape = _shape(math_engine._parse_tokens(tokens), order)
+        entry = (shape, tuple(order))
+    except math_engine.MathError:
+        entry = None
+    cache[template] = entry
+    return entry
+
+
+class _Evaluator:
+    """Evaluates one AST shape over a matrix of literals (one row per expression)"""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.next_column = 0
+        self.codes = np.zeros(columns.shape[0], dtype=np.int8)
+
+    def flag(self, mask, code):
+        # Keep the first error per row, like a scalar evaluation that raises
+        self.codes[mask & (self.codes == _OK)] = code
+
+    def run(self, shape):
+        kind = shape[0]
+        if kind == 'num':
+            column = self.columns[:, self.next_column]
+            self.next_column += 1
+            return column
+        if kind == 'const':
+            return np.float64(shape[1])
+        if kind == 'neg':
+            return -self.run(shape[1])
+        left = self.run(shape[1])
+        right = self.run(shape[2])
+        if kind == 'add':
+            return left + right
+        if kind == 'sub':
+            return left - right
+        if kind == 'mul':
+            return left * right
+        if kind in ('div', 'mod'):
+            self.flag(right == 0, _ZERO_DIVISION)
+            return np.divide(left, right) if kind == 'div' else np.mod(left, right)
+        if kind == 'pow':
+            self.flag((left == 0) & (right < 0), _ZERO_DIVISION)
+            self.flag((left < 0) & (np.floor(right) != right), _PARSE)
+            result = np.power(left, right)
+            self.flag(~np.isfinite(result) & np.isfinite(left) & np.isfinite(right), _OVERFLOW)
+            return result
+        raise ValueError(f"unknown node {kind!r}")
+
+
+def evaluate_batch(expressions):
+    """Evaluate a list or array of expressions; returns a BatchResult"""
+    expressions = list(expressions)
+    count = len(expressions)
+    values = np.full(count, np.nan)
+    codes = np.full(count, _PARSE, dtype=np.int8)
+
+    # Tokenize each skeleton and parse each operator template once; group row indices by AST shape
+    skeleton_cache = {}
+    template_cache = {}
+    groups = {}
+    for index, expression in enumerate(expressions):
+        try:
+            tokens = _tokens(str(expression), skeleton_cache)
+        except math_engine.MathError:
+            tokens = None
+        if tokens is None:
+            continue  # Unknown words: stays a parse error
+        template, literals = tokens
+        entry = _parse_template(template, template_cache)
+        if entry is not None:
+            shape, order = entry
+            rows, group_literals = groups.setdefault(shape, ([], []))
+            rows.append(index)
+            group_literals.append([literals[i] for i in order])
+
+    with np.errstate(all='ignore'):
+        for shape, (rows, group_literals) in groups.items():
+            evaluator = _Evaluator(np.array(group_literals, dtype=np.float64))
+            result = evaluator.run(shape)
+            group_codes = evaluator.codes
+            group_codes[(group_codes == _OK) & ~np.isfinite(result)] = _OVERFLOW
+            rows = np.array(rows)
+            values[rows] = np.where(group_codes == _OK, result, np.nan)
+            codes[rows] = group_codes
+
+    return BatchResult(expressions, values, codes)
+
+
+def respond_many(expressions):
+    """solve_math-style replies for many expressions"""
+    return evaluate_batch(expressions).responses()
@@ -0,0 +1,334 @@
+"""
+Safe arithmetic expression engine for solve_math.
+
+Spoken and symbolic arithmetic ("what is 3 plus 4 times 2", "(2 + 3) ^ 2",
+"divide 10 by 4", "15% of 80") is tokenized, parsed with a Pratt parser into
+a small tuple AST and compiled into a closure. Nothing is ever passed to
+eval(). A word that is neither an operator nor filler ("half of 10",
+"sqrt of 16") makes the text a parse error rather than being ignored, so
+the command can be answered some other way.
+
+Compiled evaluators are cached by the normalized token sequence, so
+differently worded questions with the same expression ("2 times 3", "2 x 3")
+share one evaluator and skip parsing and compilation.
+"""
+
+import math
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Result of evaluating one expression; error is the user-facing message or None
+MathResult = namedtuple('MathResult', ['expression', 'value', 'error'])
+
+PARSE_ERROR_MESSAGE = "I couldn't understand the math problem. Please try rephrasing it."
+DIVISION_BY_ZERO_MESSAGE = "Error: Division by zero is not allowed."
+OVERFLOW_MESSAGE = "Error: The result is too large to calculate."
+
+
+class MathError(ValueError):
+    """Base class for expressions that cannot be evaluated"""
+    message = PARSE_ERROR_MESSAGE
+
+
+class MathParseError(MathError):
+    """The text is not a well-formed arithmetic expression"""
+
+
+class MathOverflowError(MathError):
+    """The result does not fit in a float"""
+    message = OVERFLOW_MESSAGE
+
+
+# Multi-word operator phrases are rewritten to symbols before tokenizing
+_PHRASES = [
+    (r'multiplied\s+by', '*'),
+    (r'divided\s+by', '/'),
+    (r'to\s+the\s+power\s+of', '^'),
+    (r'raised\s+to', '^'),
+    (r'power\s+of', '^'),
+    (r'\*\*', '^'),
+]
+_PHRASE_RE = re.compile('|'.join(f'(?P<g{i}>{pattern})' for i, (pattern, _) in enumerate(_PHRASES)))
+
+_WORD_OPERATORS = {
+    'plus': '+', 'minus': '-', 'times': '*', 'x': '*', 'over': '/',
+    'mod': '%', 'modulo': '%', 'percent': 'percent', 'squared': 'squared', 'cubed': 'cubed', 'negative': 'neg',
+    # Prefix verbs: "add 2 and 3", "subtract 2 from 5", "multiply 2 by 3", "divide 6 by 3"
+    'add': 'add', 'subtract': 'subtract', 'multiply': 'multiply', 'divide': 'divide',
+    'and': 'and', 'to': 'to', 'from': 'from', 'by': 'by',
+}
+_SYMBOLS = {'+': '+', '-': '-', '−': '-', '*': '*', '×': '*', '·': '*', '/': '/', '÷': '/',
+            '^': '^', '(': '(', ')': ')', '%': '%'}
+# Words that carry no arithmetic ("what is the result of 2 + 3?")
+_FILLER_WORDS = frozenset((
+    'what', 'whats', 's', 'is', 'are', 'was', 'be', 'the', 'a', 'an', 'of', 'it', 'me', 'i', 'you', 'we',
+    'please', 'tell', 'give', 'calculate', 'compute', 'evaluate', 'solve', 'work', 'out', 'math', 'do',
+    'does', 'can', 'could', 'would', 'how', 'much', 'equal', 'equals', 'result', 'answer', 'value', 'get',
+))
+
+_NUMBER = r'\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d*)?|\.\d+'
+_NUMBER_RE = re.compile(_NUMBER)
+_TOKEN_RE = re.compile(rf'{_NUMBER}|[a-z]+|\S')
+
+
+_TOKEN_LOOKUP = dict(_WORD_OPERATORS, **_SYMBOLS)
+_CONNECTIVES = ('and', 'to', 'from', 'by')
+_PREFIX_VERBS = ('add', 'subtract', 'multiply', 'divide')
+
+
+def _tokenize(text):
+    """Turn text into a tuple of operator strings and float literals.
+
+    Filler words and punctuation are dropped; any other word raises MathParseError.
+    '%' is modulo between two operands ("10 % 3") and a percentage otherwise
+    ("50%", "15% of 80", where "of" then multiplies).
+    """
+    text = _PHRASE_RE.sub(lambda m: f' {_PHRASES[int(m.lastgroup[1:])][1]} ', text.lower())
+    raws = _TOKEN_RE.findall(text)
+    tokens = []
+    connectives = False
+    for index, raw in enumerate(raws):
+        op = _TOKEN_LOOKUP.get(raw)
+        if op == '%' and not _starts_operand(raws[index + 1:index + 2]):
+            op = 'percent'
+        if op is not None:
+            tokens.append(op)
+            connectives = connectives or op in _CONNECTIVES
+        elif raw[0].isdigit() or (raw[0] == '.' and len(raw) > 1):
+            tokens.append(float(raw.replace(',', '')))
+        elif raw == 'of' and tokens and tokens[-1] == 'percent':
+            tokens.append('*')
+        elif raw.isalpha() and raw not in _FILLER_WORDS:
+            raise MathParseError(f"unknown word {raw!r}")
+    return _drop_connectives(tokens) if connectives else tuple(tokens)
+
+
+def _starts_operand(raws):
+    """Whether the next raw token (a 0/1-item list) can begin an operand"""
+    return bool(raws) and (raws[0][0].isdigit() or raws[0][0] == '.' or raws[0] in ('(', '-', '−'))
+
+
+def _drop_connectives(tokens):
+    """Remove 'and'/'to'/'from'/'by' that are not part of a prefix-verb form"""
+    needed = 0
+    kept = []
+    for token in tokens:
+        if token in _PREFIX_VERBS:
+            needed += 1
+        elif token in _CONNECTIVES:
+            if not needed:
+                continue
+            needed -= 1
+        kept.append(token)
+    return tuple(kept)
+
+
+def normalize(text):
+    """Canonical string form of an expression ("what is 2 times 3" -> "2 * 3")"""
+    return ' '.join(format_number(token) if isinstance(token, float) else token for token in _tokenize(text))
+
+
+# Pratt parser
+
+_BINARY = {'+': (10, 'add'), '-': (10, 'sub'), '*': (20, 'mul'), '/': (20, 'div'), '%': (20, 'mod'),
+           '^': (40, 'pow')}
+_UNARY_BP = 30
+# Deeper nesting (or longer expressions, whose trees compile and evaluate
+# recursively) is not arithmetic anyone asks out loud, and would exhaust the stack
+MAX_DEPTH = 100
+MAX_TOKENS = 256
+_IMPLICIT_BP = 20
+_POSTFIX = {'squared': 2.0, 'cubed': 3.0}
+_PERCENT = ('num', 100.0)
+_VERBS = {'add': ('add', ('and', 'to'), False), 'subtract': ('sub', ('from',), True),
+          'multiply': ('mul', ('by', 'and'), False), 'divide': ('div', ('by',), False)}
+
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        self.depth = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def next(self):
+        token = self.peek()
+        if token is None:
+            raise MathParseError("unexpected end of expression")
+        self.pos += 1
+        return token
+
+    def expect(self, *options):
+        token = self.next()
+        if token not in options:
+            raise MathParseError(f"expected {' or '.join(options)}")
+
+    def expression(self, min_bp=0):
+        # Every parenthesis, prefix operator and right operand nests one level deeper
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise MathParseError("expression nested too deeply")
+        try:
+            return self._expression(min_bp)
+        finally:
+            self.depth -= 1
+
+    def _expression(self, min_bp):
+        left = self.prefix(self.next())
+        while True:
+            token = self.peek()
+            if token == '(':
+                # Implicit multiplication: "2(3 + 4)", "(1 + 1)(2)"
+                if _IMPLICIT_BP <= min_bp:
+                    break
+                left = ('mul', left, self.expression(_IMPLICIT_BP))
+                continue
+            if token in _POSTFIX:
+                self.pos += 1
+                left = ('pow', left, ('num', _POSTFIX[token]))
+                continue
+            if token == 'percent':
+                self.pos += 1
+                left = ('div', left, _PERCENT)
+                continue
+            if token not in _BINARY:
+                break
+            bp, kind = _BINARY[token]
+            if bp <= min_bp:
+                break
+            self.pos += 1
+            # '^' is right associative
+            right = self.expression(bp - 1 if token == '^' else bp)
+            left = (kind, left, right)
+        return left
+
+    def prefix(self, token):
+        if isinstance(token, float):
+            return ('num', token)
+        if token == '(':
+            inner = self.expression()
+            self.expect(')')
+            return inner
+        if token in ('-', 'neg'):
+            return ('neg', self.expression(_UNARY_BP))
+        if token == '+':
+            return self.expression(_UNARY_BP)
+        if token in _VERBS:
+            kind, connectives, swap = _VERBS[token]
+            first = self.expression(10)
+            self.expect(*connectives)
+            second = self.expression(10)
+            return (kind, second, first) if swap else (kind, first, second)
+        raise MathParseError(f"unexpected {token!r}")
+
+
+def parse(text):
+    """Parse text into a tuple AST such as ('add', ('num', 2.0), ('num', 3.0))"""
+    return _parse_tokens(_tokenize(text))
+
+
+def _parse_tokens(tokens):
+    if not any(isinstance(token, float) for token in tokens):
+        raise MathParseError("no numbers in expression")
+    if len(tokens) > MAX_TOKENS:
+        raise MathParseError("expression too long")
+    parser = _Parser(tokens)
+    tree = parser.expression()
+    if parser.peek() is not None:
+        raise MathParseError(f"unexpected {parser.peek()!r}")
+    return tree
+
+
+# Compilation
+
+def _checked_pow(a, b):
+    try:
+        result = a ** b
+    except OverflowError:
+        raise MathOverflowError("result too large")
+    if isinstance(result, complex):
+        raise MathError("complex result")
+    return result
+
+
+_OPERATIONS = {
+    'add': lambda a, b: a + b,
+    'sub': lambda a, b: a - b,
+    'mul': lambda a, b: a * b,
+    'div': lambda a, b: a / b,
+    'mod': lambda a, b: a % b,
+    'pow': _checked_pow,
+}
+
+
+def compile_tree(tree):
+    """Compile an AST into a zero-argument evaluator closure"""
+    kind = tree[0]
+    if kind == 'num':
+        value = tree[1]
+        return lambda: value
+    if kind == 'neg':
+        operand = compile_tree(tree[1])
+        return lambda: -operand()
+    operation = _OPERATIONS[kind]
+    left = compile_tree(tree[1])
+    right = compile_tree(tree[2])
+    return lambda: operation(left(), right())
+
+
+@lru_cache(maxsize=4096)
+def _normalized_tokens(text):
+    return _tokenize(text)
+
+
+@lru_cache(maxsize=4096)
+def _compiled(tokens):
+    """Evaluator for a normalized token tuple (the cache key)"""
+    return compile_tree(_parse_tokens(tokens))
+
+
+def evaluate(text):
+    """Evaluate an arithmetic expression; raises MathError or ZeroDivisionError"""
+    evaluator = _compiled(_normalized_tokens(text))
+    result = evaluator()
+    if not math.isfinite(result):
+        raise MathOverflowError("result too large")
+    return result
+
+
+def format_number(value):
+    """Render a result without float noise ('25' rather than '25.0')"""
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return f"{value:.12g}"
+
+
+def error_message(error):
+    """User-facing message for an evaluation error"""
+    if isinstance(error, ZeroDivisionError):
+        return DIVISION_BY_ZERO_MESSAGE
+    if isinstance(error, MathError):
+        return error.message
+    return PARSE_ERROR_MESSAGE
+
+
+def respond(text):
+    """Evaluate text and phrase the answer the way solve_math replies"""
+    try:
+        return f"The result is {format_number(evaluate(text))}."
+    except (MathError, ZeroDivisionError) as e:
+        return error_message(e)
+
+
+def evaluate_many(expressions):
+    """Evaluate a batch of expressions, returning one MathResult per input"""
+    results = []
+    for expression in expressions:
+        try:
+            results.append(MathResult(expression, evaluate(expression), None))
+        except (MathError, ZeroDivisionError) as e:
+            results.append(MathResult(expression, None, error_message(e)))
+    return results
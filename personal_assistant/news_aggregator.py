@@ -0,0 +1,233 @@
+"""
+Concurrent news aggregation.
+
+A NewsAggregator queries all of its sources at the same time on a shared
+thread pool, merges articles as each source answers, removes duplicates by
+normalized title and URL, and enforces an overall deadline: a source that
+has not answered in time is simply left out of the result.
+
+Sources are small objects with a `name`, an `applies(query)` predicate and a
+`fetch(query, num_results)` method returning article dicts shaped like
+get_news_api_articles' results (title, description, url, source,
+publishedAt, content).
+"""
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+from news_index import NewsIndex
+
+TRENDING_TERMS = ('trending', 'top stories', 'latest', 'news')
+
+_TITLE_SUFFIX_RE = re.compile(r'\s+[-|–—]\s+[^-|–—]{2,60}$')
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+# Matched exactly, except the utm_ family, so 'ref' does not also drop 'refresh' or 'reference'
+_TRACKING_PARAMS = frozenset(('fbclid', 'gclid', 'ref', 'cmpid'))
+_TRACKING_PREFIX = 'utm_'
+
+
+def normalize_title(title):
+    """Lower-case title without the trailing ' - Publisher' and punctuation"""
+    title = _TITLE_SUFFIX_RE.sub('', title or '')
+    return ' '.join(_NON_WORD_RE.sub(' ', title.lower()).split())
+
+
+def _is_tracking(param):
+    param = param.lower()
+    return param in _TRACKING_PARAMS or param.startswith(_TRACKING_PREFIX)
+
+
+def normalize_url(url):
+    """URL without scheme, 'www.', trailing slash, fragment or tracking parameters"""
+    parts = urlsplit((url or '').strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if not _is_tracking(k)])
+    path = parts.path.rstrip('/')
+    return f"{host}{path}" + (f"?{query}" if query else '')
+
+
+def _article(title, url, description='', source='Unknown', published='', content=''):
+    return {
+        'title': title,
+        'description': description or '',
+        'url': url,
+        'source': source,
+        'publishedAt': published or '',
+        'content': content or '',
+    }
+
+
+def matches_query(article, query):
+    """True if any query word appears in the article's title or description"""
+    words = [word for word in query.lower().split() if word not in TRENDING_TERMS]
+    if not words:
+        return True
+    text = f"{article.get('title', '')} {article.get('description', '')}".lower()
+    return any(word in text for word in words)
+
+
+class NewsAPISource:
+    """One NewsAPI.org endpoint ('top-headlines' or 'everything')"""
+
+    BASE_URL = 'https://newsapi.org/v2'
+
+    def __init__(self, http, api_key, endpoint='everything', page_size=10):
+        self.http = http
+        self.api_key = api_key
+        self.endpoint = endpoint
+        self.page_size = page_size
+        self.name = f"newsapi:{endpoint}"
+
+    def applies(self, query):
+        if self.endpoint == 'top-headlines':
+            return any(term in query.lower() for term in TRENDING_TERMS)
+        return True
+
+    def fetch(self, query, num_results):
+        if self.endpoint == 'top-headlines':
+            params = {'category': 'technology', 'language': 'en', 'pageSize': self.page_size}
+        else:
+            params = {'q': query, 'language': 'en', 'sortBy': 'publishedAt', 'pageSize': num_results}
+        params['apiKey'] = self.api_key
+        response = self.http.get(f"{self.BASE_URL}/{self.endpoint}", params=params, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+
+        articles = []
+        if data.get('status') == 'ok' and data.get('articles'):
+            for article in data['articles']:
+                if article.get('title') and article.get('url'):
+                    articles.append(_article(
+                        article['title'], article['url'], article.get('description'),
+                        (article.get('source') or {}).get('name', 'Unknown'),
+                        article.get('publishedAt'), article.get('content'),
+                    ))
+        return articles
+
+
+class RSSSource:
+    """An RSS/Atom feed, filtered by the query words"""
+
+    def __init__(self, http, feed_url, name=None):
+        self.http = http
+        self.feed_url = feed_url
+        self.name = name or f"rss:{urlsplit(feed_url).netloc}"
+
+    def applies(self, query):
+        return True
+
+    def fetch(self, query, num_results):
+        import feedparser
+        response = self.http.get(self.feed_url, timeout=10)
+        response.raise_for_status()
+        feed = feedparser.parse(response.content)
+        publisher = feed.feed.get('title', self.name)
+
+        articles = []
+        for entry in feed.entries:
+            if not entry.get('title') or not entry.get('link'):
+                continue
+            published = ''
+            if entry.get('published_parsed'):
+                published = time.strftime('%Y-%m-%dT%H:%M:%SZ', entry.published_parsed)
+            article = _article(entry.title, entry.link, entry.get('summary', ''), publisher, published)
+            if matches_query(article, query):
+                articles.append(article)
+            if len(articles) >= num_results:
+                break
+        return articles
+
+
+class JSONFixtureSource:
+    """Articles from a local JSON file (a list of article dicts), indexed once for BM25 search"""
+
+    def __init__(self, path, name=None):
+        self.path = path
+        self.name = name or f"json:{path}"
+        self._index = None
+        self._lock = threading.Lock()
+
+    def applies(self, query):
+        return True
+
+    def index(self):
+        with self._lock:
+            if self._index is None:
+                self._index = NewsIndex.load(self.path)
+        return self._index
+
+    def fetch(self, query, num_results):
+        return self.index().search(query, num_results)
+
+
+class NewsAggregator:
+    """Fans a query out to every source at once and merges the answers"""
+
+    def __init__(self, sources=None, deadline=8.0, max_workers=8):
+        self.sources = list(sources or [])
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='news')
+
+    def add_source(self, source):
+        self.sources.append(source)
+
+    def _arrivals(self, query, num_results, deadline):
+        """Yield (source index, articles) as each source answers, until the deadline"""
+        deadline_at = time.monotonic() + (self.deadline if deadline is None else deadline)
+        pending = {self._executor.submit(source.fetch, query, num_results): index
+                   for index, source in enumerate(self.sources) if source.applies(query)}
+
+        while pending:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    yield index, future.result()
+                except Exception as e:
+                    print(f"Error fetching news from {self.sources[index].name}: {e}")
+
+        for future, index in pending.items():
+            future.cancel()
+            print(f"News source {self.sources[index].name} missed the deadline; continuing without it")
+
+    def stream(self, query, num_results=5, deadline=None):
+        """Yield unique articles as their sources answer, until the deadline passes"""
+        seen = _Seen()
+        for _, articles in self._arrivals(query, num_results, deadline):
+            for article in articles:
+                if seen.add(article):
+                    yield article
+
+    def aggregate(self, query, num_results=5, deadline=None):
+        """Unique articles from all sources within the deadline, listed in source order"""
+        # Arrival order depends on latency; merge in the configured source order instead
+        answers = sorted(self._arrivals(query, num_results, deadline), key=lambda answer: answer[0])
+        seen = _Seen()
+        unique = [article for _, articles in answers for article in articles if seen.add(article)]
+        return unique[:num_results]
+
+
+class _Seen:
+    """Duplicate detector keyed on normalized title and normalized URL"""
+
+    def __init__(self):
+        self.titles = set()
+        self.urls = set()
+
+    def add(self, article):
+        """Record article; False if it duplicates one already seen"""
+        title_key = normalize_title(article['title'])
+        url_key = normalize_url(article['url'])
+        if title_key in self.titles or url_key in self.urls:
+            return False
+        self.titles.add(title_key)
+        self.urls.add(url_key)
+        return True
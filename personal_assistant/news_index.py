@@ -0,0 +1,149 @@
+"""
+Offline news search over a local article corpus.
+
+A NewsIndex holds its articles in memory behind an inverted index (word ->
+postings) and ranks matches with BM25, title words counting TITLE_WEIGHT
+times. Scores are computed once when the index is built and each word's
+postings are kept best first, so a query walks its words' lists together
+and stops as soon as nothing further down can reach the top results (the
+threshold algorithm), or after MAX_DEPTH postings per word: queries read
+a few hundred postings at most, whatever the corpus size.
+
+Words that ask for fresh news rather than a topic ("latest", "news", ...)
+do not filter; a query made only of them gets the newest articles.
+
+    index = NewsIndex.load('data/news_fixture.json')  # a list of NewsAPI-style article dicts
+    index.search('machine learning', 5)
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+from collections import Counter
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'news_fixture.json')
+
+TITLE_WEIGHT = 2
+MAX_DEPTH = 100  # postings read per query word at most
+
+STOPWORDS = frozenset('a an and are as at be by for from how in is it of on or the to what with about '
+                      'me show find get tell search look up any'.split())
+FRESHNESS_WORDS = frozenset(['latest', 'news', 'trending', 'top', 'stories', 'today', 'recent', 'headlines'])
+
+_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def tokens(text):
+    """Index words of a text: lowercased, without stopwords, plural 's' dropped (but "news" stays news)"""
+    words = []
+    for word in _WORD_RE.findall((text or '').lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss') and word not in FRESHNESS_WORDS:
+            word = word[:-1]
+        words.append(word)
+    return words
+
+
+def fixture_article(item):
+    """A fixture entry as an article dict shaped like the news sources' results (or None if unusable)
+
+    'offline' marks it as canned: its URL is not a page to fetch the body from.
+    """
+    if not item.get('title') or not item.get('url'):
+        return None
+    source = item.get('source')
+    return {
+        'title': item['title'],
+        'description': item.get('description') or '',
+        'url': item['url'],
+        'source': source.get('name', 'Unknown') if isinstance(source, dict) else source or 'Unknown',
+        'publishedAt': item.get('publishedAt') or '',
+        'content': item.get('content') or '',
+        'offline': True,
+    }
+
+
+class NewsIndex:
+    """Articles ranked by BM25 over title, description and content"""
+
+    def __init__(self, articles=(), k1=1.2, b=0.75):
+        self.articles = list(articles)
+        self._by_recency = sorted(range(len(self.articles)),
+                                  key=lambda doc: self.articles[doc]['publishedAt'], reverse=True)
+        self._recency_rank = [0] * len(self.articles)  # ties go to the newer article
+        for rank, doc in enumerate(self._by_recency):
+            self._recency_rank[doc] = rank
+
+        self._weights = []  # per article: {word: BM25 score}
+        lengths = []
+        for article in self.articles:
+            words = Counter()
+            for word in tokens(article['title']):
+                words[word] += TITLE_WEIGHT
+            words.update(tokens(f"{article['description']} {article['content']}"))
+            self._weights.append(words)
+            lengths.append(sum(words.values()))
+        average = (sum(lengths) / len(lengths) if lengths else 0) or 1
+
+        self._postings = {}  # word -> article numbers, best score first
+        for doc, words in enumerate(self._weights):
+            for word in words:
+                self._postings.setdefault(word, []).append(doc)
+        total = len(self.articles)
+        for word, postings in self._postings.items():
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc in postings:
+                tf = self._weights[doc][word]
+                self._weights[doc][word] = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[doc] / average))
+            postings.sort(key=lambda doc: (-self._weights[doc][word], self._recency_rank[doc]))
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        """Index the articles of a JSON file holding a list of NewsAPI-style article dicts"""
+        with open(path, encoding='utf-8') as f:
+            raw = json.load(f)
+        return cls(article for article in map(fixture_article, raw) if article)
+
+    def __len__(self):
+        return len(self.articles)
+
+    def recent(self, num_results=5):
+        """The newest articles"""
+        return [dict(self.articles[doc]) for doc in self._by_recency[:num_results]]
+
+    def search(self, query, num_results=5):
+        """Best matching articles for a query, best first ([] if no article has any of its words)"""
+        words = [word for word in dict.fromkeys(tokens(query)) if word not in FRESHNESS_WORDS]
+        if not words:
+            return self.recent(num_results)
+        words = [word for word in words if word in self._postings]
+        lists = [self._postings[word] for word in words]
+        best, seen = [], set()  # best: min-heap of ((score, -recency rank), article number)
+        # Walk all postings lists in step (threshold algorithm): once the k-th best
+        # article seen scores at least the sum of the current depth's scores, no
+        # article further down any list can beat it. Queries made of several very
+        # common words stop at MAX_DEPTH instead, with the best articles found by then.
+        for depth in range(min(max(map(len, lists), default=0), MAX_DEPTH)):
+            threshold = 0
+            for word, postings in zip(words, lists):
+                if depth >= len(postings):
+                    continue
+                doc = postings[depth]
+                weights = self._weights[doc]
+                threshold += weights[word]
+                if doc in seen:
+                    continue
+                seen.add(doc)
+                score = 0
+                for other in words:
+                    score += weights.get(other, 0)
+                if len(best) < num_results:
+                    heapq.heappush(best, ((score, -self._recency_rank[doc]), doc))
+                elif score >= best[0][0][0]:
+                    heapq.heappushpop(best, ((score, -self._recency_rank[doc]), doc))
+            if len(best) >= num_results and best[0][0][0] >= threshold:
+                break
+        return [dict(self.articles[doc]) for _, doc in sorted(best, reverse=True)]
@@ -0,0 +1,157 @@
+"""
+Recurrence rules for repeating reminders.
+
+A rule is stored as one short RRULE-style string next to the reminder, e.g.
+
+    FREQ=WEEKLY;INTERVAL=1;BYDAY=MO,TU,WE,TH,FR;BYHOUR=9;BYMINUTE=0
+
+and a recurring reminder is a single row whose due time is its next
+occurrence. A monthly rule also carries its series' day of the month
+(BYMONTHDAY, see anchor()), since the previous occurrence alone cannot tell
+a series on the 28th from one on the 31st that passed through February. Occurrences are never stored ahead of time: occurrences() yields
+them lazily from a given occurrence, and next_occurrence() skips straight
+past anything already missed.
+"""
+
+import datetime
+from collections import namedtuple
+from functools import lru_cache
+
+# weekdays: tuple of 0-6 (Monday = 0); hour/minute are None for MINUTELY/HOURLY;
+# monthday: the day of the month a MONTHLY series is on (None: the previous occurrence's)
+Rule = namedtuple('Rule', ['freq', 'interval', 'weekdays', 'hour', 'minute', 'monthday'],
+                  defaults=(1, (), None, None, None))
+
+FREQUENCIES = ('MINUTELY', 'HOURLY', 'DAILY', 'WEEKLY', 'MONTHLY')
+RULE_DAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+STEPS = {'MINUTELY': datetime.timedelta(minutes=1), 'HOURLY': datetime.timedelta(hours=1)}
+
+
+@lru_cache(maxsize=1024)
+def parse_rule(text):
+    """Rule for an RRULE-style string; ValueError if it is not one"""
+    fields = dict(part.split('=', 1) for part in text.upper().split(';') if part)
+    freq = fields.get('FREQ')
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Unsupported recurrence: {text!r}")
+    weekdays = tuple(sorted(RULE_DAYS.index(day) for day in fields['BYDAY'].split(','))) if 'BYDAY' in fields else ()
+    hour = int(fields['BYHOUR']) if 'BYHOUR' in fields else None
+    minute = int(fields.get('BYMINUTE', 0)) if hour is not None else None
+    monthday = int(fields['BYMONTHDAY']) if 'BYMONTHDAY' in fields else None
+    return Rule(freq, max(int(fields.get('INTERVAL', 1)), 1), weekdays, hour, minute, monthday)
+
+
+def format_rule(rule):
+    parts = [f'FREQ={rule.freq}', f'INTERVAL={rule.interval}']
+    if rule.weekdays:
+        parts.append('BYDAY=' + ','.join(RULE_DAYS[day] for day in rule.weekdays))
+    if rule.hour is not None:
+        parts.append(f'BYHOUR={rule.hour}')
+        parts.append(f'BYMINUTE={rule.minute or 0}')
+    if rule.monthday is not None:
+        parts.append(f'BYMONTHDAY={rule.monthday}')
+    return ';'.join(parts)
+
+
+def _as_rule(rule):
+    return parse_rule(rule) if isinstance(rule, str) else rule
+
+
+def anchor(rule, first):
+    """A MONTHLY rule pinned to the day of the month of its first occurrence (other rules unchanged)
+
+    Store the anchored rule with the reminder: a series starting on January
+    31st then falls on February 28th and March 31st, not March 28th.
+    """
+    parsed = _as_rule(rule)
+    if parsed is None or parsed.freq != 'MONTHLY' or parsed.monthday is not None:
+        return rule
+    parsed = parsed._replace(monthday=first.day)
+    return format_rule(parsed) if isinstance(rule, str) else parsed
+
+
+def add_months(moment, months, day=None):
+    """moment moved by whole months to `day` (default: its own), clamped to the end of shorter months"""
+    month = moment.month - 1 + months
+    year, month = moment.year + month // 12, month % 12 + 1
+    day = day or moment.day
+    while True:
+        try:
+            return moment.replace(year=year, month=month, day=day)
+        except ValueError:
+            day -= 1
+
+
+def occurrences(rule, after, until=None):
+    """Occurrences strictly after `after`, in order, up to and including `until` (endless if None)
+
+    `after` is normally the previous occurrence, so INTERVAL counts from it.
+    """
+    rule = _as_rule(rule)
+    if rule.freq in STEPS:
+        step = STEPS[rule.freq] * rule.interval
+        moment = after + step
+        while until is None or moment <= until:
+            yield moment
+            moment += step
+        return
+
+    at = after.replace(hour=after.hour if rule.hour is None else rule.hour,
+                       minute=after.minute if rule.minute is None else rule.minute, second=0, microsecond=0)
+    if rule.freq == 'DAILY':
+        moment = at if at > after else at + datetime.timedelta(days=rule.interval)
+        while until is None or moment <= until:
+            yield moment
+            moment += datetime.timedelta(days=rule.interval)
+    elif rule.freq == 'WEEKLY':
+        weekdays = rule.weekdays or (after.weekday(),)
+        week = at - datetime.timedelta(days=after.weekday())  # Monday of after's week
+        while True:
+            for weekday in weekdays:
+                moment = week + datetime.timedelta(days=weekday)
+                if until is not None and moment > until:
+                    return
+                if moment > after:
+                    yield moment
+            week += datetime.timedelta(weeks=rule.interval)
+    else:  # MONTHLY, on the rule's day of the month (after's for a rule without one)
+        months = 0
+        while True:
+            moment = add_months(at, months, rule.monthday)
+            if until is not None and moment > until:
+                return
+            if moment > after:
+                yield moment
+            months += rule.interval
+
+
+def next_occurrence(rule, after, now=None):
+    """The first occurrence after `after` that is also after `now` (missed occurrences are skipped)"""
+    rule = _as_rule(rule)
+    if now is not None and now > after and rule.freq in STEPS:
+        # Jump over missed fixed-step occurrences instead of walking them
+        step = STEPS[rule.freq] * rule.interval
+        after += step * ((now - after) // step)
+    for moment in occurrences(rule, after):
+        if now is None or moment > now:
+            return moment
+
+
+def describe(rule):
+    """'every weekday at 09:00 AM', 'every 2 hours', ..."""
+    rule = _as_rule(rule)
+    unit = {'MINUTELY': 'minute', 'HOURLY': 'hour', 'DAILY': 'day', 'WEEKLY': 'week', 'MONTHLY': 'month'}[rule.freq]
+    if rule.weekdays == (0, 1, 2, 3, 4):
+        text = 'every weekday'
+    elif rule.weekdays == (5, 6):
+        text = 'every weekend'
+    elif rule.weekdays:
+        text = 'every ' + ' and '.join(DAY_NAMES[day] for day in rule.weekdays)
+    else:
+        text = f'every {rule.interval} {unit}s' if rule.interval > 1 else f'every {unit}'
+    if rule.weekdays and rule.interval > 1:
+        text += f' (every {rule.interval} weeks)'
+    if rule.hour is not None:
+        text += ' at ' + datetime.time(rule.hour, rule.minute or 0).strftime('%I:%M %p')
+    return text
@@ -0,0 +1,267 @@
+"""
+ReminderRepository: the one place agent.py reads and writes reminders.
+
+Pending reminders are cached in memory as a list sorted by due time, so
+listing, filtering, counting and due lookups are answered without a query.
+Writes are write-through: each one is committed to SQLite and then applied to
+the cache before the call returns.
+
+Concurrent writes are group-committed. A single writer thread takes every
+write queued at that moment and commits them in one transaction (one
+savepoint per write, so a failing write does not undo its neighbours); each
+caller waits only for the commit that contains its write.
+
+The writer thread owns the repository's connection. PRAGMA data_version on
+that connection changes only when some *other* connection commits (another
+worker process, or code using ReminderStore directly), so each read compares
+it with the version the cache was built from and reloads on a mismatch.
+
+A recurring reminder is one entry at its next occurrence; completing or
+claiming it moves the entry to the occurrence after that, and cancel() ends
+the series.
+"""
+
+import bisect
+import datetime
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
+
+from recurrence import next_occurrence
+from reminder_store import (INSERT_SQL, COMPLETE_SQL, ADVANCE_SQL, RESCHEDULE_SQL, PENDING_SQL, PENDING_ROW_SQL,
+                            claim_rows, parse_time, write_transaction)
+
+# rule is the recurrence rule string of a recurring reminder, None for one-off reminders
+Reminder = namedtuple('Reminder', ['id', 'text', 'due_at', 'rule'], defaults=(None,))
+
+
+class ReminderRepository:
+    """Write-through cached access to pending reminders"""
+
+    def __init__(self, store, max_batch=256):
+        self.store = store
+        self.max_batch = max_batch
+        self._conn = store.connect()
+        self._db_lock = threading.Lock()
+        self._lock = threading.RLock()  # guards the cache
+        self._entries = []  # sorted (due_at, id, text, rule)
+        self._by_id = {}
+        self._version = None
+        self._writes = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name='reminder-writer', daemon=True)
+        self._writer.start()
+        self.stats = {'reloads': 0, 'batches': 0, 'writes': 0}
+        self._reload()
+
+    # -- cache ---------------------------------------------------------------
+
+    def _data_version(self):
+        return self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def _reload(self):
+        # Lock order is always _db_lock, then _lock
+        with self._db_lock:
+            version = self._data_version()
+            rows = self._conn.execute(PENDING_SQL).fetchall()
+            with self._lock:
+                self._entries = [(parse_time(when), reminder_id, text, rule) for reminder_id, text, when, rule in rows]
+                self._by_id = {entry[1]: entry for entry in self._entries}
+                self._version = version
+                self.stats['reloads'] += 1
+
+    def _fresh(self):
+        """Reload the cache if another connection has committed since it was built"""
+        with self._db_lock:
+            changed = self._data_version() != self._version
+        if changed:
+            self._reload()
+
+    def _cache_add(self, reminder_id, text, due_at, rule=None):
+        self._cache_remove(reminder_id)
+        entry = (due_at, reminder_id, text, rule)
+        bisect.insort(self._entries, entry)
+        self._by_id[reminder_id] = entry
+
+    def _cache_remove(self, reminder_id):
+        entry = self._by_id.pop(reminder_id, None)
+        if entry is not None:
+            index = bisect.bisect_left(self._entries, entry)
+            if index < len(self._entries) and self._entries[index] == entry:
+                del self._entries[index]
+        return entry
+
+    # -- group-committed writes ----------------------------------------------
+
+    def _submit(self, operation, *args):
+        future = Future()
+        self._writes.put((operation, args, future))
+        return future.result()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._writes.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._commit(batch)
+            except Exception as e:
+                # Never let the writer thread die: every later write would wait forever
+                print(f"Error committing reminder writes: {e}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _commit(self, batch):
+        results = []
+        with self._db_lock:
+            try:
+                with write_transaction(self._conn) as conn:
+                    for operation, args, future in batch:
+                        conn.execute('SAVEPOINT write')
+                        try:
+                            results.append((future, operation(conn, *args), None))
+                            conn.execute('RELEASE write')
+                        except Exception as e:
+                            conn.execute('ROLLBACK TO write')
+                            conn.execute('RELEASE write')
+                            results.append((future, None, e))
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                return
+            # Committed: apply each write to the cache (operations return a callable
+            # that does so), then release the callers
+            with self._lock:
+                self.stats['batches'] += 1
+                self.stats['writes'] += len(batch)
+                for future, result, error in results:
+                    if error is not None:
+                        future.set_exception(error)
+                        continue
+                    try:
+                        future.set_result(result() if callable(result) else result)
+                    except Exception as e:
+                        # The write is committed but the cache missed it: rebuild on the next read
+                        self._version = None
+                        future.set_exception(e)
+
+    # -- writes --------------------------------------------------------------
+
+    def add(self, text, due_at, rule=None):
+        """Store a reminder (recurring from due_at if a rule is given); returns it"""
+        def insert(conn):
+            reminder_id = conn.execute(INSERT_SQL, (text, due_at.isoformat(), rule)).lastrowid
+            return lambda: self._added(reminder_id, text, due_at, rule)
+        return self._submit(insert)
+
+    def _added(self, reminder_id, text, due_at, rule=None):
+        self._cache_add(reminder_id, text, due_at, rule)
+        return Reminder(reminder_id, text, due_at, rule)
+
+    def complete(self, *reminder_ids, now=None):
+        """Mark reminders completed; recurring ones move on to their next occurrence after now"""
+        now = now or datetime.datetime.now()
+
+        def mark(conn):
+            advanced = []
+            for reminder_id in reminder_ids:
+                row = conn.execute(PENDING_ROW_SQL, (reminder_id,)).fetchone()
+                if row is not None and row[2]:
+                    text, when, rule = row[0], parse_time(row[1]), row[2]
+                    advanced.append((reminder_id, text, next_occurrence(rule, when, now), rule))
+                    conn.execute(ADVANCE_SQL, (advanced[-1][2].isoformat(), reminder_id))
+                else:
+                    conn.execute(COMPLETE_SQL, (reminder_id,))
+            return lambda: self._completed(reminder_ids, advanced)
+        self._submit(mark)
+
+    def cancel(self, *reminder_ids):
+        """Mark reminders completed, ending recurring series"""
+        def mark(conn):
+            conn.executemany(COMPLETE_SQL, ((reminder_id,) for reminder_id in reminder_ids))
+            return lambda: self._completed(reminder_ids)
+        self._submit(mark)
+
+    def _completed(self, reminder_ids, advanced=()):
+        for reminder_id in reminder_ids:
+            self._cache_remove(reminder_id)
+        for entry in advanced:
+            self._cache_add(*entry)
+
+    def snooze(self, reminder_id, until):
+        """Move a pending reminder to a new due time; returns it, or None if it is not pending"""
+        def reschedule(conn):
+            row = conn.execute(PENDING_ROW_SQL, (reminder_id,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(RESCHEDULE_SQL, (until.isoformat(), reminder_id))
+            return lambda: self._added(reminder_id, row[0], until, row[2])
+        return self._submit(reschedule)
+
+    def claim_due_rows(self, now, limit=-1):
+        """Atomically claim due reminders; returns the claimed occurrences as Reminder tuples, oldest first
+
+        One-off reminders are completed; recurring ones stay pending at their next occurrence.
+        """
+        def claim(conn):
+            rows, advanced = claim_rows(conn, now, limit)
+            return lambda: self._claimed(rows, advanced)
+        return self._submit(claim)
+
+    def _claimed(self, rows, advanced):
+        claimed = [Reminder(*row) for row in rows]
+        for reminder in claimed:
+            if reminder.id in advanced:
+                self._cache_add(reminder.id, reminder.text, advanced[reminder.id], reminder.rule)
+            else:
+                self._cache_remove(reminder.id)
+        return claimed
+
+    def claim_due(self, now, limit=-1):
+        """Texts of the due reminders, which are marked completed"""
+        return [reminder.text for reminder in self.claim_due_rows(now, limit)]
+
+    # -- reads (served from the cache) ---------------------------------------
+
+    def get(self, reminder_id):
+        self._fresh()
+        with self._lock:
+            entry = self._by_id.get(reminder_id)
+            return Reminder(entry[1], entry[2], entry[0], entry[3]) if entry else None
+
+    def count(self):
+        self._fresh()
+        with self._lock:
+            return len(self._entries)
+
+    def list(self, limit=None, offset=0):
+        """Pending reminders in due order"""
+        self._fresh()
+        with self._lock:
+            end = None if limit is None else offset + limit
+            return [Reminder(reminder_id, text, due_at, rule)
+                    for due_at, reminder_id, text, rule in self._entries[offset:end]]
+
+    def iter_pending(self):
+        """(id, text, due_at, rule) for every pending reminder in due order (ReminderStore-compatible)"""
+        return iter(self.list())
+
+    def due(self, now):
+        """Pending reminders due at or before now, without claiming them"""
+        return self.filter(due_before=now)
+
+    def filter(self, text=None, due_after=None, due_before=None):
+        """Pending reminders whose text contains `text` (case-insensitive) and whose due time is in range"""
+        self._fresh()
+        with self._lock:
+            start = 0 if due_after is None else bisect.bisect_left(self._entries, (due_after,))
+            end = (len(self._entries) if due_before is None
+                   else bisect.bisect_right(self._entries, (due_before, float('inf'))))
+            needle = text.lower() if text else None
+            return [Reminder(reminder_id, entry_text, due_at, rule)
+                    for due_at, reminder_id, entry_text, rule in self._entries[start:end]
+                    if needle is None or needle in entry_text.lower()]
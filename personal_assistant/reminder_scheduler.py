@@ -0,0 +1,225 @@
+"""
+In-process reminder scheduler.
+
+Pending reminders are kept in a min-heap ordered by due time. A single
+background thread sleeps until the earliest one is due (or until
+`max_sleep` passes, to notice reminders written by other processes), then
+claims everything due from the ReminderStore in one indexed statement and
+hands each reminder to a callback or to `scheduler.queue`.
+
+The heap only holds reminders due within `horizon`; the thread reloads it
+from the store as time moves on. A recurring reminder is one entry at its
+next occurrence: when one is delivered, the next occurrence is taken from
+the rule's occurrence generator and pushed if it falls inside the horizon.
+upcoming() expands recurring reminders the same way, lazily and never past
+the horizon.
+
+Adding a reminder is a heap push; it wakes the thread only when the new
+reminder is due before the one it was sleeping for. All sleeping and time
+lookups go through a clock object, so FakeClock makes the scheduler fully
+deterministic:
+
+    clock = FakeClock(datetime.datetime(2026, 1, 1, 9, 0))
+    scheduler = ReminderScheduler(store, clock=clock)
+    scheduler.schedule(reminder_id, 'stand up', clock.now() + datetime.timedelta(minutes=5))
+    clock.advance(minutes=5)
+    scheduler.run_pending()  # -> [DueReminder(...)]
+"""
+
+import datetime
+import heapq
+import itertools
+import queue
+import threading
+from collections import namedtuple
+
+from recurrence import occurrences, next_occurrence
+
+DueReminder = namedtuple('DueReminder', ['id', 'text', 'due_at', 'rule'], defaults=(None,))
+
+
+class SystemClock:
+    """Wall-clock time (naive local datetimes, like the reminders table)"""
+
+    def now(self):
+        return datetime.datetime.now()
+
+    def wait(self, condition, timeout):
+        """Wait on a held condition for up to timeout seconds (None = until notified)"""
+        condition.wait(timeout)
+
+
+class FakeClock:
+    """Manually advanced clock; waiters wake when it moves or when they are notified"""
+
+    def __init__(self, start=None):
+        self._now = start or datetime.datetime(2026, 1, 1)
+        self._conditions = set()
+        self._lock = threading.Lock()
+
+    def now(self):
+        with self._lock:
+            return self._now
+
+    def wait(self, condition, timeout):
+        with self._lock:
+            self._conditions.add(condition)
+        try:
+            condition.wait()
+        finally:
+            with self._lock:
+                self._conditions.discard(condition)
+
+    @property
+    def sleepers(self):
+        """Number of threads currently waiting on this clock"""
+        with self._lock:
+            return len(self._conditions)
+
+    def advance(self, delta=None, **kwargs):
+        """Move time forward by a timedelta (or timedelta keyword arguments) and wake all waiters"""
+        with self._lock:
+            self._now += delta if delta is not None else datetime.timedelta(**kwargs)
+            conditions = list(self._conditions)
+        for condition in conditions:
+            with condition:
+                condition.notify_all()
+
+
+def _expand(reminder_id, text, due_at, rule, until):
+    yield DueReminder(reminder_id, text, due_at, rule)
+    if rule:
+        for moment in occurrences(rule, due_at, until):
+            yield DueReminder(reminder_id, text, moment, rule)
+
+
+class ReminderScheduler:
+    """Heap-ordered reminder delivery backed by a ReminderStore"""
+
+    def __init__(self, store, callback=None, clock=None, max_sleep=60.0, horizon=datetime.timedelta(days=1)):
+        self.store = store
+        self.callback = callback
+        self.clock = clock or SystemClock()
+        self.max_sleep = max_sleep
+        self.horizon = horizon
+        self.queue = queue.Queue()
+        self._heap = []  # (due_at, id, text)
+        self._loaded_until = None
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self.running = False
+
+    def __len__(self):
+        return len(self._heap)
+
+    def load(self):
+        """Fill the heap with the pending reminders due within the horizon"""
+        until = self.clock.now() + self.horizon
+        rows = itertools.takewhile(lambda row: row[2] <= until, self.store.iter_pending())
+        entries = [(when, reminder_id, text) for reminder_id, text, when, *_ in rows]
+        with self._cond:
+            self._heap = entries  # already in due order, so already a heap
+            self._loaded_until = until
+            self._cond.notify()
+
+    def upcoming(self, until=None):
+        """DueReminders for every occurrence due before `until` (default: the horizon), in due order
+
+        Recurring reminders are expanded lazily from their rule, so this is a
+        generator that never materializes occurrences past `until`.
+        """
+        until = until or self.clock.now() + self.horizon
+        series = []
+        for reminder_id, text, when, *rule in self.store.iter_pending():
+            if when > until:
+                break
+            series.append(_expand(reminder_id, text, when, rule[0] if rule else None, until))
+        return heapq.merge(*series, key=lambda reminder: (reminder.due_at, reminder.id))
+
+    def schedule(self, reminder_id, text, due_at):
+        """Add a stored reminder; wakes the scheduler if it is now the earliest"""
+        with self._cond:
+            heapq.heappush(self._heap, (due_at, reminder_id, text))
+            if self._heap[0][1] == reminder_id:
+                self._cond.notify()
+
+    def next_due(self):
+        """Due time of the earliest scheduled reminder, or None"""
+        with self._cond:
+            return self._heap[0][0] if self._heap else None
+
+    def run_pending(self):
+        """Deliver every reminder that is due now; returns the delivered DueReminders"""
+        now = self.clock.now()
+        with self._cond:
+            while self._heap and self._heap[0][0] <= now:
+                heapq.heappop(self._heap)
+        # The claim also picks up due reminders this process never saw (written by
+        # other workers) and skips ones another worker already delivered
+        due = [DueReminder(*row) for row in self.store.claim_due_rows(now)]
+        for reminder in due:
+            self._deliver(reminder)
+            if reminder.rule:
+                # The store already moved the series on; keep the heap in step with it
+                next_at = next_occurrence(reminder.rule, reminder.due_at, now)
+                if next_at <= now + self.horizon:
+                    self.schedule(reminder.id, reminder.text, next_at)
+        return due
+
+    def _deliver(self, reminder):
+        if self.callback is None:
+            self.queue.put(reminder)
+            return
+        try:
+            self.callback(reminder)
+        except Exception as e:
+            print(f"Error delivering reminder {reminder.id}: {e}")
+
+    def drain(self):
+        """Queued reminders that have not been consumed yet"""
+        delivered = []
+        while True:
+            try:
+                delivered.append(self.queue.get_nowait())
+            except queue.Empty:
+                return delivered
+
+    def _seconds_until_next(self):
+        if not self._heap:
+            return self.max_sleep
+        seconds = (self._heap[0][0] - self.clock.now()).total_seconds()
+        return min(max(seconds, 0.0), self.max_sleep)
+
+    def _run(self):
+        while not self._stopping:
+            try:
+                if self.clock.now() + self.horizon / 2 >= self._loaded_until:
+                    self.load()
+                self.run_pending()
+            except Exception as e:
+                print(f"Reminder scheduler error: {e}")
+            with self._cond:
+                if self._stopping:
+                    break
+                timeout = self._seconds_until_next()
+                if timeout > 0:
+                    self.clock.wait(self._cond, timeout)
+
+    def start(self):
+        """Load pending reminders and start the background delivery thread"""
+        if self.running:
+            return
+        self.load()
+        self._stopping = False
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name='reminder-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.running = False
@@ -0,0 +1,215 @@
+"""
+SQLite storage for reminders.
+
+One ReminderStore per process owns the database file. Each thread gets its
+own long-lived connection (opened on first use, never closed per call) in WAL
+mode, so readers never block the writer and concurrent Flask workers wait on
+busy_timeout instead of failing with "database is locked". The schema is
+migrated once, when the store is created, using PRAGMA user_version.
+
+A recurring reminder is one row: `recurrence` holds its rule (see
+recurrence.py) and `reminder_time` its next occurrence. Claiming it moves it
+to the following occurrence instead of completing it, so the pending index
+holds one entry per series and due queries stay index range scans no matter
+how many occurrences a series has.
+
+Statements are module-level constants so sqlite3's per-connection statement
+cache prepares each one once and reuses it afterwards.
+"""
+
+import datetime
+import sqlite3
+import threading
+
+from recurrence import next_occurrence
+
+# Each entry upgrades the schema from version i to version i + 1
+MIGRATIONS = (
+    '''
+    CREATE TABLE IF NOT EXISTS reminders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        reminder_text TEXT NOT NULL,
+        reminder_time DATETIME NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        is_completed BOOLEAN DEFAULT 0
+    );
+    ''',
+    # Pending reminders only, in due order, so due queries and claims never touch completed rows
+    '''
+    CREATE INDEX IF NOT EXISTS idx_reminders_pending ON reminders (reminder_time, id) WHERE is_completed = 0;
+    ''',
+    # RRULE-style rule of a recurring reminder (NULL for one-off reminders)
+    '''
+    ALTER TABLE reminders ADD COLUMN recurrence TEXT;
+    ''',
+)
+
+INSERT_SQL = 'INSERT INTO reminders (reminder_text, reminder_time, recurrence) VALUES (?, ?, ?)'
+DUE_SQL = ('SELECT id, reminder_text FROM reminders WHERE reminder_time <= ? AND is_completed = 0 '
+           'ORDER BY reminder_time, id LIMIT ?')
+# Marks up to LIMIT due reminders completed and hands them back in one statement (SQLite >= 3.35)
+CLAIM_SQL = ('UPDATE reminders SET is_completed = 1 WHERE id IN ('
+             'SELECT id FROM reminders WHERE reminder_time <= ? AND is_completed = 0 '
+             'ORDER BY reminder_time, id LIMIT ?) '
+             'RETURNING id, reminder_text, reminder_time, recurrence')
+CLAIM_SELECT_SQL = ('SELECT id, reminder_text, reminder_time, recurrence FROM reminders '
+                    'WHERE reminder_time <= ? AND is_completed = 0 ORDER BY reminder_time, id LIMIT ?')
+COMPLETE_SQL = 'UPDATE reminders SET is_completed = 1 WHERE id = ?'
+# Puts a claimed recurring reminder back as pending at its next occurrence
+ADVANCE_SQL = 'UPDATE reminders SET reminder_time = ?, is_completed = 0 WHERE id = ?'
+PENDING_ROW_SQL = 'SELECT reminder_text, reminder_time, recurrence FROM reminders WHERE id = ? AND is_completed = 0'
+RESCHEDULE_SQL = 'UPDATE reminders SET reminder_time = ? WHERE id = ? AND is_completed = 0'
+PENDING_SQL = ('SELECT id, reminder_text, reminder_time, recurrence FROM reminders WHERE is_completed = 0 '
+               'ORDER BY reminder_time, id')
+PENDING_PAGE_SQL = ('SELECT id, reminder_text, reminder_time, recurrence FROM reminders '
+                    'WHERE is_completed = 0 AND (reminder_time, id) > (?, ?) '
+                    'ORDER BY reminder_time, id LIMIT ?')
+
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+class ReminderStore:
+    """Thread-safe access to the reminders table"""
+
+    def __init__(self, path='reminders.db', busy_timeout_ms=5000, synchronous='NORMAL', cached_statements=64):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.synchronous = synchronous
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self.migrate()
+
+    def connect(self):
+        """A new connection configured like the store's own (autocommit, WAL, busy_timeout)"""
+        # Autocommit mode; write transactions are opened explicitly with BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None,
+                               check_same_thread=False, cached_statements=self.cached_statements)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={self.synchronous}')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        return conn
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self.connect()
+        return conn
+
+    def _write(self):
+        """Context manager for a write transaction that takes the write lock up front"""
+        return write_transaction(self._conn())
+
+    def migrate(self):
+        """Bring the schema up to date; cheap when it already is"""
+        with self._write() as conn:
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            for index in range(version, len(MIGRATIONS)):
+                for statement in MIGRATIONS[index].split(';'):
+                    if statement.strip():
+                        conn.execute(statement)
+            if version < len(MIGRATIONS):
+                conn.execute(f'PRAGMA user_version={len(MIGRATIONS)}')
+
+    def add(self, text, reminder_time, recurrence=None):
+        """Store a reminder (recurring from reminder_time if a rule is given); returns its id"""
+        with self._write() as conn:
+            return conn.execute(INSERT_SQL, (text, reminder_time.isoformat(), recurrence)).lastrowid
+
+    def add_many(self, items):
+        """Store (text, reminder_time) or (text, reminder_time, recurrence) tuples in one transaction"""
+        with self._write() as conn:
+            conn.executemany(INSERT_SQL, ((text, when.isoformat(), rule[0] if rule else None)
+                                          for text, when, *rule in items))
+
+    def due(self, now, limit=-1):
+        """(id, text) of pending reminders due at or before now, oldest first"""
+        return self._conn().execute(DUE_SQL, (now.isoformat(), limit)).fetchall()
+
+    def claim_due_rows(self, now, limit=-1):
+        """Claim up to `limit` due reminders; returns their (id, text, reminder_time, recurrence) rows
+
+        One-off reminders are marked completed and recurring ones move on to
+        their next occurrence, in one transaction, so each due occurrence goes
+        to exactly one caller even when several processes claim at once.
+        """
+        with self._write() as conn:
+            rows, _ = claim_rows(conn, now, limit)
+        return rows
+
+    def claim_due(self, now, limit=-1):
+        """Mark due reminders completed and return their texts, oldest first"""
+        return [row[1] for row in self.claim_due_rows(now, limit)]
+
+    def pending_page(self, limit=100, after=None):
+        """One page of pending reminders in due order
+
+        Returns (rows, cursor): rows are (id, text, reminder_time, rule)
+        tuples, with reminder_time a datetime and rule the recurrence rule
+        string or None; cursor goes back in as `after` for the next page
+        (None on the last page). Pages are keyset ranges over the pending
+        index, so deep pages cost the same as the first one.
+        """
+        after_time, after_id = after if after is not None else ('', 0)
+        rows = self._conn().execute(PENDING_PAGE_SQL, (after_time, after_id, limit)).fetchall()
+        cursor = (rows[-1][2], rows[-1][0]) if len(rows) == limit else None
+        return [(reminder_id, text, parse_time(when), rule) for reminder_id, text, when, rule in rows], cursor
+
+    def iter_pending(self, page_size=500):
+        """Every pending reminder in due order, fetched a page at a time"""
+        cursor = None
+        while True:
+            rows, cursor = self.pending_page(page_size, cursor)
+            yield from rows
+            if cursor is None:
+                return
+
+    def close(self):
+        """Close the calling thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def parse_time(value):
+    return datetime.datetime.fromisoformat(value)
+
+
+def claim_rows(conn, now, limit=-1):
+    """Claim due reminders inside an open write transaction on conn
+
+    Returns (rows, advanced): rows are the claimed (id, text, reminder_time,
+    recurrence) occurrences, oldest first; advanced maps each recurring id to
+    the next occurrence it was moved to.
+    """
+    if HAS_RETURNING:
+        rows = conn.execute(CLAIM_SQL, (now.isoformat(), limit)).fetchall()
+    else:
+        rows = conn.execute(CLAIM_SELECT_SQL, (now.isoformat(), limit)).fetchall()
+        conn.executemany(COMPLETE_SQL, ((row[0],) for row in rows))
+    rows = [(reminder_id, text, parse_time(when), rule) for reminder_id, text, when, rule in rows]
+    rows.sort(key=lambda row: (row[2], row[0]))  # RETURNING order is unspecified
+    advanced = {reminder_id: next_occurrence(rule, when, now) for reminder_id, _, when, rule in rows if rule}
+    if advanced:
+        conn.executemany(ADVANCE_SQL, ((when.isoformat(), reminder_id) for reminder_id, when in advanced.items()))
+    return rows, advanced
+
+
+def write_transaction(conn):
+    """Context manager running a BEGIN IMMEDIATE ... COMMIT/ROLLBACK block on conn"""
+    return _WriteTransaction(conn)
+
+
+class _WriteTransaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        # IMMEDIATE takes the write lock now (waiting up to busy_timeout) instead of
+        # failing later when a read transaction tries to upgrade
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
@@ -0,0 +1,314 @@
+"""
+TTL + LRU result cache for expensive lookups (web searches, API calls).
+
+A ResultCache wraps a storage backend:
+
+* MemoryBackend - in-process OrderedDict, LRU-bounded by entries and bytes
+* SQLiteBackend - a SQLite file that several worker processes can share
+
+Entries are fresh for `ttl` seconds and may then be served stale for another
+`stale_ttl` seconds while a background refresh fetches a new value. Concurrent
+misses for the same key share one computation (single-flight).
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def _encode(value):
+    return json.dumps(value, separators=(',', ':'))
+
+
+class MemoryBackend:
+    """In-process LRU store bounded by entry count and total bytes"""
+
+    def __init__(self, max_entries=1024, max_bytes=16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size, stored_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        """Return (value, stored_at) or None, marking the entry as recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[2]
+
+    def set(self, key, value, stored_at):
+        size = len(_encode(value).encode('utf-8'))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, stored_at)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[1]
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        return {'entries': len(self._entries), 'bytes': self._bytes, 'evictions': self.evictions}
+
+
+class SQLiteBackend:
+    """SQLite-file store shared by every worker process that opens the same path
+
+    A hit only rewrites accessed_at when the stored one is more than
+    `touch_interval` seconds old, so hot keys cost a read, not a write
+    transaction, per lookup; LRU order is only that coarse.
+    """
+
+    def __init__(self, path='result_cache.db', max_entries=10000, max_bytes=64 * 1024 * 1024, namespace='default',
+                 touch_interval=60.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.namespace = namespace
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        self.evictions = 0
+        conn = self._conn()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_lru ON cache_entries (namespace, accessed_at)')
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute('SELECT value, stored_at, accessed_at FROM cache_entries WHERE namespace = ? AND key = ?',
+                           (self.namespace, key)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[2] >= self.touch_interval:
+            with conn:
+                conn.execute('UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?',
+                             (now, self.namespace, key))
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, stored_at):
+        encoded = _encode(value)
+        size = len(encoded.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        conn = self._conn()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO cache_entries (namespace, key, value, size, stored_at, accessed_at) '
+                         'VALUES (?, ?, ?, ?, ?, ?)', (self.namespace, key, encoded, size, stored_at, time.time()))
+            self._evict(conn)
+
+    def _evict(self, conn):
+        """Drop least recently used entries until both bounds hold"""
+        count, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?',
+                                    (self.namespace,)).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = conn.execute('SELECT key, size FROM cache_entries WHERE namespace = ? ORDER BY accessed_at',
+                            (self.namespace,))
+        doomed = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((self.namespace, key))
+            count -= 1
+            total -= size
+        conn.executemany('DELETE FROM cache_entries WHERE namespace = ? AND key = ?', doomed)
+        self.evictions += len(doomed)
+
+    def delete(self, key):
+        conn = self._conn()
+        with conn:
+            conn.execute('DELETE FROM cache_entries WHERE namespace = ? AND key = ?', (self.namespace, key))
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute('DELETE FROM cache_entries WHERE namespace = ?', (self.namespace,))
+
+    def stats(self):
+        count, total = self._conn().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?',
+            (self.namespace,)).fetchone()
+        return {'entries': count, 'bytes': total, 'evictions': self.evictions}
+
+
+def make_backend(kind='memory', **options):
+    """Build a backend by name ('memory' or 'sqlite')"""
+    if kind == 'sqlite':
+        return SQLiteBackend(**options)
+    if kind == 'memory':
+        return MemoryBackend(**{k: v for k, v in options.items() if k in ('max_entries', 'max_bytes')})
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+
+class _Flight:
+    """One in-progress computation that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResultCache:
+    """TTL cache with stale-while-revalidate and single-flight computation"""
+
+    def __init__(self, backend=None, ttl=600, stale_ttl=3600, clock=time.time):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'stale_hits': 0, 'coalesced': 0, 'refreshes': 0, 'errors': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, key, compute, should_cache=None):
+        """Return the cached value for key, calling compute() on a miss
+
+        should_cache(value) can veto storing a result (e.g. empty answers).
+        """
+        try:
+            entry = self.backend.get(key)
+        except sqlite3.Error as e:
+            print(f"Cache read error: {e}")
+            entry = None
+
+        if entry is not None:
+            value, stored_at = entry
+            age = self.clock() - stored_at
+            if age <= self.ttl:
+                self._count('hits')
+                return value
+            if age <= self.ttl + self.stale_ttl:
+                # Serve the stale value now and refresh it in the background
+                self._count('stale_hits')
+                self._refresh_in_background(key, compute, should_cache)
+                return value
+
+        self._count('misses')
+        return self._single_flight(key, compute, should_cache)
+
+    def _single_flight(self, key, compute, should_cache):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._counters['coalesced'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            if should_cache is None or should_cache(flight.value):
+                try:
+                    self.backend.set(key, flight.value, self.clock())
+                except sqlite3.Error as e:
+                    print(f"Cache write error: {e}")
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            self._count('errors')
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _refresh_in_background(self, key, compute, should_cache):
+        with self._lock:
+            if key in self._flights:
+                return  # Someone is already fetching it
+            self._counters['refreshes'] += 1
+
+        def refresh():
+            try:
+                self._single_flight(key, compute, should_cache)
+            except Exception as e:
+                print(f"Background refresh failed for {key!r}: {e}")
+
+        threading.Thread(target=refresh, name='cache-refresh', daemon=True).start()
+
+    def peek(self, key):
+        """The cached value if it is still fresh, else None (never computes; for callers that batch their misses)"""
+        try:
+            entry = self.backend.get(key)
+        except sqlite3.Error as e:
+            print(f"Cache read error: {e}")
+            return None
+        if entry is None or self.clock() - entry[1] > self.ttl:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return entry[0]
+
+    def put(self, key, value):
+        """Store a value computed outside get() (e.g. one result of a batch fetch)"""
+        try:
+            self.backend.set(key, value, self.clock())
+        except sqlite3.Error as e:
+            print(f"Cache write error: {e}")
+
+    def invalidate(self, key):
+        self.backend.delete(key)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        """Hit/miss counters plus backend size information"""
+        with self._lock:
+            counters = dict(self._counters)
+        counters.update(self.backend.stats())
+        lookups = counters['hits'] + counters['stale_hits'] + counters['misses']
+        counters['hit_rate'] = (counters['hits'] + counters['stale_hits']) / lookups if lookups else 0.0
+        return counters
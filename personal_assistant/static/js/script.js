@@ -14,6 +14,7 @@ document.addEventListener('DOMContentLoaded', () => {
     let isRecording = false;
     let recognition;
     let speechSynthesis = window.speechSynthesis;
+    let lastEventId = '';
     
     // Initialize the app
     function init() {
@@ -21,6 +22,7 @@ document.addEventListener('DOMContentLoaded', () => {
         setInterval(updateCurrentTime, 60000); // Update time every minute
         setupEventListeners();
         checkConnection();
+        subscribeToNotifications();
         loadThemePreference();
         
         // Initialize Web Speech API
@@ -311,7 +313,11 @@ document.addEventListener('DOMContentLoaded', () => {
     
     // Speak text using the Web Speech API
     function speak(text) {
-        if (!text || !speechSynthesis) return;
+        if (!text) return;
+        if (!window.speechSynthesis) {
+            playServerSpeech(text);
+            return;
+        }
         
         // Cancel any ongoing speech
         speechSynthesis.cancel();
@@ -342,6 +348,30 @@ document.addEventListener('DOMContentLoaded', () => {
         speechSynthesis.speak(utterance);
     }
     
+    // Without the Web Speech API, play a clip rendered (and cached) by the server
+    function playServerSpeech(text) {
+        fetch('/speak', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ text: text, mode: 'file' })
+        })
+        .then(response => response.json())
+        .then(job => waitForClip(job, 20))
+        .catch(error => console.error('Error playing speech:', error));
+    }
+    
+    function waitForClip(job, attempts) {
+        if (job.status === 'done' && job.audio_url) {
+            new Audio(job.audio_url).play();
+        } else if ((job.status === 'queued' || job.status === 'speaking') && attempts > 0) {
+            setTimeout(() => {
+                fetch(`/speak/${job.job_id}`)
+                    .then(response => response.json())
+                    .then(next => waitForClip(next, attempts - 1));
+            }, 300);
+        }
+    }
+    
     // Scroll chat to bottom
     function scrollToBottom() {
         chatBox.scrollTop = chatBox.scrollHeight;
@@ -370,6 +400,36 @@ document.addEventListener('DOMContentLoaded', () => {
             });
     }
     
+    // Receive due reminders pushed by the server. EventSource reconnects by itself
+    // and sends Last-Event-ID, so events published while disconnected are replayed.
+    function subscribeToNotifications() {
+        if (!window.EventSource) return;
+        
+        const url = lastEventId ? `/events?lastEventId=${encodeURIComponent(lastEventId)}` : '/events';
+        const events = new EventSource(url);
+        
+        events.addEventListener('reminder', (e) => {
+            lastEventId = e.lastEventId;
+            const reminder = JSON.parse(e.data);
+            addMessage(`🔔 Reminder: ${reminder.text}`, false);
+            speak(`Reminder: ${reminder.text}`);
+        });
+        
+        events.onopen = () => {
+            connectionStatus.className = 'connected';
+            connectionStatus.title = 'Connected to server';
+        };
+        
+        events.onerror = () => {
+            connectionStatus.className = 'disconnected';
+            connectionStatus.title = 'Disconnected from server';
+            // The browser gives up after a failed (non-200) response; start over later
+            if (events.readyState === EventSource.CLOSED) {
+                setTimeout(subscribeToNotifications, 5000);
+            }
+        };
+    }
+    
     // Toggle between light and dark theme
     function toggleTheme() {
         const html = document.documentElement;
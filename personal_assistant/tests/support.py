@@ -0,0 +1,27 @@
+"""Import agent with its databases in a temporary directory, no background threads and no API keys"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp(prefix='assistant-tests-')
+for name, value in {
+    'REMINDERS_DB': os.path.join(_tmp, 'reminders.db'),
+    'ARTICLE_CACHE_PATH': os.path.join(_tmp, 'article_cache.db'),
+    'KNOWLEDGE_DB': os.path.join(_tmp, 'knowledge.db'),
+    'TTS_CACHE_DIR': os.path.join(_tmp, 'tts_cache'),
+    'REMINDER_SCHEDULER': '0',
+    'TTS_DRIVER': 'fake',
+    'VOICE_BACKEND': 'fake',
+    'WEATHER_CLIENT': 'fake',
+    # Set here so values from a local .env (which load_dotenv never overrides) stay unused
+    'NEWS_API_KEY': 'demo',
+    'NEWS_RSS_FEEDS': '',
+    'WOLFRAMALPHA_APP_ID': '',
+    'OPENWEATHER_API_KEY': '',
+}.items():
+    os.environ[name] = value
+
+import agent  # noqa: E402
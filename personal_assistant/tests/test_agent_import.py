@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHECK = """
+import os, threading
+import agent
+print(sorted(thread.name for thread in threading.enumerate()))
+print(sorted(os.listdir('.')))
+print(sorted(stats['name'] for stats in agent.resources.report() if stats['loaded']))
+"""
+
+
+class AgentImportTest(unittest.TestCase):
+    def test_import_starts_no_threads_and_writes_no_files(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            env = {name: value for name, value in os.environ.items()
+                   if name not in ('REMINDERS_DB', 'ARTICLE_CACHE_PATH', 'KNOWLEDGE_DB', 'TTS_CACHE_DIR')}
+            env.update(PYTHONPATH=PACKAGE_DIR, PREWARM_RESOURCES='')
+            result = subprocess.run([sys.executable, '-c', CHECK], cwd=workdir, env=env, capture_output=True,
+                                    text=True, timeout=120)
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertEqual(result.stdout.splitlines(), ["['MainThread']", '[]', '[]'])
+
+
+if __name__ == '__main__':
+    unittest.main()
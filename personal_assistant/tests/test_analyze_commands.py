@@ -0,0 +1,64 @@
+import unittest
+from unittest import mock
+
+import spacy
+from spacy.language import Language
+
+from support import agent
+
+ran = []
+
+
+@Language.component('record_docs')
+def record_docs(doc):
+    ran.append(doc.text)
+    return doc
+
+
+def model():
+    """Blank English pipeline whose 'ner' is an entity ruler, next to a component analyze_commands must skip"""
+    nlp = spacy.blank('en')
+    nlp.add_pipe('record_docs')
+    ruler = nlp.add_pipe('entity_ruler', name='ner')
+    ruler.add_patterns([{'label': 'GPE', 'pattern': [{'LOWER': 'paris'}]},
+                        {'label': 'PERSON', 'pattern': [{'LOWER': 'alice'}]}])
+    return nlp
+
+
+class AnalyzeCommandsTest(unittest.TestCase):
+    def setUp(self):
+        del ran[:]
+
+    def test_intents_and_entities_per_command(self):
+        commands = ['what is the weather in Paris', 'remind me to call Alice at 5 pm', '', None, '2 + 2']
+        results = list(agent.analyze_commands(commands, batch_size=2, model=model()))
+        self.assertEqual(results, [
+            ('what is the weather in Paris', 'weather', [('Paris', 'GPE')]),
+            ('remind me to call Alice at 5 pm', 'set_reminder', [('Alice', 'PERSON')]),
+            ('', 'empty', []),
+            (None, 'empty', []),
+            ('2 + 2', 'math_number', []),
+        ])
+        self.assertEqual(ran, [])  # only the entity recognizer runs
+
+    def test_commands_are_consumed_lazily(self):
+        consumed = []
+
+        def commands():
+            for number in range(100):
+                consumed.append(number)
+                yield f'weather in paris {number}'
+
+        results = agent.analyze_commands(commands(), batch_size=4, model=model())
+        self.assertEqual(next(results)[2], [('paris', 'GPE')])
+        self.assertLess(len(consumed), 100)
+        self.assertEqual(sum(1 for _ in results), 99)
+
+    def test_missing_model(self):
+        with mock.patch.object(agent.resources, 'get', return_value=None):
+            with self.assertRaises(RuntimeError):
+                next(agent.analyze_commands(['hello']))
+
+
+if __name__ == '__main__':
+    unittest.main()
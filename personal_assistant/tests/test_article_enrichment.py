@@ -0,0 +1,59 @@
+import time
+import unittest
+from unittest import mock
+
+from support import agent
+from article_enrichment import enrich_articles
+
+
+class StubFetcher:
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.calls = []
+
+    def fetch(self, url, timeout=10):
+        self.calls.append((url, timeout))
+        return self.bodies.get(url)
+
+
+class EnrichNewsArticlesTest(unittest.TestCase):
+    def test_bodies_are_filled_in(self):
+        articles = [{'title': 'One', 'url': 'https://example.com/1'},
+                    {'title': 'Two', 'url': 'https://example.com/2'}]
+        stub = StubFetcher({'https://example.com/1': 'First body', 'https://example.com/2': 'Second body'})
+        with mock.patch.object(agent, 'article_fetcher', stub):
+            enriched = {article['url']: article['body']
+                        for article in agent.enrich_news_articles(articles, max_workers=2, timeout=3)}
+
+        self.assertEqual(enriched, {'https://example.com/1': 'First body', 'https://example.com/2': 'Second body'})
+        self.assertEqual(sorted(stub.calls), [('https://example.com/1', 3), ('https://example.com/2', 3)])
+
+    def test_bodies_reach_the_knowledge_index(self):
+        agent.knowledge.add('https://example.com/3', 'Glacier report', 'ice')
+        stub = StubFetcher({'https://example.com/3': 'Glaciers retreat faster than expected'})
+        with mock.patch.object(agent, 'article_fetcher', stub):
+            list(agent.enrich_news_articles([{'title': 'Glacier report', 'url': 'https://example.com/3'}]))
+
+        self.assertEqual([hit['url'] for hit in agent.knowledge.search('glaciers retreat')], ['https://example.com/3'])
+
+    def test_demo_articles_are_not_fetched(self):
+        stub = StubFetcher({})
+        with mock.patch.object(agent, 'article_fetcher', stub):
+            response = agent.get_trending_news(3, enrich=True)
+        self.assertIn('COMPREHENSIVE TRENDING NEWS', response)
+        self.assertEqual(stub.calls, [])
+
+
+class EnrichArticlesTest(unittest.TestCase):
+    def slow_fetch(self, url, timeout):
+        time.sleep(0.3)  # e.g. a timed-out attempt followed by a successful retry
+        return 'body'
+
+    def test_batch_deadline_covers_retries(self):
+        articles = [{'url': 'https://example.com/slow'}]
+        [article] = enrich_articles(articles, self.slow_fetch, timeout=0.1, fetch_budget=2)
+        self.assertEqual(article['body'], 'body')
+
+
+if __name__ == '__main__':
+    unittest.main()
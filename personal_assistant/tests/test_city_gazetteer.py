@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from city_gazetteer import Gazetteer, fold
+
+
+class GazetteerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.gazetteer = Gazetteer.load()
+
+    def test_city_after_a_preposition_wins(self):
+        find = self.gazetteer.find
+        self.assertEqual(find('london or paris, what is the weather in paris'), 'Paris')
+        self.assertEqual(find('weather in tokyo'), 'Tokyo')
+        self.assertEqual(find('Berlin weather'), 'Berlin')
+        self.assertEqual(find('is it raining in the city'), None)
+
+    def test_ambiguous_names_only_count_after_a_preposition(self):
+        find = self.gazetteer.find
+        self.assertIsNone(find('nice weather today'))
+        self.assertEqual(find('nice weather in Nice'), 'Nice')
+        self.assertEqual(find('nice day, weather for london'), 'London')
+        self.assertIsNone(find('la la la'))
+        self.assertEqual(find('forecast for LA'), 'Los Angeles')
+        self.assertEqual(find('nice weather in LA and london'), 'Los Angeles')
+
+    def test_longest_name_aliases_and_folding(self):
+        find = self.gazetteer.find
+        self.assertEqual(find('temperature in new york city'), 'New York')
+        self.assertEqual(find('weather in bombay'), 'Mumbai')
+        self.assertEqual(find('WEATHER IN SÃO PAULO?'), 'São Paulo')
+        self.assertEqual(find('weather in sao paulo'), 'São Paulo')
+        self.assertEqual(fold('São Paulo'), 'sao paulo')
+
+    def test_load_from_a_data_file(self):
+        directory = tempfile.mkdtemp(prefix='gazetteer-')
+        self.addCleanup(shutil.rmtree, directory, True)
+        path = os.path.join(directory, 'cities.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('# comment\nSpringfield|Springfield City\n*Reading\n\nYork\nNew York|NYC\n')
+        gazetteer = Gazetteer.load(path)
+        self.assertEqual(gazetteer.size, 6)
+        self.assertEqual(list(gazetteer.matches('reading about new york in springfield city')),
+                         [('Reading', False, True), ('New York', False, False), ('Springfield', True, False)])
+        self.assertEqual(gazetteer.find('reading about york'), 'York')
+        self.assertEqual(gazetteer.find('weather in reading'), 'Reading')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+import html_extract
+
+BING_PAGE = """
+<html><body><nav><ul><li class="nav">Images</li></ul></nav>
+<ol id="b_results">
+  <li class="b_algo"><h2><a href="https://one.example/">First result</a></h2>
+    <div class="b_caption"><p>First snippet</p></div></li>
+  <li class="b_algo tpcn"><h2><a href="https://two.example/">Second result</a></h2>
+    <div class="b_caption"><p>Second snippet</p></div></li>
+  <li class="b_ad"><h2><a href="https://ad.example/">Sponsored</a></h2></li>
+  <li class="tpcn  b_algo"><h2><a href="https://three.example/">Third result</a></h2></li>
+</ol></body></html>
+"""
+
+ARTICLE_PAGE = """
+<html><body><nav><p>Home News Sport</p></nav>
+<div class="layout"><div class="teaser"><p>Read this next</p></div>
+<div class="story-body main wide"><h2>Glaciers</h2>
+  <p>Glaciers in the Alps retreated faster this year than in any year since records began, researchers said.</p>
+  <aside><p>Advertisement</p></aside>
+  <p>The loss was driven by a dry winter and a long summer heat wave.</p>
+</div></div></body></html>
+"""
+
+
+class BackendParityTest(unittest.TestCase):
+    def setUp(self):
+        self.backends = html_extract.available_backends()
+        if not self.backends:
+            self.skipTest('no HTML parser installed')
+
+    def test_bing_results_with_multi_class_items(self):
+        expected = [('First result', 'https://one.example/', 'First snippet'),
+                    ('Second result', 'https://two.example/', 'Second snippet'),
+                    ('Third result', 'https://three.example/', None)]
+        for backend in self.backends:
+            with self.subTest(backend=backend):
+                self.assertEqual(html_extract.bing_results(BING_PAGE, 5, backend=backend), expected)
+
+    def test_bing_results_limit(self):
+        for backend in self.backends:
+            with self.subTest(backend=backend):
+                self.assertEqual(len(html_extract.bing_results(BING_PAGE, 2, backend=backend)), 2)
+
+    def test_article_text_in_multi_class_container(self):
+        outputs = {backend: html_extract.extract_article_text(ARTICLE_PAGE, backend=backend)
+                   for backend in self.backends}
+        for backend, text in outputs.items():
+            with self.subTest(backend=backend):
+                self.assertTrue(text.startswith('Glaciers Glaciers in the Alps'))
+                self.assertNotIn('Advertisement', text)
+                self.assertNotIn('Read this next', text)
+                self.assertEqual(text, outputs[self.backends[0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import threading
+import time
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from http_client import CircuitOpenError, HttpClient
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/ok: 200; /down: always 500; /flaky: 503 on every other hit; /slow: answers after 0.5 s"""
+
+    protocol_version = 'HTTP/1.1'
+    hits = Counter()
+
+    def respond(self):
+        path = self.path.split('?')[0]
+        StubHandler.hits[path] += 1
+        if path == '/slow':
+            time.sleep(0.5)
+        status = {'/down': 500, '/flaky': 503 if StubHandler.hits[path] % 2 else 200}.get(path, 200)
+        try:
+            self.send_response(status)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'ok')
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client timed out and hung up
+
+    do_GET = do_POST = respond
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpClientTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubHandler.hits.clear()
+
+    def client(self, **kwargs):
+        client = HttpClient(backoff_base=0.001, **kwargs)
+        self.addCleanup(client.close)
+        return client
+
+    def test_get_is_retried(self):
+        client = self.client(max_retries=2)
+        self.assertEqual(client.get(f"{self.base}/flaky").status_code, 200)
+        self.assertEqual(StubHandler.hits['/flaky'], 2)
+        self.assertEqual(client.stats()[self.base[7:]]['retries'], 1)
+
+    def test_post_is_not_retried(self):
+        client = self.client(max_retries=2)
+        self.assertEqual(client.request('POST', f"{self.base}/flaky").status_code, 503)
+        self.assertEqual(StubHandler.hits['/flaky'], 1)
+
+    def test_timeout_is_the_total_deadline(self):
+        client = self.client(max_retries=2)
+        start = time.monotonic()
+        with self.assertRaises(requests.Timeout):
+            client.get(f"{self.base}/slow", timeout=0.2)
+        self.assertLess(time.monotonic() - start, 0.45)
+        self.assertEqual(StubHandler.hits['/slow'], 1)
+
+    def test_longer_deadline_leaves_time_for_retries(self):
+        client = self.client(max_retries=2)
+        start = time.monotonic()
+        with self.assertRaises(requests.Timeout):
+            client.get(f"{self.base}/slow", timeout=0.2, deadline=0.9)
+        self.assertLess(time.monotonic() - start, 1.2)
+        self.assertEqual(StubHandler.hits['/slow'], 3)
+
+    def test_breaker_counts_a_retried_call_once(self):
+        client = self.client(max_retries=2, breaker_threshold=2, breaker_cooldown=60)
+        host = self.base[7:]
+        self.assertEqual(client.get(f"{self.base}/down").status_code, 500)
+        self.assertEqual(StubHandler.hits['/down'], 3)
+        self.assertEqual(client.stats()[host]['circuit'], 'closed')
+
+        client.get(f"{self.base}/down")
+        self.assertEqual(client.stats()[host]['circuit'], 'open')
+        with self.assertRaises(CircuitOpenError):
+            client.get(f"{self.base}/ok")
+        self.assertEqual(StubHandler.hits['/ok'], 0)
+
+    def test_half_open_trial(self):
+        client = self.client(max_retries=2, breaker_threshold=1, breaker_cooldown=0.1)
+        host = self.base[7:]
+        client.get(f"{self.base}/down")
+        self.assertEqual(client.stats()[host]['circuit'], 'open')
+
+        time.sleep(0.15)
+        self.assertEqual(client.stats()[host]['circuit'], 'half-open')
+        StubHandler.hits.clear()
+        client.get(f"{self.base}/down")  # the trial is a single probe, and it failed
+        self.assertEqual(StubHandler.hits['/down'], 1)
+        self.assertEqual(client.stats()[host]['circuit'], 'open')
+
+        time.sleep(0.15)
+        self.assertEqual(client.get(f"{self.base}/ok").status_code, 200)
+        self.assertEqual(client.stats()[host]['circuit'], 'closed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from support import agent
+from intent_router import IntentRouter
+
+
+def top_intent(command):
+    candidates = agent.router.route(command)
+    return candidates[0].name if candidates else None
+
+
+class AgentRoutingTest(unittest.TestCase):
+    def test_weather_outranks_date_words(self):
+        self.assertEqual(top_intent('what is the weather like in new york today'), 'weather')
+
+    def test_news_outranks_generic_words(self):
+        self.assertEqual(top_intent('hi, show me the latest news'), 'trending_news')
+        self.assertEqual(top_intent('latest news today'), 'trending_news')
+
+    def test_reminders_outrank_time(self):
+        self.assertEqual(top_intent('remind me to check the time at 5 pm'), 'set_reminder')
+
+    def test_date_questions(self):
+        self.assertEqual(top_intent("What's today's date?"), 'date')
+        self.assertEqual(top_intent('what day is it'), 'date')
+
+    def test_hyphen_is_not_math_without_numeric_operands(self):
+        self.assertNotIn('math', [candidate.name for candidate in agent.router.route('covid-19 news')])
+        self.assertIsNone(agent.router.dispatch('covid-19 news'))
+        self.assertIsNone(agent.router.dispatch('c++ tutorials'))
+
+    def test_symbolic_arithmetic_still_solved(self):
+        self.assertEqual(agent.router.dispatch('10 - 4'), 'The result is 6.')
+        self.assertEqual(agent.router.dispatch('what is 2+2?'), 'The result is 4.')
+
+
+class IntentRouterTest(unittest.TestCase):
+    def test_priority_then_position(self):
+        router = IntentRouter()
+        router.register('low', None, triggers=['alpha'], priority=1)
+        router.register('high', None, triggers=['beta gamma'], priority=5)
+        router.register('early', None, triggers=['delta'], priority=1)
+        names = [match.name for match in router.route('delta alpha then beta gamma')]
+        self.assertEqual(names, ['high', 'early', 'low'])
+
+    def test_first_occurrence_of_a_phrase_is_reported(self):
+        router = IntentRouter()
+        router.register('news', None, triggers=['latest news'])
+        [match] = router.route('latest and latest news and latest news')
+        self.assertEqual(match.position, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+import numpy as np
+
+import math_batch
+import math_engine
+
+EXPRESSIONS = [
+    'what is 3 plus 4 times 2', 'What is 100 divided by 4?', 'subtract 2 from 5', 'add 2 and 3', '(2 + 3) ^ 2',
+    '2x3', '1,000 + 2,500.5', '10 % 3', '10 % .5', '50%', '15% of 80', '200 + 10%', '2 squared', '-(3 - 5)',
+    '7 / 2', '5. + .5', '3..5 + 1', '0.1 + 0.2',
+    # error rows
+    'half of 10', 'what is 2 plus', '1 / 0', '5 mod 0', '0 ^ -1', '(-8) ^ 0.5', '10 ^ 400', '9e999', '', '+',
+]
+
+
+class RespondManyTest(unittest.TestCase):
+    def test_matches_respond_per_element(self):
+        expected = [math_engine.respond(expression) for expression in EXPRESSIONS]
+        self.assertEqual(math_batch.respond_many(EXPRESSIONS), expected)
+        self.assertIn(math_engine.PARSE_ERROR_MESSAGE, expected)
+        self.assertIn(math_engine.DIVISION_BY_ZERO_MESSAGE, expected)
+        self.assertIn(math_engine.OVERFLOW_MESSAGE, expected)
+
+    def test_repeated_skeletons_with_different_numbers(self):
+        expressions = [f'what is {a} divided by {b}' for a in range(0, 30, 7) for b in range(0, 4)]
+        expressions += [f'{a:,} times {b}' for a in (999, 1000, 123456) for b in (0.5, 3)]
+        self.assertEqual(math_batch.respond_many(expressions),
+                         [math_engine.respond(expression) for expression in expressions])
+
+    def test_results_and_array_input(self):
+        result = math_batch.evaluate_batch(np.array(['2 + 2', 'half of 10', '1 / 0']))
+        self.assertEqual(result.ok.tolist(), [True, False, False])
+        self.assertEqual([(r.value, r.error) for r in result.results()],
+                         [(4.0, None), (None, math_engine.PARSE_ERROR_MESSAGE),
+                          (None, math_engine.DIVISION_BY_ZERO_MESSAGE)])
+
+
+if __name__ == '__main__':
+    unittest.main()
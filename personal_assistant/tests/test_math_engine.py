@@ -0,0 +1,64 @@
+import unittest
+from unittest import mock
+
+from support import agent
+import math_engine
+
+
+class MathEngineTest(unittest.TestCase):
+    def test_spoken_and_symbolic_arithmetic(self):
+        self.assertEqual(math_engine.respond('what is 3 plus 4 times 2'), 'The result is 11.')
+        self.assertEqual(math_engine.respond('What is 100 divided by 4?'), 'The result is 25.')
+        self.assertEqual(math_engine.respond('subtract 2 from 5'), 'The result is 3.')
+        self.assertEqual(math_engine.respond('what is the result of (2 + 3) ^ 2?'), 'The result is 25.')
+
+    def test_unknown_words_are_a_parse_error(self):
+        for text in ('half of 10', 'sqrt of 16', 'next 5 boxes times 3'):
+            with self.subTest(text=text):
+                with self.assertRaises(math_engine.MathParseError):
+                    math_engine.parse(text)
+                self.assertEqual(math_engine.respond(text), math_engine.PARSE_ERROR_MESSAGE)
+
+    def test_percent_sign_between_operands_is_modulo(self):
+        self.assertEqual(math_engine.evaluate('10 % 3'), 1)
+        self.assertEqual(math_engine.evaluate('20 % (3 + 3)'), 2)
+        self.assertEqual(math_engine.evaluate('10 mod 4'), 2)
+
+    def test_percentages(self):
+        self.assertEqual(math_engine.evaluate('50%'), 0.5)
+        self.assertEqual(math_engine.evaluate('what is 15% of 80?'), 12)
+        self.assertEqual(math_engine.evaluate('15 percent of 80'), 12)
+        self.assertEqual(math_engine.evaluate('200 + 10%'), 200.1)
+
+    def test_deep_nesting_is_a_parse_error(self):
+        self.assertEqual(math_engine.evaluate('(' * 50 + '1 + 1' + ')' * 50), 2)
+        for text in ('what is ' + '(' * 600 + '1' + ')' * 600, '-' * 500 + '1', '1 + ' * 3000 + '1'):
+            with self.subTest(text=text[:20]):
+                with self.assertRaises(math_engine.MathParseError):
+                    math_engine.parse(text)
+
+    def test_batch_marks_unknown_words_as_parse_errors(self):
+        results = math_engine.evaluate_many(['2 + 2', 'half of 10'])
+        self.assertEqual([result.error for result in results], [None, math_engine.PARSE_ERROR_MESSAGE])
+
+
+class MathRoutingTest(unittest.TestCase):
+    def test_unparsed_math_falls_through_to_search(self):
+        for command in ('half of 10', 'sqrt of 16', 'calculate half of 10'):
+            with self.subTest(command=command):
+                with mock.patch.object(agent, 'search_web', return_value='searched') as search_web:
+                    self.assertEqual(agent.process_command(command), 'searched')
+                search_web.assert_called_once()
+
+    def test_deeply_nested_command_falls_through(self):
+        command = 'what is ' + '(' * 600 + '1' + ')' * 600
+        with mock.patch.object(agent, 'search_web', return_value='searched'):
+            self.assertEqual(agent.process_command(command), 'searched')
+
+    def test_percent_is_solved(self):
+        self.assertEqual(agent.process_command('what is 15% of 80'), 'The result is 12.')
+        self.assertEqual(agent.process_command('10 % 3'), 'The result is 1.')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+
+from news_aggregator import normalize_title, normalize_url
+
+
+class NormalizeTest(unittest.TestCase):
+    def test_tracking_parameters_are_dropped(self):
+        self.assertEqual(normalize_url('https://www.example.com/story/?utm_source=x&UTM_Medium=y&id=7&ref=home#top'),
+                         'example.com/story?id=7')
+        self.assertEqual(normalize_url('http://example.com/a?fbclid=1&gclid=2&cmpid=3'), 'example.com/a')
+
+    def test_parameters_that_only_start_like_tracking_ones_are_kept(self):
+        self.assertEqual(normalize_url('https://example.com/feed?refresh=1&reference=abc&referrer=x'),
+                         'example.com/feed?refresh=1&reference=abc&referrer=x')
+
+    def test_titles_lose_publisher_suffix_and_punctuation(self):
+        self.assertEqual(normalize_title('Markets Rally Again! - Example News'), 'markets rally again')
+
+
+if __name__ == '__main__':
+    unittest.main()
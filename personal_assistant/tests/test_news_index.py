@@ -0,0 +1,82 @@
+import random
+import unittest
+from unittest import mock
+
+import news_index
+from news_index import NewsIndex, tokens
+
+
+def article(title, description='', content='', published='2024-01-01T00:00:00Z'):
+    return {'title': title, 'description': description, 'url': f'https://example.com/{title}', 'source': 'Test',
+            'publishedAt': published, 'content': content}
+
+
+def titles(results):
+    return [result['title'] for result in results]
+
+
+class NewsIndexTest(unittest.TestCase):
+    def test_tokens(self):
+        self.assertEqual(tokens('Show me the latest Robots and Chess news stories'),
+                         ['latest', 'robot', 'chess', 'news', 'stories'])
+        self.assertEqual(tokens(None), [])
+
+    def test_title_words_outweigh_body_words(self):
+        index = NewsIndex([
+            article('Markets rally', 'Quantum computing stocks climb'),
+            article('Quantum computing breakthrough', 'Researchers report results'),
+            article('Weather today', 'Sunny'),
+        ])
+        self.assertEqual(titles(index.search('quantum computing')),
+                         ['Quantum computing breakthrough', 'Markets rally'])
+        self.assertEqual(index.search('volcano'), [])
+
+    def test_rare_words_outweigh_common_ones(self):
+        articles = [article(f'Election update {n}') for n in range(5)] + [article('Election fraud claims')]
+        index = NewsIndex(articles)
+        self.assertEqual(titles(index.search('election fraud', 1)), ['Election fraud claims'])
+
+    def test_ties_go_to_the_newer_article(self):
+        index = NewsIndex([
+            article('Solar power', published='2024-01-01T00:00:00Z'),
+            article('Solar power', published='2024-03-01T00:00:00Z'),
+        ])
+        self.assertEqual([result['publishedAt'] for result in index.search('solar')],
+                         ['2024-03-01T00:00:00Z', '2024-01-01T00:00:00Z'])
+
+    def test_freshness_words_do_not_filter(self):
+        index = NewsIndex([
+            article('Old robot story', published='2023-01-01T00:00:00Z'),
+            article('New garden story', published='2024-06-01T00:00:00Z'),
+        ])
+        self.assertEqual(titles(index.search('latest news', 1)), ['New garden story'])
+        self.assertEqual(titles(index.search('latest robot news')), ['Old robot story'])
+
+    def test_early_stop_matches_exhaustive_ranking(self):
+        rng = random.Random(7)
+        vocabulary = [f'word{n}' for n in range(40)]
+        articles = [article(' '.join(rng.choices(vocabulary, k=3)), ' '.join(rng.choices(vocabulary, k=20)),
+                            published=f'2024-01-01T00:00:{n % 60:02d}Z') for n in range(400)]
+        index = NewsIndex(articles)
+
+        def exhaustive(query, num_results):
+            words = set(tokens(query))
+            scored = [(sum(weights.get(word, 0) for word in words), -index._recency_rank[doc], doc)
+                      for doc, weights in enumerate(index._weights) if words & set(weights)]
+            return [index.articles[doc] for _, _, doc in sorted(scored, reverse=True)[:num_results]]
+
+        with mock.patch.object(news_index, 'MAX_DEPTH', len(articles)):
+            for _ in range(50):
+                query = ' '.join(rng.sample(vocabulary, rng.randint(1, 3)))
+                self.assertEqual(index.search(query, 5), exhaustive(query, 5), query)
+
+    def test_loads_the_fixture(self):
+        index = NewsIndex.load()
+        self.assertGreater(len(index), 0)
+        results = index.search(index.articles[0]['title'], 3)
+        self.assertIn(index.articles[0]['url'], [result['url'] for result in results])
+        self.assertTrue(all(result['offline'] for result in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
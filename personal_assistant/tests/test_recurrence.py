@@ -0,0 +1,60 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import recurrence
+from reminder_store import ReminderStore
+
+MONTHLY = 'FREQ=MONTHLY;INTERVAL=1;BYHOUR=9;BYMINUTE=0'
+
+
+class RecurrenceTest(unittest.TestCase):
+    def test_rule_round_trip(self):
+        for text in ('FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH;BYHOUR=8;BYMINUTE=30', 'FREQ=HOURLY;INTERVAL=3',
+                     MONTHLY + ';BYMONTHDAY=31'):
+            with self.subTest(text=text):
+                self.assertEqual(recurrence.format_rule(recurrence.parse_rule(text)), text)
+
+    def test_weekly_on_several_days(self):
+        after = datetime.datetime(2030, 1, 7, 9, 0)  # a Monday
+        until = datetime.datetime(2030, 1, 21, 9, 0)
+        self.assertEqual(list(recurrence.occurrences('FREQ=WEEKLY;INTERVAL=1;BYDAY=MO,TH;BYHOUR=9', after, until)),
+                         [datetime.datetime(2030, 1, day, 9, 0) for day in (10, 14, 17, 21)])
+
+    def test_monthly_series_from_the_31st_keeps_its_day(self):
+        first = datetime.datetime(2030, 1, 31, 9, 0)
+        rule = recurrence.anchor(MONTHLY, first)
+        self.assertEqual(rule, MONTHLY + ';BYMONTHDAY=31')
+        expected = [datetime.datetime(2030, month, day, 9, 0) for month, day in ((2, 28), (3, 31), (4, 30), (5, 31))]
+        self.assertEqual(list(recurrence.occurrences(rule, first, datetime.datetime(2030, 6, 1))), expected)
+
+        moment, chain = first, []
+        for _ in expected:  # one occurrence at a time, as the store advances a series
+            moment = recurrence.next_occurrence(rule, moment)
+            chain.append(moment)
+        self.assertEqual(chain, expected)
+
+    def test_claiming_a_monthly_series_through_february(self):
+        directory = tempfile.mkdtemp(prefix='recurrence-')
+        self.addCleanup(shutil.rmtree, directory, True)
+        store = ReminderStore(os.path.join(directory, 'reminders.db'))
+        self.addCleanup(store.close)
+        first = datetime.datetime(2030, 1, 31, 9, 0)
+        reminder_id = store.add('pay rent', first, recurrence.anchor(MONTHLY, first))
+
+        for now in (first, datetime.datetime(2030, 2, 28, 9, 0)):
+            self.assertEqual(store.claim_due(now), ['pay rent'])
+        rows, _ = store.pending_page()
+        self.assertEqual([(row[0], row[2]) for row in rows], [(reminder_id, datetime.datetime(2030, 3, 31, 9, 0))])
+
+    def test_anchor_leaves_other_rules_alone(self):
+        first = datetime.datetime(2030, 1, 31, 9, 0)
+        self.assertEqual(recurrence.anchor('FREQ=DAILY;INTERVAL=1;BYHOUR=9;BYMINUTE=0', first),
+                         'FREQ=DAILY;INTERVAL=1;BYHOUR=9;BYMINUTE=0')
+        self.assertEqual(recurrence.anchor(MONTHLY + ';BYMONTHDAY=15', first), MONTHLY + ';BYMONTHDAY=15')
+
+
+if __name__ == '__main__':
+    unittest.main()
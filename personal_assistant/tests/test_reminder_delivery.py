@@ -0,0 +1,48 @@
+import datetime
+import unittest
+from unittest import mock
+
+from support import agent
+
+
+class PushedReminderTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(agent.reminder_scheduler, 'callback', agent.publish_reminder)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        agent.reminder_scheduler.drain()
+
+    def fall_due(self, text):
+        agent.reminder_repository.add(text, datetime.datetime.now() - datetime.timedelta(minutes=1))
+        self.assertEqual([reminder.text for reminder in agent.reminder_scheduler.run_pending()], [text])
+
+    def test_reminder_due_with_no_client_is_kept_for_show_reminders(self):
+        self.fall_due('water the plants')
+        self.assertIn('water the plants', agent.process_command('show reminders'))
+        self.assertEqual(agent.get_due_reminders(), [])
+
+    def test_reminder_due_with_no_client_is_replayed_to_the_next_subscriber(self):
+        self.fall_due('call the bank')
+        subscription = agent.notifications.subscribe()
+        try:
+            agent.replay_undelivered_reminders()
+            message = subscription.queue.get_nowait()
+        finally:
+            subscription.close()
+        self.assertIn('event: reminder', message)
+        self.assertIn('call the bank', message)
+        self.assertEqual(agent.get_due_reminders(), [])
+
+    def test_reminder_due_with_a_client_is_pushed(self):
+        subscription = agent.notifications.subscribe()
+        try:
+            self.fall_due('stand up')
+            message = subscription.queue.get_nowait()
+        finally:
+            subscription.close()
+        self.assertIn('stand up', message)
+        self.assertEqual(agent.reminder_scheduler.drain(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import datetime
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from reminder_repository import ReminderRepository
+from reminder_store import ReminderStore
+
+NOON = datetime.datetime(2030, 1, 7, 12, 0)
+
+
+class ReminderRepositoryTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp(prefix='reminders-')
+        self.addCleanup(shutil.rmtree, directory, True)
+        self.store = ReminderStore(os.path.join(directory, 'reminders.db'))
+        self.repository = ReminderRepository(self.store)
+
+    def in_thread(self, func, *args):
+        """Run func on another thread; fail instead of hanging if it never returns"""
+        outcome = {}
+
+        def run():
+            try:
+                outcome['value'] = func(*args)
+            except Exception as e:
+                outcome['error'] = e
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(5)
+        self.assertFalse(thread.is_alive(), 'write never completed')
+        return outcome
+
+    def test_writes_are_cached_and_persisted(self):
+        first = self.repository.add('stand up', NOON + datetime.timedelta(hours=1))
+        second = self.repository.add('lunch', NOON)
+        self.assertEqual([reminder.text for reminder in self.repository.list()], ['lunch', 'stand up'])
+        self.repository.complete(second.id)
+        self.assertEqual(self.repository.list(), [first])
+        self.assertEqual([row[1] for row in self.store.iter_pending()], ['stand up'])
+
+    def test_failed_cache_apply_does_not_stop_the_writer(self):
+        with mock.patch.object(self.repository, '_cache_add', side_effect=RuntimeError('boom')):
+            outcome = self.in_thread(self.repository.add, 'first', NOON)
+        self.assertIsInstance(outcome.get('error'), RuntimeError)
+
+        outcome = self.in_thread(self.repository.add, 'second', NOON + datetime.timedelta(minutes=5))
+        self.assertEqual(outcome['value'].text, 'second')
+        # The first write was committed; the cache is rebuilt to include it
+        self.assertEqual([reminder.text for reminder in self.repository.list()], ['first', 'second'])
+
+    def test_claim_due_rows(self):
+        self.repository.add('later', NOON + datetime.timedelta(hours=2))
+        self.repository.add('now', NOON - datetime.timedelta(minutes=1))
+        self.assertEqual([reminder.text for reminder in self.repository.claim_due_rows(NOON)], ['now'])
+        self.assertEqual(self.repository.claim_due_rows(NOON), [])
+        self.assertEqual([reminder.text for reminder in self.repository.list()], ['later'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import datetime
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from reminder_repository import ReminderRepository
+from reminder_scheduler import FakeClock, ReminderScheduler
+from reminder_store import ReminderStore
+
+START = datetime.datetime(2030, 1, 7, 9, 0)
+
+
+class RecordingClock(FakeClock):
+    """FakeClock that remembers how long the scheduler asked to sleep each time"""
+
+    def __init__(self, start):
+        super().__init__(start)
+        self.timeouts = []
+
+    def wait(self, condition, timeout):
+        self.timeouts.append(timeout)
+        super().wait(condition, timeout)
+
+
+class ReminderSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp(prefix='scheduler-')
+        self.addCleanup(shutil.rmtree, directory, True)
+        self.repository = ReminderRepository(ReminderStore(os.path.join(directory, 'reminders.db')))
+        self.clock = RecordingClock(START)
+        self.delivered = []
+        self.scheduler = ReminderScheduler(self.repository, callback=self.delivered.append, clock=self.clock,
+                                           max_sleep=3600)
+
+    def add(self, text, minutes):
+        reminder = self.repository.add(text, START + datetime.timedelta(minutes=minutes))
+        if self.scheduler.running:
+            self.scheduler.schedule(reminder.id, reminder.text, reminder.due_at)
+        return reminder
+
+    def start(self):
+        self.scheduler.start()
+        self.addCleanup(self.scheduler.stop)
+        self.settle(0)
+
+    def settle(self, waits):
+        """Wait (in real time) until the scheduler thread has gone back to sleep after `waits` sleeps"""
+        deadline = time.monotonic() + 5
+        while not (len(self.clock.timeouts) > waits and self.clock.sleepers == 1):
+            self.assertLess(time.monotonic(), deadline, 'scheduler never went back to sleep')
+            time.sleep(0.001)
+
+    def advance(self, minutes):
+        waits = len(self.clock.timeouts)
+        self.clock.advance(minutes=minutes)
+        self.settle(waits)
+
+    def texts(self):
+        return [reminder.text for reminder in self.delivered]
+
+    def test_reminders_fire_once_in_due_order(self):
+        self.add('third', 30)
+        self.add('first', 10)
+        self.add('second', 20)
+        self.start()
+        self.assertEqual(self.clock.timeouts[-1], 600)  # sleeping until 'first'
+
+        self.advance(10)
+        self.assertEqual(self.texts(), ['first'])
+        self.advance(25)
+        self.assertEqual(self.texts(), ['first', 'second', 'third'])
+        self.advance(60)
+        self.assertEqual(self.texts(), ['first', 'second', 'third'])
+        self.assertEqual(self.repository.count(), 0)
+
+    def test_earlier_reminder_added_while_sleeping_wakes_the_scheduler(self):
+        self.add('later', 60)
+        self.start()
+        self.assertEqual(self.clock.timeouts[-1], 3600)
+
+        waits = len(self.clock.timeouts)
+        self.add('sooner', 5)
+        self.settle(waits)
+        self.assertEqual(self.clock.timeouts[-1], 300)  # re-armed for the new reminder
+
+        self.advance(5)
+        self.assertEqual(self.texts(), ['sooner'])
+        self.advance(55)
+        self.assertEqual(self.texts(), ['sooner', 'later'])
+
+    def test_later_reminder_does_not_wake_the_scheduler(self):
+        self.add('soon', 5)
+        self.start()
+        waits = len(self.clock.timeouts)
+        self.add('much later', 120)
+        time.sleep(0.05)
+        self.assertEqual(len(self.clock.timeouts), waits)
+
+    def test_run_pending_without_the_thread(self):
+        self.add('stand up', 5)
+        self.scheduler.load()
+        self.assertEqual(self.scheduler.run_pending(), [])
+        self.clock.advance(minutes=5)
+        self.assertEqual([reminder.text for reminder in self.scheduler.run_pending()], ['stand up'])
+        self.assertEqual(self.scheduler.run_pending(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import datetime
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import reminder_store
+from reminder_store import MIGRATIONS, ReminderStore
+
+NOON = datetime.datetime(2030, 1, 7, 12, 0)
+
+# The reminders table as the first release created it, before migrations existed
+LEGACY_SCHEMA = '''
+CREATE TABLE reminders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    reminder_text TEXT NOT NULL,
+    reminder_time DATETIME NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    is_completed BOOLEAN DEFAULT 0
+)
+'''
+
+
+class ReminderStoreTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp(prefix='reminder-store-')
+        self.addCleanup(shutil.rmtree, directory, True)
+        self.path = os.path.join(directory, 'reminders.db')
+
+    def open(self):
+        store = ReminderStore(self.path)
+        self.addCleanup(store.close)
+        return store
+
+    def test_legacy_database_is_migrated_in_place(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute(LEGACY_SCHEMA)
+        conn.execute('INSERT INTO reminders (reminder_text, reminder_time) VALUES (?, ?)', ('old', NOON.isoformat()))
+        conn.commit()
+        conn.close()
+
+        store = self.open()
+        conn = store.connect()
+        self.addCleanup(conn.close)
+        self.assertEqual(conn.execute('PRAGMA user_version').fetchone()[0], len(MIGRATIONS))
+        self.assertIn('recurrence', [row[1] for row in conn.execute('PRAGMA table_info(reminders)')])
+        self.assertIn('idx_reminders_pending', [row[1] for row in conn.execute('PRAGMA index_list(reminders)')])
+        self.assertEqual(store.pending_page()[0], [(1, 'old', NOON, None)])
+
+        store.migrate()  # already current: a no-op
+        self.open().add('new', NOON, 'FREQ=DAILY;INTERVAL=1')
+        self.assertEqual([row[1] for row in store.pending_page()[0]], ['old', 'new'])
+
+    def test_pending_pages_follow_due_order(self):
+        store = self.open()
+        times = [NOON + datetime.timedelta(minutes=minutes) for minutes in (30, 0, 10, 10, 10, 5, 20)]
+        ids = [store.add(f'r{index}', when) for index, when in enumerate(times)]
+        store.claim_due(NOON)  # completes r1, which must not show up
+        expected = sorted((when, reminder_id) for reminder_id, when in zip(ids, times) if when > NOON)
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            rows, cursor = store.pending_page(limit=2, after=cursor)
+            pages += 1
+            self.assertLessEqual(len(rows), 2)
+            seen.extend((when, reminder_id) for reminder_id, _, when, _ in rows)
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)  # ties on reminder_time are ordered by id, none skipped or repeated
+        self.assertEqual(pages, 4)  # 6 rows: three full pages, then an empty last one
+        self.assertEqual([(row[2], row[0]) for row in store.iter_pending(page_size=4)], expected)
+
+    def test_claim_without_returning(self):
+        store = self.open()
+        store.add('once', NOON)
+        reminder_id = store.add('daily', NOON, 'FREQ=DAILY;INTERVAL=1;BYHOUR=12;BYMINUTE=0')
+        with mock.patch.object(reminder_store, 'HAS_RETURNING', False):
+            self.assertEqual(store.claim_due(NOON), ['once', 'daily'])
+        self.assertEqual(store.pending_page()[0],
+                         [(reminder_id, 'daily', NOON + datetime.timedelta(days=1),
+                           'FREQ=DAILY;INTERVAL=1;BYHOUR=12;BYMINUTE=0')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import result_cache
+from result_cache import MemoryBackend, ResultCache, SQLiteBackend
+
+
+class FakeTime:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Counter:
+    """compute() stand-in returning 'v1', 'v2', ... and counting its calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f'v{self.calls}'
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.time = FakeTime()
+        self.compute = Counter()
+
+    def wait_until(self, condition):
+        deadline = time.monotonic() + 5
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, 'condition never became true')
+            time.sleep(0.001)
+
+    def test_entries_expire_after_the_ttl(self):
+        cache = ResultCache(ttl=10, stale_ttl=0, clock=self.time)
+        self.assertEqual(cache.get('k', self.compute), 'v1')
+        self.time.now += 10
+        self.assertEqual(cache.get('k', self.compute), 'v1')
+        self.time.now += 1
+        self.assertEqual(cache.get('k', self.compute), 'v2')
+        self.assertEqual(self.compute.calls, 2)
+        self.assertEqual((cache.stats()['hits'], cache.stats()['misses']), (1, 2))
+
+    def test_should_cache_can_veto_a_value(self):
+        cache = ResultCache(clock=self.time)
+        cache.get('k', lambda: None, should_cache=lambda value: value is not None)
+        self.assertEqual(cache.get('k', self.compute), 'v1')
+
+    def test_concurrent_misses_share_one_computation(self):
+        cache = ResultCache(clock=self.time)
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            release.wait(5)
+            return 'shared'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get('k', slow))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        self.wait_until(lambda: cache.stats()['coalesced'] == 4)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, ['shared'] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_stale_value_is_served_while_it_is_refreshed(self):
+        cache = ResultCache(ttl=10, stale_ttl=100, clock=self.time)
+        cache.get('k', self.compute)
+        self.time.now += 50
+        self.assertEqual(cache.get('k', self.compute), 'v1')  # stale, refreshed in the background
+        self.wait_until(lambda: cache.backend.get('k')[0] == 'v2')
+        self.assertEqual(cache.get('k', self.compute), 'v2')
+        self.assertEqual(self.compute.calls, 2)
+        stats = cache.stats()
+        self.assertEqual((stats['stale_hits'], stats['refreshes'], stats['hits']), (1, 1, 1))
+
+        self.time.now += 200  # past ttl + stale_ttl: computed in the foreground
+        self.assertEqual(cache.get('k', self.compute), 'v3')
+
+
+class BackendTest(unittest.TestCase):
+    def sqlite_backend(self, **options):
+        directory = tempfile.mkdtemp(prefix='result-cache-')
+        self.addCleanup(shutil.rmtree, directory, True)
+        return SQLiteBackend(os.path.join(directory, 'cache.db'), **options)
+
+    def assert_lru_eviction(self, backend):
+        backend.set('a', 1, 0)
+        backend.set('b', 2, 0)
+        backend.get('a')
+        backend.set('c', 3, 0)
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual((backend.get('a'), backend.get('c')), ((1, 0), (3, 0)))
+        self.assertEqual(backend.stats()['evictions'], 1)
+
+    def test_memory_backend_evicts_least_recently_used(self):
+        self.assert_lru_eviction(MemoryBackend(max_entries=2))
+        backend = MemoryBackend(max_bytes=10)
+        backend.set('a', 'x' * 5, 0)
+        backend.set('b', 'y' * 5, 0)
+        self.assertEqual(backend.stats()['entries'], 1)
+
+    def test_sqlite_backend_evicts_least_recently_used(self):
+        with mock.patch.object(result_cache.time, 'time', side_effect=itertools.count(1000)):
+            self.assert_lru_eviction(self.sqlite_backend(max_entries=2, touch_interval=0))
+
+    def test_sqlite_hits_touch_at_most_once_per_interval(self):
+        backend = self.sqlite_backend(touch_interval=60)
+
+        def accessed_at():
+            return backend._conn().execute('SELECT accessed_at FROM cache_entries WHERE key = ?', ('k',)).fetchone()[0]
+
+        with mock.patch.object(result_cache.time, 'time', return_value=1000.0):
+            backend.set('k', 'value', 1000.0)
+        with mock.patch.object(result_cache.time, 'time', return_value=1030.0):
+            self.assertEqual(backend.get('k'), ('value', 1000.0))
+        self.assertEqual(accessed_at(), 1000.0)
+        with mock.patch.object(result_cache.time, 'time', return_value=1061.0):
+            backend.get('k')
+        self.assertEqual(accessed_at(), 1061.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import datetime
+import unittest
+
+import time_parser
+
+MONDAY_EVENING = datetime.datetime(2030, 1, 7, 20, 20)  # a Monday
+
+
+class TimeParserTest(unittest.TestCase):
+    def parse(self, phrase, now=MONDAY_EVENING):
+        return time_parser.parse(phrase, now)
+
+    def test_relative_and_clock_times(self):
+        self.assertEqual(self.parse('in 1h30m'), MONDAY_EVENING + datetime.timedelta(hours=1, minutes=30))
+        self.assertEqual(self.parse('tomorrow at 9am'), datetime.datetime(2030, 1, 8, 9, 0))
+        self.assertEqual(self.parse('at 21:15'), datetime.datetime(2030, 1, 7, 21, 15))
+        self.assertEqual(self.parse('at 8 pm'), datetime.datetime(2030, 1, 8, 20, 0))
+
+    def test_past_times_today_roll_to_tomorrow(self):
+        self.assertEqual(self.parse('tonight'), datetime.datetime(2030, 1, 8, 20, 0))
+        self.assertEqual(self.parse('tonight', MONDAY_EVENING.replace(hour=19)), datetime.datetime(2030, 1, 7, 20, 0))
+        self.assertEqual(self.parse('at 5 PM today'), datetime.datetime(2030, 1, 8, 17, 0))
+        self.assertEqual(self.parse('at 11 PM today'), datetime.datetime(2030, 1, 7, 23, 0))
+        for phrase in ('tonight', 'at 5 PM today', 'today at 8pm', 'this evening', 'at noon'):
+            with self.subTest(phrase=phrase):
+                self.assertGreater(self.parse(phrase), MONDAY_EVENING)
+
+    def test_weekdays(self):
+        self.assertEqual(self.parse('saturday'), datetime.datetime(2030, 1, 12, 9, 0))
+        self.assertEqual(self.parse('on sat at 10am'), datetime.datetime(2030, 1, 12, 10, 0))
+        self.assertEqual(self.parse('next mon'), datetime.datetime(2030, 1, 14, 9, 0))
+        self.assertEqual(time_parser.rule_string(time_parser.compile_phrase('every mon and thursday at 8am')),
+                         'FREQ=WEEKLY;INTERVAL=1;BYDAY=MO,TH;BYHOUR=8;BYMINUTE=0')
+
+    def test_short_day_names_need_a_lead_in(self):
+        for command in ('remind me to charge the sat nav', 'remind me to pack sun cream', 'remind me mon ami'):
+            with self.subTest(command=command):
+                self.assertIsNone(time_parser.find(command))
+                self.assertIsNone(time_parser.compile_phrase(command))
+        command = 'remind me to pack sun cream on sat'
+        self.assertEqual(time_parser.find(command), (command.index('on sat'), len(command)))
+
+
+if __name__ == '__main__':
+    unittest.main()
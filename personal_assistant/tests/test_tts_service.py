@@ -0,0 +1,121 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from tts_service import CANCELLED, DONE, QUEUED, SPEAKING, AudioCache, FakeDriver, TTSService
+
+
+class TTSServiceTest(unittest.TestCase):
+    def service(self, seconds_per_char=0.0, **kwargs):
+        driver = FakeDriver(seconds_per_char)
+        service = TTSService(lambda: driver, **kwargs)
+        self.addCleanup(service.close)
+        self.addCleanup(service.interrupt)
+        return service, driver
+
+    def wait_for(self, job, status):
+        deadline = time.monotonic() + 5
+        while job.status != status:
+            self.assertLess(time.monotonic(), deadline, f'job never reached {status}')
+            time.sleep(0.001)
+
+    def test_jobs_are_spoken_in_order(self):
+        service, driver = self.service()
+        jobs = [service.submit(text) for text in ('one', 'two', 'three')]
+        self.assertTrue(all(job.wait(5) for job in jobs))
+        self.assertEqual(driver.spoken, ['one', 'two', 'three'])
+        self.assertEqual([job.status for job in jobs], [DONE] * 3)
+
+    def test_cancel_queued_and_speaking_jobs(self):
+        service, driver = self.service(seconds_per_char=1.0)
+        speaking = service.submit('a long sentence')
+        self.wait_for(speaking, SPEAKING)
+        queued = service.submit('never said')
+        self.assertEqual(queued.status, QUEUED)
+
+        self.assertTrue(service.cancel(queued.id))
+        self.assertTrue(service.cancel(speaking.id))
+        self.assertTrue(speaking.wait(5))
+        self.assertEqual((speaking.status, queued.status), (CANCELLED, CANCELLED))
+        self.assertFalse(service.cancel(queued.id))  # already finished
+
+        after = service.submit('after')
+        driver.seconds_per_char = 0.0
+        self.assertTrue(after.wait(5))
+        self.assertEqual(driver.spoken, ['after'])
+        self.assertEqual(service.stats['cancelled'], 2)
+
+    def test_full_queue_rejects_new_jobs(self):
+        service, driver = self.service(seconds_per_char=1.0, max_queue=1)
+        speaking = service.submit('busy speaking')
+        self.wait_for(speaking, SPEAKING)
+        self.assertIsNotNone(service.submit('waiting'))
+        self.assertIsNone(service.submit('one too many'))
+        self.assertEqual(service.stats['rejected'], 1)
+
+    def test_rendered_clip_is_reused(self):
+        directory = tempfile.mkdtemp(prefix='tts-cache-')
+        self.addCleanup(shutil.rmtree, directory, True)
+        service, driver = self.service(audio_cache=AudioCache(directory))
+
+        first = service.submit('good morning', to_file=True)
+        self.assertTrue(first.wait(5))
+        self.assertEqual(first.status, DONE)
+        path = service.clip_path(first.clip)
+        self.assertTrue(path and path.startswith(directory))
+
+        again = service.submit('good morning', to_file=True)
+        self.assertEqual(again.status, DONE)  # finished without being queued
+        self.assertEqual(again.clip, first.clip)
+        slower = service.submit('good morning', rate=150, to_file=True)  # a different clip
+        self.assertTrue(slower.wait(5))
+        self.assertNotEqual(slower.clip, first.clip)
+        self.assertEqual(driver.rendered, ['good morning', 'good morning'])
+        self.assertEqual(driver.spoken, [])
+        self.assertEqual(service.stats['cached'], 1)
+
+
+class AudioCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='audio-cache-')
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def put(self, cache, key, size):
+        path = cache.temp_path()
+        with open(path, 'wb') as clip:
+            clip.write(b'\0' * size)
+        return cache.put(key, path)
+
+    def test_least_recently_used_clips_are_evicted(self):
+        cache = AudioCache(self.directory, max_bytes=300)
+        for key in ('a', 'b', 'c'):
+            self.put(cache, key, 100)
+        self.assertIsNotNone(cache.get('a'))  # 'b' is now the oldest
+        self.put(cache, 'd', 100)
+        self.assertIsNone(cache.get('b'))
+        self.assertFalse(os.path.exists(cache.path('b')))
+        self.assertEqual(sorted(os.listdir(self.directory)), ['a.wav', 'c.wav', 'd.wav'])
+        self.assertEqual((cache.size, cache.stats['evictions']), (300, 1))
+
+        self.put(cache, 'e', 150)  # evicts oldest first until it fits
+        self.assertEqual(sorted(os.listdir(self.directory)), ['d.wav', 'e.wav'])
+        self.put(cache, 'huge', 1000)  # larger than the whole cache: kept on its own
+        self.assertEqual(os.listdir(self.directory), ['huge.wav'])
+
+    def test_recency_survives_a_restart(self):
+        cache = AudioCache(self.directory, max_bytes=300)
+        for index, key in enumerate(('a', 'b', 'c')):
+            self.put(cache, key, 100)
+            os.utime(cache.path(key), (1000 + index, 1000 + index))
+        os.utime(cache.path('a'), (2000, 1000))  # read most recently
+
+        reopened = AudioCache(self.directory, max_bytes=300)
+        self.assertEqual(reopened.size, 300)
+        self.put(reopened, 'd', 100)
+        self.assertEqual(sorted(os.listdir(self.directory)), ['a.wav', 'c.wav', 'd.wav'])
+
+
+if __name__ == '__main__':
+    unittest.main()
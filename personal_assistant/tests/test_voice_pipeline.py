@@ -0,0 +1,186 @@
+import io
+import time
+import unittest
+import wave
+from array import array
+from unittest import mock
+
+import voice_pipeline
+from voice_pipeline import EnergyVAD, VoicePipeline
+
+CHUNK = 3200  # 0.1 s
+
+
+def tone(seconds, amplitude=3000):
+    """Square wave loud enough for the VAD and the fake recognizer"""
+    samples = int(seconds * voice_pipeline.SAMPLE_RATE)
+    return array('h', [amplitude if (i // 20) % 2 else -amplitude for i in range(samples)]).tobytes()
+
+
+def silence(seconds):
+    return bytes(int(seconds * voice_pipeline.SAMPLE_RATE) * voice_pipeline.SAMPLE_WIDTH)
+
+
+def chunks(pcm):
+    return [pcm[start:start + CHUNK] for start in range(0, len(pcm), CHUNK)]
+
+
+def wav(pcm, rate):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+        out.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class DecodeTest(unittest.TestCase):
+    def test_wav_is_decoded_in_memory_and_resampled(self):
+        pcm = voice_pipeline.decode_audio(wav(tone(0.5)[:8000], 8000))
+        self.assertAlmostEqual(voice_pipeline.duration(pcm), 0.5, places=2)
+
+    def test_bad_uploads(self):
+        with self.assertRaises(voice_pipeline.VoiceError):
+            voice_pipeline.decode_audio(b'')
+        with mock.patch.object(voice_pipeline.subprocess, 'run', side_effect=FileNotFoundError):
+            with self.assertRaisesRegex(voice_pipeline.VoiceError, 'install ffmpeg'):
+                voice_pipeline.decode_audio(b'\x1aE\xdf\xa3webm')
+
+
+class ProcessPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.pipeline = VoicePipeline(lambda transcript: f'you said {transcript}', backend='fake', max_workers=2,
+                                      max_pending=1)
+        self.addCleanup(self.pipeline.close)
+
+    def wait_for(self, job):
+        deadline = time.monotonic() + 30
+        while job.status not in (voice_pipeline.DONE, voice_pipeline.FAILED):
+            self.assertLess(time.monotonic(), deadline, 'voice job never finished')
+            time.sleep(0.01)
+        return job
+
+    def test_transcribe_in_a_worker_process(self):
+        self.assertEqual(self.pipeline.transcribe_and_respond(wav(tone(0.5), 16000)),
+                         ('what time is it', 'you said what time is it'))
+        self.assertEqual(self.pipeline.transcribe_pcm(silence(0.5)), '')
+        self.assertEqual(self.pipeline.respond(''), "I didn't catch that. Could you please repeat?")
+        self.assertEqual(self.pipeline.stats['transcribed'], 2)
+        self.assertAlmostEqual(self.pipeline.stats['audio_seconds'], 1.0)
+        self.assertEqual(self.pipeline._load, [0, 0])
+
+    def test_calls_go_to_the_least_loaded_worker(self):
+        first = self.pipeline._reserve()
+        second = self.pipeline._reserve()
+        self.assertNotEqual(first, second)
+        self.pipeline._release(first)
+        self.assertEqual(self.pipeline._reserve(), first)
+
+    def test_submitted_job_is_answered_in_the_background(self):
+        job = self.pipeline.submit(tone(0.5))
+        self.assertIs(self.pipeline.get(job.id), job)
+        self.assertIsNone(self.pipeline.submit(tone(0.5)))  # max_pending reached
+        self.assertEqual(self.pipeline.stats['rejected'], 1)
+        self.wait_for(job)
+        self.assertEqual(job.to_dict(), {'job_id': job.id, 'status': voice_pipeline.DONE,
+                                         'transcript': 'what time is it', 'response': 'you said what time is it',
+                                         'error': None})
+        self.assertIsNotNone(self.pipeline.submit(tone(0.5)))
+
+    def test_recognizer_load_error_fails_the_job(self):
+        pipeline = VoicePipeline(None, backend='nonexistent', max_workers=1)
+        self.addCleanup(pipeline.close)
+        job = self.wait_for(pipeline.submit(tone(0.5)))
+        self.assertEqual(job.status, voice_pipeline.FAILED)
+        self.assertIn('Unknown speech recognizer', job.error)
+
+
+class EnergyVADTest(unittest.TestCase):
+    def test_speech_start_and_end(self):
+        vad = EnergyVAD(end_silence=0.3)
+        self.assertEqual(vad.feed(silence(0.6)), [])
+        self.assertEqual(vad.feed(tone(0.9)), [('speech_start', 0.6)])
+        self.assertFalse(vad.ended)
+        events = vad.feed(silence(0.6))
+        self.assertEqual([kind for kind, _ in events], ['speech_end'])
+        self.assertAlmostEqual(events[0][1], 1.5)
+        self.assertTrue(vad.ended)
+        self.assertEqual(vad.feed(tone(0.5)), [])
+
+    def test_steady_background_noise_is_not_speech(self):
+        vad = EnergyVAD()
+        self.assertEqual(vad.feed(tone(1.0, amplitude=250)), [])
+        self.assertEqual(vad.feed(tone(2.0, amplitude=700)), [])  # above min_energy, below 3x the noise floor
+        self.assertEqual(vad.feed(tone(0.3, amplitude=8000))[0][0], 'speech_start')
+
+    def test_frames_split_across_chunks(self):
+        vad = EnergyVAD()
+        events = []
+        for piece in chunks(silence(0.3) + tone(0.3)):
+            for start in range(0, len(piece), 100):
+                events += vad.feed(piece[start:start + 100])
+        self.assertEqual(events, [('speech_start', 0.3)])
+
+
+class VoiceStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.pipeline = VoicePipeline(lambda transcript: f'you said {transcript}', backend='fake', max_workers=1,
+                                      end_silence=0.3)
+        self.addCleanup(self.pipeline.close)
+
+    def feed_all(self, stream, pcm):
+        events = []
+        for chunk in chunks(pcm):
+            events += stream.feed(chunk)
+            if stream.done:
+                break
+        return events
+
+    def test_final_event_arrives_before_the_upload_ends(self):
+        stream = self.pipeline.stream()
+        events = self.feed_all(stream, silence(0.3) + tone(1.0) + silence(2.0))
+        kinds = [event['event'] for event in events]
+        self.assertEqual(kinds[0], 'speech_start')
+        self.assertIn('partial', kinds)
+        self.assertEqual(kinds[-2:], ['speech_end', 'final'])
+        self.assertEqual(events[-1], {'event': 'final', 'transcript': 'what time is it',
+                                      'response': 'you said what time is it'})
+        self.assertLess(stream.received, len(silence(0.3) + tone(1.0) + silence(2.0)))
+        self.assertEqual(stream.feed(tone(0.1)), [])
+        self.assertEqual(self.pipeline._load, [0])
+
+    def test_partials_grow_with_the_audio(self):
+        stream = self.pipeline.stream()
+        partials = [event['text'] for event in self.feed_all(stream, tone(0.6)) if event['event'] == 'partial']
+        self.assertEqual(partials, ['what', 'what time'])
+
+    def test_wav_header_is_stripped_and_finish_ends_an_unfinished_stream(self):
+        header = (b'RIFF\xff\xff\xff\xffWAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00'
+                  + (16000).to_bytes(4, 'little') + (32000).to_bytes(4, 'little')
+                  + b'\x02\x00\x10\x00data\xff\xff\xff\xff')
+        stream = self.pipeline.stream()
+        stream.feed(header + tone(0.5)[:-1])
+        stream.feed(tone(0.5)[-1:])
+        self.assertEqual(stream.received, len(tone(0.5)))
+        self.assertEqual(stream.finish()[0]['transcript'], 'what time is it')
+        self.assertEqual(stream.finish(), [])
+
+    def test_closing_an_abandoned_stream_frees_its_worker(self):
+        stream = self.pipeline.stream()
+        stream.feed(tone(0.3))
+        self.assertEqual(self.pipeline._load, [1])
+        stream.close()
+        self.assertEqual(self.pipeline._load, [0])
+        self.assertEqual(self.pipeline.stream().finish()[0]['transcript'], '')
+
+    def test_unavailable_recognizer(self):
+        pipeline = VoicePipeline(None, backend='nonexistent', max_workers=1)
+        self.addCleanup(pipeline.close)
+        with self.assertRaises(voice_pipeline.VoiceError):
+            pipeline.stream()
+        self.assertEqual(pipeline._load, [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from unittest import mock
+
+import weather_service
+from weather_service import NOT_FOUND_TTL, FakeOWM, WeatherService
+
+
+class FakeTime:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class WeatherServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.owm = FakeOWM()
+        self.time = FakeTime()
+        self.service = WeatherService(self.owm, ttl=600, clock=self.time)
+
+    def test_geocoding_is_memoized(self):
+        london = self.service.weather('London')
+        self.assertEqual((london['id'], london['name']), (2643743, 'London'))
+        self.assertEqual(self.service.weather('  london '), london)
+        self.assertEqual(self.service.location_id('LONDON'), 2643743)
+        self.assertEqual(self.owm.calls['weather_at_place'], 1)
+        self.assertEqual(self.service.stats['upstream_calls'], 1)
+
+    def test_observations_expire_after_the_ttl(self):
+        self.service.weather('Paris')
+        self.time.now += 599
+        self.service.weather('Paris')
+        self.assertEqual(self.service.stats['upstream_calls'], 1)
+
+        self.time.now += 2
+        self.service.weather('Paris')
+        self.assertEqual(self.owm.calls, {'weather_at_place': 1, 'weather_at_id': 1, 'weather_at_ids': 0})
+        self.assertEqual(self.service.stats['upstream_calls'], 2)
+
+    def test_stale_locations_are_fetched_in_groups(self):
+        cities = ['London', 'Paris', 'Tokyo', 'Berlin', 'Sydney']
+        self.service.weather_for(cities)
+        self.assertEqual(self.owm.calls['weather_at_place'], 5)
+
+        self.service.weather_for(cities)  # all fresh
+        self.assertEqual(self.service.stats['upstream_calls'], 5)
+
+        self.time.now += 601
+        with mock.patch.object(weather_service, 'GROUP_SIZE', 2):
+            results = self.service.weather_for(cities + ['paris', 'Atlantis'])
+        self.assertEqual(results['paris'], results['Paris'])
+        self.assertEqual(results['Tokyo']['name'], 'Tokyo')
+        self.assertIsNone(results['Atlantis'])
+        self.assertEqual(self.owm.calls['weather_at_ids'], 3)  # 5 stale ids, 2 per request
+        self.assertEqual(self.owm.calls['weather_at_id'], 0)
+
+    def test_unknown_names_are_negatively_cached(self):
+        self.assertIsNone(self.service.weather('Atlantis'))
+        self.assertIsNone(self.service.weather('atlantis'))
+        self.assertIsNone(self.service.weather_for(['Atlantis'])['Atlantis'])
+        self.assertEqual(self.service.stats['upstream_calls'], 1)
+
+        self.time.now += NOT_FOUND_TTL + 1
+        self.assertIsNone(self.service.weather('Atlantis'))
+        self.assertEqual(self.service.stats['upstream_calls'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
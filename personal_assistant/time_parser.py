@@ -0,0 +1,293 @@
+"""
+Natural-language time expressions for reminders.
+
+A phrase is parsed in two steps:
+
+* compile_phrase() turns the normalized phrase into a TimeSpec - what the
+  phrase *says* ("in 90 minutes", "next friday at 17:00", "every weekday at
+  9:00"). This is the expensive step: one pass of a precompiled grammar. It
+  depends only on the text, so it is memoized on the normalized phrase.
+* resolve() turns a TimeSpec into a datetime relative to `now`. It is plain
+  arithmetic and is never cached, so "tomorrow" is still right after midnight.
+
+    parse("at 5 PM today")                -> today 17:00 (tomorrow once 17:00 has passed)
+    parse("1h30m")                        -> now + 1:30
+    parse("every weekday at 9am")         -> next weekday 09:00 (rule_string(spec) is the recurrence)
+    parse_many(phrases, now)              -> one datetime (or None) per phrase
+
+find() locates a time expression inside a longer command, so the reminder
+text can be separated from it.
+"""
+
+import datetime
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from recurrence import Rule, format_rule, next_occurrence
+
+# delta: seconds from now. day: ('offset', n) | ('weekday', 0-6, modifier) | ('next_week',) | ('weekend',).
+# rule: (freq, interval, weekdays) for recurring expressions, freq in MINUTELY/HOURLY/DAILY/WEEKLY/MONTHLY.
+TimeSpec = namedtuple('TimeSpec', ['delta', 'day', 'hour', 'minute', 'rule'], defaults=(None,) * 5)
+
+DEFAULT_HOUR = 9  # a day without a time means 9 AM, as "tomorrow" always has
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+WORKING_DAYS = (0, 1, 2, 3, 4)
+
+WORD_NUMBERS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7,
+    'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12, 'fifteen': 15, 'twenty': 20,
+    'thirty': 30, 'forty five': 45, 'half a': 0.5, 'half an': 0.5, 'other': 2,
+}
+
+UNIT_SECONDS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+NAMED_TIMES = {
+    'morning': (9, 0), 'noon': (12, 0), 'midday': (12, 0), 'afternoon': (15, 0),
+    'evening': (18, 0), 'tonight': (20, 0), 'midnight': (0, 0),
+}
+
+# -- grammar (compiled once) -------------------------------------------------
+
+_WEEKDAY = r'(?:mon|tues?|wed(?:nes)?|thu(?:rs?)?|fri|sat(?:ur)?|sun)(?:day)?'
+# Short forms ('sat', 'sun', 'mon') are ordinary words too ("sat nav", "sun cream"), so on their
+# own only full day names count; abbreviations need a lead-in such as "on", "next" or "every"
+_FULL_WEEKDAY = r'(?:mon|tues|wednes|thurs|fri|satur|sun)day'
+_WORD_NUMBER = '|'.join(sorted((re.escape(word) for word in WORD_NUMBERS if word != 'other'), key=len, reverse=True))
+_AMOUNT = rf'(?:\d+(?:\.\d+)?|{_WORD_NUMBER})'
+_LONG_UNIT = r'(?:seconds?|secs?|minutes?|mins?|hours?|hrs?|days?|weeks?)'
+_DURATION_PART = rf'(?:\d+(?:\.\d+)?\s*[smhdw]|{_AMOUNT}\s*{_LONG_UNIT})(?![a-z])'
+_DURATION = rf'{_DURATION_PART}(?:\s*(?:and\s+|,\s*)?{_DURATION_PART})*'
+
+_EXPRESSION_RE = re.compile(
+    rf'\b(?:'
+    rf'(?P<every>every\s+(?:(?P<every_n>\d+|other|{_WORD_NUMBER})\s+)?'
+    rf'(?P<every_unit>minutes?|mins?|hours?|days?|weeks?|months?|weekdays?|weekends?|{_WEEKDAY})(?![a-z]))'
+    rf'|(?P<freq>daily|hourly|weekly|monthly)'
+    rf'|(?P<in>(?:in|after)\s+(?P<in_dur>{_DURATION})(?:\s+(?:from\s+now|later))?)'
+    rf'|(?P<later>(?P<later_dur>{_DURATION})\s+(?:from\s+now|later))'
+    rf'|(?P<day_word>the\s+day\s+after\s+tomorrow|day\s+after\s+tomorrow|today|tomorrow|tmrw)'
+    rf'|(?P<week>(?:next|this)\s+weekend|weekend|next\s+week)'
+    rf'|(?P<clock12>(?:at\s+)?(?P<h12>\d{{1,2}})(?::(?P<m12>\d{{2}}))?\s*(?P<ampm>am|pm)(?![a-z]))'
+    rf'|(?P<clock_at>at\s+(?P<h_at>\d{{1,2}})(?::(?P<m_at>\d{{2}}))?(?![\d:]))'
+    rf'|(?P<clock24>(?P<h24>\d{{1,2}}):(?P<m24>\d{{2}}))'
+    rf'|(?P<named>(?:at\s+|in\s+the\s+|this\s+)?(?P<named_time>noon|midday|midnight|morning|afternoon|evening|tonight))'
+    rf'|(?P<weekday>(?P<weekday_mod>next|this|on|coming)\s+(?P<weekday_name>{_WEEKDAY})|(?P<weekday_full>{_FULL_WEEKDAY}))'
+    rf')(?![a-z])'
+)
+_DURATION_ONLY_RE = re.compile(rf'(?:in\s+)?(?P<dur>{_DURATION})')
+_DURATION_PART_RE = re.compile(rf'(?:(?P<number>\d+(?:\.\d+)?)\s*(?P<short>[smhdw])'
+                               rf'|(?<![a-z])(?P<amount>{_AMOUNT})\s*(?P<unit>{_LONG_UNIT}))(?![a-z])')
+# Only filler may sit between the pieces of one expression ("tomorrow at 9", "monday and friday")
+_JOINER_RE = re.compile(r'[\s,]*(?:(?:and|on|at|from|starting)\s*)?[\s,]*')
+_DOTTED_MERIDIEM_RE = re.compile(r'\b([ap])\.\s?m\.?')
+_SPACES_RE = re.compile(r'\s+')
+_PUNCTUATION = str.maketrans({c: ' ' for c in '!?;"()[]'})
+
+
+@lru_cache(maxsize=4096)
+def normalize(phrase):
+    """Lowercase, 'p.m.' -> 'pm', drop punctuation and collapse whitespace"""
+    phrase = _DOTTED_MERIDIEM_RE.sub(r'\1m', phrase.lower().translate(_PUNCTUATION))
+    return _SPACES_RE.sub(' ', phrase).strip(' .,')
+
+
+def _amount(text):
+    text = _SPACES_RE.sub(' ', text)
+    return WORD_NUMBERS[text] if text in WORD_NUMBERS else float(text)
+
+
+def _duration_parts(text):
+    """[(amount, unit letter)] for a duration such as '1h30m' or 'two hours and 5 minutes'"""
+    return [(float(m.group('number')), m.group('short')) if m.group('number') else
+            (_amount(m.group('amount')), m.group('unit')[0]) for m in _DURATION_PART_RE.finditer(text)]
+
+
+def _weekday_index(name):
+    return next(i for i, day in enumerate(WEEKDAYS) if day.startswith(name[:3]))
+
+
+def _rule(unit, interval):
+    if unit.startswith('min'):
+        return ('MINUTELY', interval, ())
+    if unit.startswith('hour'):
+        return ('HOURLY', interval, ())
+    if unit.startswith('weekday'):
+        return ('WEEKLY', interval, WORKING_DAYS)
+    if unit.startswith('weekend'):
+        return ('WEEKLY', interval, (5, 6))
+    if unit.startswith('week'):
+        return ('WEEKLY', interval, ())
+    if unit.startswith('month'):
+        return ('MONTHLY', interval, ())
+    if unit.startswith('day'):
+        return ('DAILY', interval, ())
+    return ('WEEKLY', interval, (_weekday_index(unit),))
+
+
+@lru_cache(maxsize=4096)
+def _compile(phrase):
+    if not phrase:
+        return None
+    whole = _DURATION_ONLY_RE.fullmatch(phrase)
+    if whole:
+        return TimeSpec(delta=sum(amount * UNIT_SECONDS[unit] for amount, unit in _duration_parts(whole.group('dur'))))
+
+    delta = day = hour = minute = rule = None
+    day_parts = None
+    for match in _EXPRESSION_RE.finditer(phrase):
+        kind = match.lastgroup
+        if kind == 'every':
+            interval = match.group('every_n')
+            rule = _rule(match.group('every_unit'), int(_amount(interval)) if interval else 1)
+        elif kind == 'freq':
+            rule = _rule({'daily': 'day', 'hourly': 'hour', 'weekly': 'week', 'monthly': 'month'}[match.group('freq')], 1)
+        elif kind in ('in', 'later'):
+            parts = _duration_parts(match.group('in_dur') or match.group('later_dur'))
+            delta = sum(amount * UNIT_SECONDS[unit] for amount, unit in parts)
+            day_parts = parts if all(unit in 'dw' for _, unit in parts) else None
+        elif kind == 'day_word':
+            word = match.group('day_word')
+            day = ('offset', 2 if 'after' in word else 0 if word == 'today' else 1)
+        elif kind == 'week':
+            day = ('next_week',) if match.group('week') == 'next week' else ('weekend',)
+        elif kind == 'clock12':
+            hour, minute = int(match.group('h12')), int(match.group('m12') or 0)
+            if match.group('ampm') == 'pm' and hour < 12:
+                hour += 12
+            elif match.group('ampm') == 'am' and hour == 12:
+                hour = 0
+        elif kind == 'clock_at':
+            hour, minute = int(match.group('h_at')), int(match.group('m_at') or 0)
+        elif kind == 'clock24':
+            hour, minute = int(match.group('h24')), int(match.group('m24'))
+        elif kind == 'named':
+            name = match.group('named_time')
+            hour, minute = NAMED_TIMES[name]
+            if name == 'tonight' and day is None:
+                day = ('offset', 0)
+        elif kind == 'weekday':
+            index = _weekday_index(match.group('weekday_name') or match.group('weekday_full'))
+            if rule is not None and rule[0] == 'WEEKLY' and rule[2]:
+                # "every monday and thursday"
+                rule = (rule[0], rule[1], tuple(sorted(set(rule[2]) | {index})))
+            else:
+                day = ('weekday', index, match.group('weekday_mod'))
+
+    if hour is not None and not (0 <= hour < 24 and 0 <= minute < 60):
+        return None
+    if delta is not None and hour is not None and day_parts is not None:
+        # "in 2 days at 5pm": a date from the duration, the time from the clock
+        day, delta = ('offset', int(sum(amount * (7 if unit == 'w' else 1) for amount, unit in day_parts))), None
+    if delta is day is hour is rule is None:
+        return None
+    return TimeSpec(delta, day, hour, minute, rule)
+
+
+def compile_phrase(phrase):
+    """The TimeSpec for a phrase, or None if it contains no time expression (memoized)"""
+    return _compile(normalize(phrase)) if phrase else None
+
+
+def _next_weekday(now, weekdays, hour, minute):
+    """First moment after now on one of the weekdays at hour:minute"""
+    today = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    days = min((weekday - now.weekday()) % 7 or (0 if today > now else 7) for weekday in weekdays)
+    return today + datetime.timedelta(days=days)
+
+
+def resolve(spec, now=None):
+    """The datetime a TimeSpec refers to, relative to now (for recurring specs, the first occurrence)"""
+    if spec is None:
+        return None
+    now = now or datetime.datetime.now()
+    if spec.rule is not None:
+        rule = to_rule(spec)
+        if rule.hour is not None:
+            rule = rule._replace(interval=1)  # "every other week" still starts at the next matching day
+        return next_occurrence(rule, now.replace(second=0, microsecond=0))
+    if spec.delta is not None and spec.day is None and spec.hour is None:
+        return now + datetime.timedelta(seconds=spec.delta)
+
+    hour = DEFAULT_HOUR if spec.hour is None else spec.hour
+    minute = spec.minute or 0
+    today = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if spec.day is None:
+        if spec.delta is not None:
+            return now + datetime.timedelta(seconds=spec.delta)
+        # A bare time that has already passed today means tomorrow
+        return today if today >= now else today + datetime.timedelta(days=1)
+
+    kind = spec.day[0]
+    if kind == 'offset':
+        if spec.day[1] == 0 and today < now:
+            # "tonight" at 20:20, or "at 5 PM today" after five: the next such time is tomorrow
+            return today + datetime.timedelta(days=1)
+        return today + datetime.timedelta(days=spec.day[1])
+    if kind == 'next_week':
+        return today + datetime.timedelta(days=7 - now.weekday())  # Monday of next week
+    if kind == 'weekend':
+        return _next_weekday(now, (5,), hour, minute)
+    weekday, modifier = spec.day[1], spec.day[2]
+    days = (weekday - now.weekday()) % 7
+    if days == 0 and (modifier == 'next' or today < now):
+        days = 7
+    return today + datetime.timedelta(days=days)
+
+
+def to_rule(spec):
+    """The recurrence.Rule of a recurring spec, or None"""
+    if spec is None or spec.rule is None:
+        return None
+    freq, interval, weekdays = spec.rule
+    if freq in ('MINUTELY', 'HOURLY'):
+        return Rule(freq, interval)
+    if freq == 'WEEKLY' and not weekdays and spec.day and spec.day[0] == 'weekday':
+        weekdays = (spec.day[1],)  # "every week on monday"
+    return Rule(freq, interval, weekdays, DEFAULT_HOUR if spec.hour is None else spec.hour, spec.minute or 0)
+
+
+def parse(phrase, now=None):
+    """The datetime a phrase refers to, or None"""
+    return resolve(compile_phrase(phrase), now)
+
+
+def parse_many(phrases, now=None):
+    """parse() for many phrases against a single `now`; repeated phrasings are compiled and resolved once"""
+    now = now or datetime.datetime.now()
+    resolved = {}
+    results = []
+    for phrase in phrases:
+        if phrase not in resolved:
+            resolved[phrase] = resolve(compile_phrase(phrase), now)
+        results.append(resolved[phrase])
+    return results
+
+
+def rule_string(spec):
+    """RRULE-style text for a recurring spec ('FREQ=WEEKLY;INTERVAL=1;BYDAY=MO,TH;BYHOUR=9;BYMINUTE=0')"""
+    rule = to_rule(spec)
+    return format_rule(rule) if rule else None
+
+
+def find(text):
+    """(start, end) of the time expression in a command, or None
+
+    Adjacent pieces joined only by filler ('tomorrow at 9', 'every monday and
+    friday at 8am') count as one expression; the span is the first run of them.
+    """
+    lowered = text.lower()
+    span = None
+    for match in _EXPRESSION_RE.finditer(lowered):
+        if span is None:
+            span = [match.start(), match.end()]
+        elif _JOINER_RE.fullmatch(lowered, span[1], match.start()):
+            span[1] = match.end()
+        else:
+            break
+    return tuple(span) if span else None
+
+
+def cache_info():
+    return _compile.cache_info()
@@ -0,0 +1,360 @@
+"""
+Text-to-speech on a dedicated worker thread.
+
+speak requests are queued as jobs and return immediately with a job id. One
+worker thread owns the speech driver for the life of the process (it is
+built on that thread, which some pyttsx3 backends require) and speaks the
+jobs in order. The queue is bounded: when it is full, submit() returns None
+instead of piling up speech nobody will wait for.
+
+A queued job can be cancelled before it starts; cancelling the job being
+spoken (or interrupt()) stops the driver mid-utterance.
+
+Jobs can also render to a file instead of the speakers (submit(...,
+to_file=True)). Rendered clips go into an AudioCache named by a hash of
+(text, rate, volume, voice_id), so a phrase that was rendered once is served
+from disk from then on: a cache hit returns an already finished job and the
+driver is never involved.
+
+Drivers have say(text, rate, volume, voice_id), render(text, path, rate,
+volume, voice_id) and stop(). Pyttsx3Driver reuses one engine and only
+changes the properties that differ from the last utterance; FakeDriver
+speaks nothing (and renders silence) and is meant for tests and headless
+machines:
+
+    service = TTSService(FakeDriver)
+    job = service.submit('hello')
+    job.wait()  # -> True; service.driver.spoken == ['hello']
+"""
+
+import hashlib
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+import wave
+from collections import OrderedDict
+
+QUEUED, SPEAKING, DONE, CANCELLED, FAILED = 'queued', 'speaking', 'done', 'cancelled', 'failed'
+
+
+class Pyttsx3Driver:
+    """Speaks through one long-lived pyttsx3 engine"""
+
+    def __init__(self, engine=None):
+        if engine is None:
+            import pyttsx3
+            engine = pyttsx3.init()
+        self.engine = engine
+        self.voices = [voice.id for voice in engine.getProperty('voices')]  # enumerated once
+        self._properties = {}
+
+    def _set(self, name, value):
+        if self._properties.get(name) != value:
+            self.engine.setProperty(name, value)
+            self._properties[name] = value
+
+    def _configure(self, rate, volume, voice_id):
+        self._set('rate', rate)
+        self._set('volume', volume)
+        if voice_id is not None and voice_id < len(self.voices):
+            self._set('voice', self.voices[voice_id])
+
+    def say(self, text, rate=200, volume=1.0, voice_id=None):
+        self._configure(rate, volume, voice_id)
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def render(self, text, path, rate=200, volume=1.0, voice_id=None):
+        self._configure(rate, volume, voice_id)
+        self.engine.save_to_file(text, path)
+        self.engine.runAndWait()
+
+    def stop(self):
+        self.engine.stop()
+
+
+class FakeDriver:
+    """Records what it is asked to say; optionally takes `seconds_per_char` to 'speak' it"""
+
+    def __init__(self, seconds_per_char=0.0):
+        self.seconds_per_char = seconds_per_char
+        self.spoken = []
+        self.rendered = []
+        self._stop = threading.Event()
+
+    def say(self, text, rate=200, volume=1.0, voice_id=None):
+        self._stop.clear()
+        self._stop.wait(len(text) * self.seconds_per_char)
+        if not self._stop.is_set():
+            self.spoken.append(text)
+
+    def render(self, text, path, rate=200, volume=1.0, voice_id=None):
+        """Write a silent 8 kHz WAV as long as the text would take to say at `rate` words per minute"""
+        self.rendered.append(text)
+        with wave.open(path, 'wb') as clip:
+            clip.setnchannels(1)
+            clip.setsampwidth(1)
+            clip.setframerate(8000)
+            clip.writeframes(b'\x80' * int(8000 * 60 * max(len(text.split()), 1) / rate))
+
+    def stop(self):
+        self._stop.set()
+
+
+def clip_key(text, rate, volume, voice_id):
+    """Content address of a rendered clip"""
+    return hashlib.sha256(repr((text, rate, float(volume), voice_id)).encode('utf-8')).hexdigest()[:32]
+
+
+class AudioCache:
+    """Rendered clips on disk, evicted least recently used first beyond max_bytes
+
+    Recency survives restarts through the files' access times, which are
+    set explicitly on every hit (modification times, and so Last-Modified,
+    stay put).
+    """
+
+    SUFFIX = '.wav'
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._files = OrderedDict()  # key -> size, least recently used first
+        self.size = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        entries = []
+        for name in (os.listdir(directory) if os.path.isdir(directory) else ()):
+            if name.endswith(self.SUFFIX):
+                info = os.stat(os.path.join(directory, name))
+                entries.append((info.st_atime, name[:-len(self.SUFFIX)], info.st_size))
+        for _, key, size in sorted(entries):
+            self._files[key] = size
+            self.size += size
+
+    def filename(self, key):
+        return key + self.SUFFIX
+
+    def path(self, key):
+        return os.path.join(self.directory, self.filename(key))
+
+    def get(self, key):
+        """Path of a cached clip (marking it recently used), or None"""
+        with self._lock:
+            if key not in self._files:
+                self.stats['misses'] += 1
+                return None
+            self._files.move_to_end(key)
+            self.stats['hits'] += 1
+        path = self.path(key)
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except FileNotFoundError:  # removed behind our back
+            with self._lock:
+                self.size -= self._files.pop(key, 0)
+            return None
+        return path
+
+    def temp_path(self):
+        """A fresh path inside the cache directory to render into before put()"""
+        os.makedirs(self.directory, exist_ok=True)
+        handle, path = tempfile.mkstemp(suffix='.part', dir=self.directory)
+        os.close(handle)
+        return path
+
+    def put(self, key, rendered_path):
+        """Move a rendered file into the cache under key; returns its final path"""
+        path = self.path(key)
+        os.replace(rendered_path, path)  # atomic: readers never see a partial clip
+        size = os.path.getsize(path)
+        with self._lock:
+            self.size += size - self._files.pop(key, 0)
+            self._files[key] = size
+            evicted = []
+            while self.size > self.max_bytes and len(self._files) > 1:
+                old_key, old_size = self._files.popitem(last=False)
+                self.size -= old_size
+                evicted.append(old_key)
+            self.stats['evictions'] += len(evicted)
+        for old_key in evicted:
+            try:
+                os.remove(self.path(old_key))
+            except FileNotFoundError:
+                pass
+        return path
+
+
+class TTSJob:
+    """One queued utterance (or rendering) and its progress"""
+
+    def __init__(self, text, rate, volume, voice_id, clip=None):
+        self.id = uuid.uuid4().hex
+        self.text = text
+        self.rate = rate
+        self.volume = volume
+        self.voice_id = voice_id
+        self.clip = clip  # cache key when rendering to a file
+        self.status = QUEUED
+        self.error = None
+        self.created_at = time.time()
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the job has finished (spoken, cancelled or failed); False on timeout"""
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        info = {'job_id': self.id, 'status': self.status, 'text': self.text, 'error': self.error}
+        if self.clip:
+            info['clip'] = self.clip
+        return info
+
+
+class TTSService:
+    """Bounded queue of speech jobs served by a single worker thread"""
+
+    def __init__(self, driver_factory, max_queue=32, history=256, audio_cache=None):
+        self.driver_factory = driver_factory
+        self.driver = None
+        self.history = history
+        self.audio_cache = audio_cache
+        self._rendering = {}  # clip key -> job in flight, so concurrent requests share one rendering
+        self._queue = queue.Queue(max_queue)
+        self._jobs = OrderedDict()  # id -> TTSJob, oldest first
+        self._current = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = {'submitted': 0, 'rejected': 0, 'cached': 0, 'spoken': 0, 'rendered': 0, 'cancelled': 0,
+                      'failed': 0}
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='tts-worker', daemon=True)
+                self._thread.start()
+
+    def submit(self, text, rate=200, volume=1.0, voice_id=None, to_file=False):
+        """Queue text to be spoken (or rendered into the audio cache); returns the TTSJob, or None if the queue is full
+
+        Rendering a phrase that is already cached returns a finished job without queueing anything.
+        """
+        clip = None
+        if to_file:
+            if self.audio_cache is None:
+                raise ValueError("TTSService has no audio_cache to render into")
+            clip = clip_key(text, rate, volume, voice_id)
+        job = TTSJob(text, rate, volume, voice_id, clip)
+        with self._lock:
+            if clip and self.audio_cache.get(clip):
+                self.stats['cached'] += 1
+                self._remember(job)
+                self._finish(job, DONE)
+                return job
+            if clip and clip in self._rendering:
+                return self._rendering[clip]
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self.stats['rejected'] += 1
+                return None
+            self.stats['submitted'] += 1
+            self._remember(job)
+            if clip:
+                self._rendering[clip] = job
+        self._ensure_worker()
+        return job
+
+    def _remember(self, job):
+        # Caller holds self._lock
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.history:
+            self._jobs.popitem(last=False)
+
+    def clip_path(self, key):
+        """Path of a rendered clip in the audio cache, or None"""
+        return self.audio_cache.get(key) if self.audio_cache is not None else None
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def pending(self):
+        """Number of jobs waiting to be spoken"""
+        return self._queue.qsize()
+
+    def cancel(self, job_id):
+        """Cancel a queued job or stop it if it is being spoken; False if it already finished"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in (QUEUED, SPEAKING):
+                return False
+            speaking = job.status == SPEAKING
+            self._finish(job, CANCELLED)
+        if speaking and self.driver is not None:
+            self.driver.stop()
+        return True
+
+    def interrupt(self):
+        """Stop the current utterance and cancel everything queued behind it"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.status in (QUEUED, SPEAKING)]
+        for job in jobs:
+            self.cancel(job.id)
+        return len(jobs)
+
+    def _finish(self, job, status, error=None):
+        # Caller holds self._lock
+        job.status = status
+        job.error = error
+        if status != DONE:
+            self.stats['cancelled' if status == CANCELLED else 'failed'] += 1
+        if job.clip and self._rendering.get(job.clip) is job:
+            del self._rendering[job.clip]
+        job._done.set()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                if job.status != QUEUED:  # cancelled while waiting
+                    continue
+                job.status = SPEAKING
+            try:
+                if self.driver is None:
+                    self.driver = self.driver_factory()
+                if job.clip:
+                    self._render(job)
+                else:
+                    self.driver.say(job.text, job.rate, job.volume, job.voice_id)
+                error = None
+            except Exception as e:
+                print(f"Error in text-to-speech: {e}")
+                error = str(e)
+            with self._lock:
+                if job.status == SPEAKING:
+                    if error is None:
+                        self.stats['rendered' if job.clip else 'spoken'] += 1
+                    self._finish(job, FAILED if error else DONE, error)
+
+    def _render(self, job):
+        path = self.audio_cache.temp_path()
+        try:
+            self.driver.render(job.text, path, job.rate, job.volume, job.voice_id)
+            if os.path.getsize(path) == 0:
+                raise RuntimeError("speech driver produced no audio")
+            if job.status == SPEAKING:  # not cancelled meanwhile
+                self.audio_cache.put(job.clip, path)
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def close(self, timeout=5.0):
+        """Stop the worker after the jobs already queued"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
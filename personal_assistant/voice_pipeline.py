@@ -0,0 +1,559 @@
+"""
+Offline voice commands: uploaded audio -> transcript -> process_command.
+
+Uploads are decoded in memory. WAV, AIFF and FLAC go through
+speech_recognition's AudioFile reading a BytesIO; other containers (webm/ogg
+from the browser's MediaRecorder, mp3, ...) are piped through ffmpeg's stdin
+and stdout. Either way the result is 16 kHz mono 16-bit PCM.
+
+Recognition is CPU-bound, so it runs in a pool of worker processes instead
+of on the Flask request thread. Each worker process loads its recognizer
+(the Vosk model is the expensive part) once, in its initializer, and then
+only transcribes PCM buffers. Backends:
+
+* vosk   - Vosk/Kaldi, model directory from VOSK_MODEL_PATH (default)
+* sphinx - CMU pocketsphinx through speech_recognition
+* fake   - returns VOICE_FAKE_TRANSCRIPT for any non-silent audio (tests, CI)
+
+Short clips are answered synchronously with transcribe_pcm() and respond().
+Long clips (or callers that ask for it) go through submit(), which queues a
+job and returns at once; the job's status, transcript and response are
+polled by id, like the TTS jobs.
+
+Audio can also be streamed while the user is still talking: stream() returns
+a VoiceStream that is fed PCM chunks as they arrive. An energy VAD watches
+for the start and end of speech, a recognizer session transcribes
+incrementally (partial transcripts as events), and the command is
+dispatched as soon as the VAD hears end-of-speech, without waiting for the
+upload to finish. A session keeps recognizer state between chunks, so each
+stream is pinned to one worker process, which holds its session; only the
+VAD runs on the request thread. Backends that cannot stream (sphinx) buffer
+the utterance in the worker and recognize it at the end.
+"""
+
+import io
+import json
+import os
+import subprocess
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+CHUNK_BYTES = 8000  # 0.25 s of PCM per recognizer call
+FRAME_BYTES = 960  # 30 ms VAD frames
+
+QUEUED, TRANSCRIBING, DONE, FAILED = 'queued', 'transcribing', 'done', 'failed'
+
+
+class VoiceError(Exception):
+    """Audio that cannot be decoded or a recognizer that cannot be loaded"""
+
+
+# -- decoding ----------------------------------------------------------------
+
+def decode_audio(data):
+    """16 kHz mono 16-bit PCM for an uploaded audio file, decoded without touching disk"""
+    if not data:
+        raise VoiceError("Empty audio upload")
+    if data[:4] in (b'RIFF', b'FORM', b'fLaC'):
+        import speech_recognition as sr
+        try:
+            with sr.AudioFile(io.BytesIO(data)) as source:
+                audio = sr.Recognizer().record(source)
+        except ValueError as e:
+            raise VoiceError(f"Could not read audio: {e}")
+        return audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=SAMPLE_WIDTH)
+    return _ffmpeg_decode(data)
+
+
+def _ffmpeg_decode(data):
+    command = ['ffmpeg', '-loglevel', 'error', '-i', 'pipe:0',
+               '-f', 's16le', '-ac', '1', '-ar', str(SAMPLE_RATE), 'pipe:1']
+    try:
+        result = subprocess.run(command, input=data, capture_output=True, timeout=120)
+    except FileNotFoundError:
+        raise VoiceError("Unsupported audio format (send WAV/FLAC, or install ffmpeg for webm/ogg/mp3)")
+    if result.returncode != 0:
+        raise VoiceError(f"Could not decode audio: {result.stderr.decode(errors='replace').strip()[:200]}")
+    return result.stdout
+
+
+def duration(pcm):
+    """Seconds of 16 kHz mono 16-bit PCM"""
+    return len(pcm) / (SAMPLE_RATE * SAMPLE_WIDTH)
+
+
+def peak(pcm):
+    """Largest absolute sample value of 16-bit PCM"""
+    samples = array('h', pcm[:len(pcm) - len(pcm) % 2])
+    return max(max(samples, default=0), -min(samples, default=0))
+
+
+def strip_wav_header(data):
+    """PCM following a streamed WAV header (which must be 16 kHz mono 16-bit); data unchanged if it has none"""
+    if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        return data
+    position, fmt = 12, None
+    while position + 8 <= len(data):
+        chunk_id, size = data[position:position + 4], int.from_bytes(data[position + 4:position + 8], 'little')
+        if chunk_id == b'fmt ':
+            fmt = data[position + 8:position + 24]
+        elif chunk_id == b'data':
+            if fmt is None or len(fmt) < 16:
+                break
+            channels = int.from_bytes(fmt[2:4], 'little')
+            rate = int.from_bytes(fmt[4:8], 'little')
+            bits = int.from_bytes(fmt[14:16], 'little')
+            if (channels, rate, bits) != (1, SAMPLE_RATE, SAMPLE_WIDTH * 8):
+                raise VoiceError(f"Streamed WAV must be {SAMPLE_RATE} Hz mono 16-bit, got {rate} Hz, "
+                                 f"{channels} channel(s), {bits}-bit")
+            return data[position + 8:]
+        position += 8 + size + size % 2
+    raise VoiceError("Streamed WAV header must arrive in the first chunk")
+
+
+# -- recognizers (run inside the worker processes) ---------------------------
+
+class VoskRecognizer:
+    streaming = True
+
+    def __init__(self, model_path):
+        try:
+            from vosk import Model, SetLogLevel
+        except ImportError:
+            raise VoiceError("vosk not installed. Please install it with: pip install vosk")
+        if not os.path.isdir(model_path):
+            raise VoiceError(f"Vosk model not found at {model_path!r} (see https://alphacephei.com/vosk/models)")
+        SetLogLevel(-1)
+        self.model = Model(model_path)
+
+    def transcribe(self, pcm):
+        session = self.stream()
+        for start in range(0, len(pcm), CHUNK_BYTES):
+            session.accept(pcm[start:start + CHUNK_BYTES], partial=False)
+        return session.result()
+
+    def stream(self):
+        return _VoskSession(self.model)
+
+
+class _VoskSession:
+    """Incremental Kaldi recognition; Vosk finalizes a segment at each pause it detects itself"""
+
+    def __init__(self, model):
+        from vosk import KaldiRecognizer
+        self.recognizer = KaldiRecognizer(model, SAMPLE_RATE)
+        self.segments = []
+
+    def accept(self, pcm, partial=True):
+        """Transcript so far (None when partial=False)"""
+        if self.recognizer.AcceptWaveform(pcm):
+            self._keep(json.loads(self.recognizer.Result()).get('text', ''))
+        if not partial:
+            return None
+        current = json.loads(self.recognizer.PartialResult()).get('partial', '')
+        return ' '.join(self.segments + ([current] if current else []))
+
+    def _keep(self, text):
+        if text:
+            self.segments.append(text)
+
+    def result(self):
+        self._keep(json.loads(self.recognizer.FinalResult()).get('text', ''))
+        return ' '.join(self.segments)
+
+
+class SphinxRecognizer:
+    def __init__(self, model_path=None):
+        try:
+            import pocketsphinx  # noqa: F401
+        except ImportError:
+            raise VoiceError("pocketsphinx not installed. Please install it with: pip install pocketsphinx")
+
+    def transcribe(self, pcm):
+        import speech_recognition as sr
+        try:
+            return sr.Recognizer().recognize_sphinx(sr.AudioData(pcm, SAMPLE_RATE, SAMPLE_WIDTH))
+        except sr.UnknownValueError:
+            return ''
+
+
+class FakeRecognizer:
+    """Hears VOICE_FAKE_TRANSCRIPT in any audio that is not silence"""
+
+    streaming = True
+
+    def __init__(self, model_path=None):
+        self.transcript = os.getenv('VOICE_FAKE_TRANSCRIPT', 'what time is it')
+
+    def transcribe(self, pcm):
+        return self.transcript if peak(pcm) > 500 else ''
+
+    def stream(self):
+        return _FakeSession(self.transcript)
+
+
+class _FakeSession:
+    """'Hears' one more word of the transcript for every quarter second of sound"""
+
+    def __init__(self, transcript):
+        self.words = transcript.split()
+        self.voiced = 0.0
+
+    def accept(self, pcm, partial=True):
+        if peak(pcm) > 500:
+            self.voiced += duration(pcm)
+        return ' '.join(self.words[:int(self.voiced / 0.25)]) if partial else None
+
+    def result(self):
+        return ' '.join(self.words) if self.voiced else ''
+
+
+RECOGNIZERS = {'vosk': VoskRecognizer, 'sphinx': SphinxRecognizer, 'fake': FakeRecognizer}
+
+_recognizer = None
+
+
+def load_recognizer(backend, model_path):
+    if backend not in RECOGNIZERS:
+        raise VoiceError(f"Unknown speech recognizer {backend!r} (choose from {', '.join(RECOGNIZERS)})")
+    return RECOGNIZERS[backend](model_path)
+
+
+def _init_worker(backend, model_path):
+    global _recognizer
+    try:
+        _recognizer = load_recognizer(backend, model_path)
+    except VoiceError as e:
+        _recognizer = e  # reported by the first transcription instead of breaking the pool
+
+
+def _loaded_recognizer():
+    if isinstance(_recognizer, Exception):
+        raise _recognizer
+    return _recognizer
+
+
+def _transcribe(pcm):
+    return _loaded_recognizer().transcribe(pcm).strip()
+
+
+class _BufferedSession:
+    """For recognizers that cannot stream: no partials, the utterance is recognized at the end"""
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.chunks = []
+
+    def accept(self, pcm, partial=True):
+        self.chunks.append(pcm)
+        return None
+
+    def result(self):
+        return self.recognizer.transcribe(b''.join(self.chunks))
+
+
+_sessions = {}  # stream id -> recognizer session of the streams pinned to this worker
+
+
+def _open_stream(stream_id):
+    recognizer = _loaded_recognizer()
+    _sessions[stream_id] = recognizer.stream() if getattr(recognizer, 'streaming', False) else _BufferedSession(recognizer)
+
+
+def _accept_stream(stream_id, pcm):
+    return _sessions[stream_id].accept(pcm)
+
+
+def _finish_stream(stream_id):
+    return _sessions.pop(stream_id).result().strip()
+
+
+def _close_stream(stream_id):
+    _sessions.pop(stream_id, None)
+
+
+# -- voice activity detection -------------------------------------------------
+
+class EnergyVAD:
+    """Start/end of speech from 30 ms frame energy against an adaptive noise floor
+
+    Speech starts after `start_frames` loud frames in a row and ends after
+    `end_silence` seconds of quiet once it has started. The noise floor
+    follows the quiet frames, so a steady background hum is not speech.
+    """
+
+    def __init__(self, end_silence=0.6, start_frames=3, min_energy=300.0, ratio=3.0):
+        self.end_frames = max(int(end_silence * 1000 / 30), 1)
+        self.start_frames = start_frames
+        self.min_energy = min_energy
+        self.ratio = ratio
+        self.noise = None
+        self.in_speech = False
+        self.ended = False
+        self.frames = 0
+        self._loud = 0
+        self._quiet = 0
+        self._pending = b''
+
+    def feed(self, pcm):
+        """('speech_start' | 'speech_end', seconds into the stream) for what this audio completes"""
+        events = []
+        data = self._pending + pcm
+        usable = len(data) - len(data) % FRAME_BYTES
+        self._pending = data[usable:]
+        for start in range(0, usable, FRAME_BYTES):
+            if self.ended:
+                break
+            samples = array('h', data[start:start + FRAME_BYTES])
+            energy = (sum(sample * sample for sample in samples) / len(samples)) ** 0.5
+            self.frames += 1
+            loud = energy > max(self.min_energy, (self.noise or 0.0) * self.ratio)
+            if not loud:
+                self.noise = energy if self.noise is None else 0.95 * self.noise + 0.05 * energy
+            if not self.in_speech:
+                self._loud = self._loud + 1 if loud else 0
+                if self._loud >= self.start_frames:
+                    self.in_speech = True
+                    events.append(('speech_start', (self.frames - self._loud) * 0.03))
+            else:
+                self._quiet = 0 if loud else self._quiet + 1
+                if self._quiet >= self.end_frames:
+                    self.ended = True
+                    events.append(('speech_end', (self.frames - self._quiet) * 0.03))
+        return events
+
+
+# -- pipeline ----------------------------------------------------------------
+
+class VoiceJob:
+    """One queued voice command and its result"""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = QUEUED
+        self.transcript = None
+        self.response = None
+        self.error = None
+        self.created_at = time.time()
+
+    def to_dict(self):
+        return {'job_id': self.id, 'status': self.status, 'transcript': self.transcript,
+                'response': self.response, 'error': self.error}
+
+
+class VoicePipeline:
+    """Decode -> recognize (process pool) -> handler, synchronously or as queued jobs"""
+
+    def __init__(self, handler, backend='vosk', model_path='model', max_workers=2, max_pending=16, history=256,
+                 timeout=60.0, end_silence=0.6, stream_max_seconds=30.0):
+        self.handler = handler
+        self.backend = backend
+        self.model_path = model_path
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.history = history
+        self.timeout = timeout
+        self.end_silence = end_silence
+        self.stream_max_seconds = stream_max_seconds
+        self._pool = None
+        self._load = []  # calls in flight plus open streams, per worker
+        self._jobs_pool = None
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'transcribed': 0, 'audio_seconds': 0.0, 'recognize_seconds': 0.0, 'rejected': 0, 'streamed': 0}
+
+    def _reserve(self):
+        """Index of the least loaded worker process, counted as busy until _release()"""
+        with self._lock:
+            if self._pool is None:
+                # One single-process executor per worker, so every chunk of a stream reaches the process with its session
+                self._pool = [ProcessPoolExecutor(1, initializer=_init_worker, initargs=(self.backend, self.model_path))
+                              for _ in range(self.max_workers)]
+                self._load = [0] * self.max_workers
+            worker = min(range(len(self._load)), key=self._load.__getitem__)
+            self._load[worker] += 1
+            return worker
+
+    def _release(self, worker):
+        with self._lock:
+            self._load[worker] -= 1
+
+    def _call(self, worker, function, *args):
+        """function(*args) run in the given worker process"""
+        return self._pool[worker].submit(function, *args).result(self.timeout)
+
+    def transcribe_pcm(self, pcm):
+        """Transcript of 16 kHz mono 16-bit PCM, recognized in a worker process"""
+        start = time.perf_counter()
+        worker = self._reserve()
+        try:
+            transcript = self._call(worker, _transcribe, pcm)
+        finally:
+            self._release(worker)
+        with self._lock:
+            self.stats['transcribed'] += 1
+            self.stats['audio_seconds'] += duration(pcm)
+            self.stats['recognize_seconds'] += time.perf_counter() - start
+        return transcript
+
+    def transcribe(self, data):
+        """Transcript of an uploaded audio file"""
+        return self.transcribe_pcm(decode_audio(data))
+
+    def respond(self, transcript):
+        if not transcript:
+            return "I didn't catch that. Could you please repeat?"
+        return self.handler(transcript)
+
+    def transcribe_and_respond(self, data):
+        """(transcript, response) for an uploaded audio file"""
+        transcript = self.transcribe(data)
+        return transcript, self.respond(transcript)
+
+    # -- streaming mode --------------------------------------------------------
+
+    def stream(self):
+        """A VoiceStream to feed PCM chunks as they arrive; VoiceError if no recognizer is available"""
+        return VoiceStream(self, _PooledSession(self), EnergyVAD(self.end_silence))
+
+    # -- job-queue mode --------------------------------------------------------
+
+    def submit(self, pcm):
+        """Queue decoded audio for transcription and response; returns the VoiceJob, or None if too many are pending"""
+        job = VoiceJob()
+        with self._lock:
+            pending = sum(1 for queued in self._jobs.values() if queued.status in (QUEUED, TRANSCRIBING))
+            if pending >= self.max_pending:
+                self.stats['rejected'] += 1
+                return None
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history:
+                self._jobs.popitem(last=False)
+            if self._jobs_pool is None:
+                self._jobs_pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix='voice-job')
+            jobs_pool = self._jobs_pool
+        jobs_pool.submit(self._run_job, job, pcm)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run_job(self, job, pcm):
+        try:
+            job.status = TRANSCRIBING
+            job.transcript = self.transcribe_pcm(pcm)
+            job.response = self.respond(job.transcript)
+            job.status = DONE
+        except Exception as e:
+            print(f"Error processing voice command: {e}")
+            job.error = str(e)
+            job.status = FAILED
+
+    def close(self):
+        """Drop queued jobs and stop the worker processes"""
+        if self._jobs_pool is not None:
+            self._jobs_pool.shutdown(wait=False, cancel_futures=True)
+        for pool in self._pool or ():
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _PooledSession:
+    """Recognizer session held by the worker process a stream is pinned to"""
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.id = uuid.uuid4().hex
+        self.worker = pipeline._reserve()
+        self.closed = False
+        try:
+            pipeline._call(self.worker, _open_stream, self.id)
+        except Exception:
+            self.close()
+            raise
+
+    def accept(self, pcm, partial=True):
+        return self.pipeline._call(self.worker, _accept_stream, self.id, pcm)
+
+    def result(self):
+        try:
+            return self.pipeline._call(self.worker, _finish_stream, self.id)
+        finally:
+            self.closed = True
+            self.pipeline._release(self.worker)
+
+    def close(self):
+        """Drop the session of a stream that ends without a result"""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.pipeline._pool[self.worker].submit(_close_stream, self.id)
+        except RuntimeError:
+            pass  # pipeline already shut down
+        self.pipeline._release(self.worker)
+
+
+class VoiceStream:
+    """One streamed voice command: feed() chunks of PCM, get events back
+
+    Events are dicts with an 'event' key: speech_start, partial (with the
+    transcript so far), speech_end and final (transcript and response). The
+    final event comes as soon as the VAD hears end-of-speech, or from
+    finish() when the upload ends first; after it, done is True and further
+    audio is ignored. close() releases the worker's session of a stream that
+    is abandoned before its final event.
+    """
+
+    def __init__(self, pipeline, session, vad):
+        self.pipeline = pipeline
+        self.session = session
+        self.vad = vad
+        self.done = False
+        self.received = 0
+        self.partial = ''
+        self._first = True
+        self._odd = b''
+
+    def feed(self, data):
+        if self.done:
+            return []
+        if self._first:
+            self._first = False
+            data = strip_wav_header(data)
+        data = self._odd + data
+        self._odd = data[len(data) - len(data) % SAMPLE_WIDTH:]
+        pcm = data[:len(data) - len(self._odd)]
+        if not pcm:
+            return []
+        self.received += len(pcm)
+        events = [{'event': kind, 'at': round(at, 2)} for kind, at in self.vad.feed(pcm)]
+        partial = self.session.accept(pcm)
+        if partial and partial != self.partial:
+            self.partial = partial
+            events.append({'event': 'partial', 'text': partial})
+        if self.vad.ended or self.received >= self.pipeline.stream_max_seconds * SAMPLE_RATE * SAMPLE_WIDTH:
+            events.extend(self.finish())
+        return events
+
+    def finish(self):
+        """Final transcript and response (at most once)"""
+        if self.done:
+            return []
+        self.done = True
+        start = time.perf_counter()
+        transcript = self.session.result().strip()
+        with self.pipeline._lock:
+            self.pipeline.stats['streamed'] += 1
+            self.pipeline.stats['audio_seconds'] += self.received / (SAMPLE_RATE * SAMPLE_WIDTH)
+            self.pipeline.stats['recognize_seconds'] += time.perf_counter() - start
+        return [{'event': 'final', 'transcript': transcript, 'response': self.pipeline.respond(transcript)}]
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,236 @@
+"""
+Weather lookups through OpenWeatherMap with as few upstream calls as possible.
+
+* City names are resolved to OpenWeatherMap location ids once and memoized
+  for good (names OpenWeatherMap does not know are remembered for an hour).
+  Resolving a name costs one weather_at_place call, whose observation is
+  cached as well, so it is never a wasted request.
+* Observations are cached per location id for `ttl` seconds. OpenWeatherMap
+  refreshes current conditions about every ten minutes, so that is the
+  default: asking again sooner would only return the same data.
+* weather_for(cities) answers many cities at once: fresh ones from the
+  cache, known but stale ones through the group endpoint (weather_at_ids,
+  GROUP_SIZE ids per request), and only names never seen before one by one.
+
+Every request sent to OpenWeatherMap is counted in `stats`.
+
+The client is a pyowm.OWM (pyowm 3) or FakeOWM, an offline stand-in with
+fixed weather for a few cities that counts its calls:
+
+    service = WeatherService(FakeOWM())
+    service.weather('London')  # -> {'id': 2643743, 'name': 'London', ...}
+    service.weather('london ')  # cached; service.stats['upstream_calls'] == 1
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from result_cache import MemoryBackend, ResultCache
+
+PROVIDER_UPDATE_INTERVAL = 600  # seconds between OpenWeatherMap updates of current conditions
+GROUP_SIZE = 20  # location ids per group request (an OpenWeatherMap limit)
+NOT_FOUND_TTL = 3600
+
+
+class WeatherError(Exception):
+    """Weather lookups are not configured"""
+
+
+def normalize_city(city):
+    return ' '.join(city.split()).casefold()
+
+
+def _is_not_found(error):
+    # pyowm.commons.exceptions.NotFoundError (or FakeOWM's); matched by name so pyowm stays a lazy import
+    return type(error).__name__ == 'NotFoundError'
+
+
+def observation_dict(observation):
+    """The parts of a pyowm Observation we use, as a JSON-friendly dict (what the cache stores)"""
+    weather = observation.weather
+    temperature = weather.temperature('celsius')
+    location = observation.location
+    return {'id': location.id, 'name': location.name, 'country': location.country,
+            'status': weather.status, 'detailed_status': weather.detailed_status,
+            'temp': temperature.get('temp'), 'feels_like': temperature.get('feels_like'),
+            'reference_time': weather.reference_time()}
+
+
+class WeatherService:
+    """Current conditions by city name, with memoized geocoding and a per-location TTL cache"""
+
+    def __init__(self, client, ttl=PROVIDER_UPDATE_INTERVAL, geocode_backend=None, observation_backend=None,
+                 clock=time.time):
+        self.client = client
+        self.clock = clock
+        self.geocode = geocode_backend if geocode_backend is not None else MemoryBackend(max_entries=100000)
+        self.observations = ResultCache(observation_backend, ttl=ttl, stale_ttl=0, clock=clock)
+        self._manager = None
+        self._lock = threading.Lock()
+        self.stats = {'upstream_calls': 0, 'place_calls': 0, 'id_calls': 0, 'group_calls': 0,
+                      'geocode_hits': 0, 'geocode_misses': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _upstream(self, kind, method, argument):
+        if self._manager is None:
+            if not self.client:
+                raise WeatherError("Weather is not configured. Set OPENWEATHER_API_KEY in .env")
+            self._manager = self.client.weather_manager()
+        with self._lock:
+            self.stats['upstream_calls'] += 1
+            self.stats[f'{kind}_calls'] += 1
+        return getattr(self._manager, method)(argument)
+
+    def _memoized_id(self, city):
+        """(True, location id or None for an unknown name) if city was resolved before, else (False, None)"""
+        entry = self.geocode.get(normalize_city(city))
+        if entry is None or (entry[0] is None and self.clock() - entry[1] > NOT_FOUND_TTL):
+            self._count('geocode_misses')
+            return False, None
+        self._count('geocode_hits')
+        return True, entry[0]
+
+    def _observe_place(self, city):
+        """Resolve a new name with one weather_at_place call, keeping both the id and the observation"""
+        try:
+            observation = observation_dict(self._upstream('place', 'weather_at_place', city))
+        except Exception as e:
+            if not _is_not_found(e):
+                raise
+            self.geocode.set(normalize_city(city), None, self.clock())
+            return None
+        self.geocode.set(normalize_city(city), observation['id'], self.clock())
+        self.observations.put(str(observation['id']), observation)
+        return observation
+
+    def location_id(self, city):
+        """OpenWeatherMap location id for a city name, or None if it does not know the name"""
+        known, location_id = self._memoized_id(city)
+        if known:
+            return location_id
+        observation = self._observe_place(city)
+        return observation['id'] if observation else None
+
+    def weather(self, city):
+        """Current conditions for a city (see observation_dict), or None if the name is unknown"""
+        known, location_id = self._memoized_id(city)
+        if not known:
+            return self._observe_place(city)
+        if location_id is None:
+            return None
+        return self.observations.get(str(location_id),
+                                     lambda: observation_dict(self._upstream('id', 'weather_at_id', location_id)))
+
+    def weather_for(self, cities):
+        """{city: conditions or None} for many cities, fetching stale ones GROUP_SIZE at a time"""
+        results, stale = {}, {}  # stale: location id -> city names waiting for it
+        for city in dict.fromkeys(cities):
+            known, location_id = self._memoized_id(city)
+            if not known:
+                results[city] = self._observe_place(city)
+            elif location_id is None:
+                results[city] = None
+            else:
+                cached = self.observations.peek(str(location_id))
+                if cached is not None:
+                    results[city] = cached
+                else:
+                    stale.setdefault(location_id, []).append(city)
+
+        ids = list(stale)
+        for start in range(0, len(ids), GROUP_SIZE):
+            for observation in self._upstream('group', 'weather_at_ids', ids[start:start + GROUP_SIZE]):
+                observation = observation_dict(observation)
+                self.observations.put(str(observation['id']), observation)
+                for city in stale.pop(observation['id'], ()):
+                    results[city] = observation
+        for names in stale.values():  # ids the group request did not return
+            for city in names:
+                results[city] = None
+        return {city: results[city] for city in cities}
+
+    def cache_stats(self):
+        stats = dict(self.stats)
+        stats['observations'] = self.observations.stats()
+        stats['geocoded'] = self.geocode.stats()['entries']
+        return stats
+
+
+# -- offline stand-in for pyowm ------------------------------------------------
+
+class NotFoundError(Exception):
+    """Raised by FakeOWM for unknown places, like pyowm's NotFoundError"""
+
+
+FAKE_CITIES = {
+    'london': (2643743, 'London', 'GB', 'Rain', 'light rain', 11.2),
+    'paris': (2988507, 'Paris', 'FR', 'Clear', 'clear sky', 14.8),
+    'new york': (5128581, 'New York', 'US', 'Clouds', 'few clouds', 9.5),
+    'tokyo': (1850147, 'Tokyo', 'JP', 'Clouds', 'scattered clouds', 17.1),
+    'mumbai': (1275339, 'Mumbai', 'IN', 'Haze', 'haze', 30.4),
+    'delhi': (1273294, 'Delhi', 'IN', 'Smoke', 'smoke', 27.9),
+    'bengaluru': (1277333, 'Bengaluru', 'IN', 'Clouds', 'broken clouds', 24.6),
+    'berlin': (2950159, 'Berlin', 'DE', 'Clouds', 'overcast clouds', 8.3),
+    'sydney': (2147714, 'Sydney', 'AU', 'Clear', 'clear sky', 21.6),
+    'san francisco': (5391959, 'San Francisco', 'US', 'Mist', 'mist', 13.0),
+    'toronto': (6167865, 'Toronto', 'CA', 'Snow', 'light snow', -2.4),
+    'singapore': (1880252, 'Singapore', 'SG', 'Thunderstorm', 'thunderstorm with rain', 29.1),
+}
+
+
+class _FakeWeather:
+    def __init__(self, status, detailed_status, temp):
+        self.status = status
+        self.detailed_status = detailed_status
+        self._temp = temp
+
+    def temperature(self, unit='kelvin'):
+        return {'temp': self._temp, 'feels_like': round(self._temp - 1.5, 1)}
+
+    def reference_time(self, timeformat='unix'):
+        return int(time.time()) // PROVIDER_UPDATE_INTERVAL * PROVIDER_UPDATE_INTERVAL
+
+
+class FakeOWM:
+    """Offline stand-in for pyowm.OWM (and its weather manager) with fixed weather; counts calls in `calls`"""
+
+    def __init__(self, cities=None, latency=0.0):
+        self.cities = FAKE_CITIES if cities is None else cities
+        self.latency = latency
+        self.calls = {'weather_at_place': 0, 'weather_at_id': 0, 'weather_at_ids': 0}
+        self._by_id = {row[0]: row for row in self.cities.values()}
+
+    def weather_manager(self):
+        return self
+
+    def _call(self, name):
+        self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    @staticmethod
+    def _observation(row):
+        location_id, name, country, status, detailed_status, temp = row
+        return SimpleNamespace(location=SimpleNamespace(id=location_id, name=name, country=country),
+                               weather=_FakeWeather(status, detailed_status, temp))
+
+    def weather_at_place(self, name):
+        self._call('weather_at_place')
+        row = self.cities.get(normalize_city(name.split(',')[0]))
+        if row is None:
+            raise NotFoundError(f"Unable to find the resource: {name}")
+        return self._observation(row)
+
+    def weather_at_id(self, location_id):
+        self._call('weather_at_id')
+        if location_id not in self._by_id:
+            raise NotFoundError(f"Unable to find the resource: {location_id}")
+        return self._observation(self._by_id[location_id])
+
+    def weather_at_ids(self, ids):
+        self._call('weather_at_ids')
+        return [self._observation(self._by_id[location_id]) for location_id in ids if location_id in self._by_id]